@@ -8,6 +8,11 @@ from datetime import datetime
 from collections import Counter
 from transformers import ResNetForImageClassification, ResNetConfig, AutoImageProcessor
 import os
+import sys
+
+# 캡처 스레드 + 최신 프레임 버퍼는 Gaze_TR_pro 의 라이브 트래킹과 같은 구현을 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Gaze_TR_pro"))
+from live_capture import LatencyStats, LiveCapture
 
 # FER-2013 감정 레이블
 CLASS_NAMES = ["anger", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
@@ -44,11 +49,12 @@ frame_count = 0
 
 print("웹캠을 시작합니다. 'q'를 누르면 종료됩니다.")
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-    
+# 추론이 카메라보다 느리면 밀린 프레임은 버리고 항상 최신 프레임만 처리 (화면 지연 누적 방지)
+# cap 은 캡처 스레드가 마지막 read() 후 해제
+capture = LiveCapture(cap, release_source=True).start()
+latency = LatencyStats()
+
+for frame, captured_at in capture.frames():
     # 좌우 반전
     frame = cv2.flip(frame, 1)
 
@@ -82,6 +88,7 @@ while True:
         else:
             predicted_emotion = "불확실"
 
+    latency.record(captured_at)
     all_frames_emotions.append(predicted_emotion)
     
     if current_emotion is None:
@@ -114,8 +121,10 @@ while True:
             })
         break
 
-cap.release()
+capture.stop()
 cv2.destroyAllWindows()
+live_stats = latency.summary(capture)
+print(f"캡처→결과 지연: {live_stats}")
 
 if frame_count > 0:
     emotion_counts = Counter(all_frames_emotions)
@@ -125,7 +134,8 @@ if frame_count > 0:
 
     report = {
         "timestamp": datetime.now().isoformat(),
-        "total_frames": frame_count,
+        "total_frames": frame_count,  # 처리한 프레임 수 (드롭된 프레임은 제외, 프레임 번호도 처리 순서 기준)
+        "dropped_frames": live_stats.get("dropped", 0),
         "frame_distribution": frame_distribution,
         "detailed_logs": detailed_logs
     }
@@ -0,0 +1,210 @@
+"""
+Calibration metadata index
+캘리브레이션 JSON 파일의 메타데이터를 SQLite 에 보관하여 목록/최신 조회 시 파일을 매번 열지 않도록 함
+(본문 데이터는 필요할 때만 파일에서 로드)
+"""
+
+import fnmatch
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+INDEX_FILENAME = "calibration_index.sqlite3"
+
+# 같은 디렉토리는 이 간격(초) 안에 다시 동기화하지 않음 (외부에서 추가/삭제된 파일 반영 주기)
+INDEX_SYNC_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calibrations (
+    filepath TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    timestamp TEXT NOT NULL DEFAULT '',
+    user_id TEXT,
+    session_name TEXT,
+    total_points INTEGER NOT NULL DEFAULT 0,
+    transform_method TEXT NOT NULL DEFAULT '',
+    file_size INTEGER NOT NULL DEFAULT 0,
+    mtime REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_calibrations_user_ts ON calibrations (directory, user_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_calibrations_ts ON calibrations (directory, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_calibrations_mtime ON calibrations (directory, mtime DESC);
+"""
+
+_COLUMNS = (
+    "filepath", "directory", "filename", "timestamp", "user_id", "session_name",
+    "total_points", "transform_method", "file_size", "mtime"
+)
+_UPSERT = (
+    f"INSERT OR REPLACE INTO calibrations ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + c for c in _COLUMNS)})"
+)
+
+
+def extract_calibration_metadata(data):
+    """캘리브레이션 JSON 에서 색인할 메타데이터 추출
+
+    - CalibrationManager 포맷: metadata / calibration_data
+    - GazeCalibrator.save_calibration_data 포맷: 최상위 timestamp / calibration_points
+    """
+    metadata = data.get("metadata") or {}
+    calib_data = data.get("calibration_data") or {}
+    points = calib_data.get("points", data.get("calibration_points", []))
+    return {
+        "timestamp": metadata.get("timestamp") or data.get("timestamp") or "",
+        "user_id": metadata.get("user_id"),
+        "session_name": metadata.get("session_name"),
+        "total_points": calib_data.get("total_points", data.get("total_points", len(points))) or 0,
+        "transform_method": calib_data.get("transform_method", data.get("transform_method")) or ""
+    }
+
+
+class CalibrationIndex:
+    """캘리브레이션 메타데이터 SQLite 색인
+
+    - upsert/remove: 저장/삭제 시 호출
+    - sync: 디렉토리와 색인을 맞춤 (stat 만 수행하고 새로 생겼거나 바뀐 파일만 파싱)
+    - list/latest: 사용자별 목록, 최신 캘리브레이션 조회
+    """
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self._last_sync = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 연결은 호출마다 새로 열어 스레드 간 공유하지 않음
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- 갱신 ----------
+    @staticmethod
+    def _build_row(filepath, data=None):
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        if data is None:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        row = extract_calibration_metadata(data)
+        row.update({
+            "filepath": filepath,
+            "directory": os.path.dirname(filepath),
+            "filename": os.path.basename(filepath),
+            "file_size": stat.st_size,
+            "mtime": stat.st_mtime
+        })
+        return row
+
+    def upsert(self, filepath, data=None):
+        """파일 하나를 색인 (data 를 주면 파일을 다시 읽지 않음)"""
+        row = self._build_row(filepath, data)
+        with self._connect() as conn:
+            conn.execute(_UPSERT, row)
+        return row
+
+    def remove(self, filepath):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM calibrations WHERE filepath = ?", (os.path.abspath(filepath),))
+
+    def sync(self, directory, patterns=("*.json",), force=False):
+        """디렉토리의 파일 목록과 색인을 맞춤 (INDEX_SYNC_INTERVAL 내 재호출은 생략)"""
+        directory = os.path.abspath(directory)
+        key = (directory, tuple(patterns))
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sync.get(key, float("-inf")) < INDEX_SYNC_INTERVAL:
+                return
+            self._last_sync[key] = now
+
+        on_disk = {}
+        if os.path.isdir(directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in patterns):
+                        stat = entry.stat()
+                        on_disk[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime)
+
+        with self._connect() as conn:
+            indexed = {
+                row["filepath"]: (row["file_size"], row["mtime"])
+                for row in conn.execute(
+                    "SELECT filepath, filename, file_size, mtime FROM calibrations WHERE directory = ?", (directory,)
+                )
+                if any(fnmatch.fnmatch(row["filename"], p) for p in patterns)
+            }
+
+            # 새로 생겼거나 크기/수정 시각이 바뀐 파일만 파싱하여 한 트랜잭션으로 반영
+            rows = []
+            for path, signature in on_disk.items():
+                if indexed.get(path) == signature:
+                    continue
+                try:
+                    rows.append(self._build_row(path))
+                except Exception as e:
+                    print(f"[WARNING] Failed to index calibration file {path}: {e}")
+
+            stale = [(path,) for path in indexed if path not in on_disk]
+            if stale:
+                conn.executemany("DELETE FROM calibrations WHERE filepath = ?", stale)
+            if rows:
+                conn.executemany(_UPSERT, rows)
+
+    # ---------- 조회 ----------
+    def list(self, directories, user_id=None, pattern=None, order_by="timestamp", limit=None):
+        """색인된 캘리브레이션 메타데이터 (최신순, pattern 은 파일명 glob)"""
+        if isinstance(directories, str):
+            directories = [directories]
+        directories = [os.path.abspath(d) for d in directories]
+        order_column = "mtime" if order_by == "mtime" else "timestamp"
+
+        query = f"SELECT * FROM calibrations WHERE directory IN ({', '.join('?' * len(directories))})"
+        params = list(directories)
+        if user_id:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        if pattern:
+            query += " AND filename GLOB ?"
+            params.append(pattern)
+        query += f" ORDER BY {order_column} DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def latest(self, directories, user_id=None, pattern=None, order_by="timestamp"):
+        """가장 최근 캘리브레이션 메타데이터 (없으면 None)"""
+        rows = self.list(directories, user_id=user_id, pattern=pattern, order_by=order_by, limit=1)
+        return rows[0] if rows else None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_calibration_index(db_path):
+    """DB 경로별 CalibrationIndex (동기화 주기 상태를 프로세스 안에서 공유)"""
+    db_path = os.path.abspath(db_path)
+    with _indexes_lock:
+        index = _indexes.get(db_path)
+        if index is None:
+            index = CalibrationIndex(db_path)
+            _indexes[db_path] = index
+        return index
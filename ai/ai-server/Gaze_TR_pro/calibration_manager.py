@@ -1,15 +1,18 @@
 import os
 import json
-import glob
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from calibration_index import INDEX_FILENAME, get_calibration_index
+
 class CalibrationManager:
     """캘리브레이션 데이터 저장 및 관리 클래스"""
     
     def __init__(self, data_dir="calibration_data"):
         self.data_dir = data_dir
         self.ensure_data_directory()
+        # 메타데이터 색인 (목록/최신 조회 시 파일을 열지 않음)
+        self.index = get_calibration_index(os.path.join(self.data_dir, INDEX_FILENAME))
     
     def ensure_data_directory(self):
         """데이터 디렉토리 생성"""
@@ -68,9 +71,14 @@ class CalibrationManager:
         elif calibrator.transform_method == "geometric" and calibrator.transform_matrix is not None:
             calib_data["transform_matrix"] = calibrator.transform_matrix.tolist()
         
+        # 다시 fit 하지 않고 바로 적용 가능한 형태 (RBF 포함)
+        if getattr(calibrator, "compiled_transform", None) is not None:
+            calib_data["compiled_transform"] = calibrator.compiled_transform.to_dict()
+        
         # JSON 파일로 저장
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(calib_data, f, indent=2, ensure_ascii=False)
+        self.index.upsert(filepath, calib_data)
         
         print(f"[INFO] Calibration data saved: {filepath}")
         return filepath
@@ -93,48 +101,29 @@ class CalibrationManager:
             return None
     
     def list_calibrations(self, user_id=None) -> List[Dict]:
-        """저장된 캘리브레이션 목록 조회"""
-        pattern = os.path.join(self.data_dir, "*.json")
-        files = glob.glob(pattern)
+        """저장된 캘리브레이션 목록 조회 (색인 기반, 최신순)"""
+        self.index.sync(self.data_dir)
         
-        calibrations = []
-        for file_path in files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                metadata = data.get('metadata', {})
-                
-                # 사용자 ID 필터링
-                if user_id and metadata.get('user_id') != user_id:
-                    continue
-                
-                calib_info = {
-                    "filepath": file_path,
-                    "filename": os.path.basename(file_path),
-                    "timestamp": metadata.get('timestamp', ''),
-                    "user_id": metadata.get('user_id', ''),
-                    "session_name": metadata.get('session_name', ''),
-                    "total_points": data.get('calibration_data', {}).get('total_points', 0),
-                    "transform_method": data.get('calibration_data', {}).get('transform_method', ''),
-                    "file_size": os.path.getsize(file_path)
-                }
-                calibrations.append(calib_info)
-                
-            except Exception as e:
-                print(f"[WARNING] Failed to read calibration file {file_path}: {e}")
-                continue
-        
-        # 타임스탬프 기준 정렬 (최신순)
-        calibrations.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        return calibrations
+        return [
+            {
+                "filepath": os.path.join(self.data_dir, row["filename"]),
+                "filename": row["filename"],
+                "timestamp": row["timestamp"],
+                "user_id": row["user_id"] or '',
+                "session_name": row["session_name"] or '',
+                "total_points": row["total_points"],
+                "transform_method": row["transform_method"],
+                "file_size": row["file_size"]
+            }
+            for row in self.index.list(self.data_dir, user_id=user_id)
+        ]
     
     def delete_calibration(self, filepath: str) -> bool:
         """캘리브레이션 데이터 삭제"""
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
+                self.index.remove(filepath)
                 print(f"[INFO] Calibration file deleted: {filepath}")
                 return True
             else:
@@ -146,10 +135,11 @@ class CalibrationManager:
     
     def find_latest_calibration(self, user_id=None) -> Optional[str]:
         """가장 최근 캘리브레이션 파일 경로 반환"""
-        calibrations = self.list_calibrations(user_id)
+        self.index.sync(self.data_dir)
+        latest = self.index.latest(self.data_dir, user_id=user_id)
         
-        if calibrations:
-            return calibrations[0]['filepath']  # 최신순 정렬되어 있음
+        if latest:
+            return os.path.join(self.data_dir, latest['filename'])
         else:
             return None
     
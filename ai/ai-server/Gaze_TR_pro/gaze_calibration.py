@@ -11,6 +11,7 @@ from sklearn.preprocessing import PolynomialFeatures
 from sklearn.linear_model import LinearRegression
 from sklearn.pipeline import Pipeline
 from collections import defaultdict
+from gaze_transform import CompiledTransform
 
 # NumPy compatibility fix for versions >= 1.20
 import warnings
@@ -25,6 +26,75 @@ with warnings.catch_warnings():
     if not hasattr(np, 'complex'):
         np.complex = complex
 
+# ===============================
+# 캘리브레이션 후보 모델
+# ===============================
+# 각 fitter 는 (A: (N,2) 각도, B: (N,2) 화면 좌표) → (원본 모델, CompiledTransform)
+def _fit_homography(A, B):
+    matrix = cv2.findHomography(A, B, cv2.RANSAC, 5.0)[0]
+    if matrix is None:
+        raise ValueError("findHomography returned no solution")
+    return matrix, CompiledTransform.from_matrix(matrix)
+
+def _fit_affine(A, B):
+    matrix = cv2.estimateAffine2D(A, B, method=cv2.RANSAC, confidence=0.95)[0]
+    if matrix is None:
+        raise ValueError("estimateAffine2D returned no solution")
+    return matrix, CompiledTransform.from_matrix(matrix)
+
+def _fit_polynomial(A, B, degree):
+    poly_x = Pipeline([
+        ('poly', PolynomialFeatures(degree=degree)),
+        ('linear', LinearRegression())
+    ])
+    poly_y = Pipeline([
+        ('poly', PolynomialFeatures(degree=degree)),
+        ('linear', LinearRegression())
+    ])
+    poly_x.fit(A, B[:, 0])
+    poly_y.fit(A, B[:, 1])
+    return (poly_x, poly_y), CompiledTransform.from_polynomial(poly_x, poly_y)
+
+def _fit_rbf(A, B, function):
+    rbf_x = Rbf(A[:, 0], A[:, 1], B[:, 0], function=function, smooth=0.1)
+    rbf_y = Rbf(A[:, 0], A[:, 1], B[:, 1], function=function, smooth=0.1)
+    return (rbf_x, rbf_y), CompiledTransform.from_rbf(rbf_x, rbf_y)
+
+# (이름, transform_method, fitter)
+CALIBRATION_CANDIDATES = [
+    ("Homography", "geometric", _fit_homography),
+    ("Affine2D", "geometric", _fit_affine),
+    ("Polynomial_2D", "polynomial", lambda A, B: _fit_polynomial(A, B, 2)),
+    ("Polynomial_3D", "polynomial", lambda A, B: _fit_polynomial(A, B, 3)),
+    ("RBF_multiquadric", "rbf", lambda A, B: _fit_rbf(A, B, 'multiquadric')),
+    ("RBF_thin_plate", "rbf", lambda A, B: _fit_rbf(A, B, 'thin_plate')),
+    ("RBF_gaussian", "rbf", lambda A, B: _fit_rbf(A, B, 'gaussian')),
+]
+
+def _mean_error(compiled, A, B):
+    """평균 유클리드 오차 (px). 변환 불가(w=0) 행은 제외"""
+    residuals = np.linalg.norm(compiled.predict(A) - B, axis=1)
+    residuals = residuals[np.isfinite(residuals)]
+    if len(residuals) == 0:
+        return float('inf')
+    return float(residuals.mean())
+
+def _cross_val_error(fit_fn, A, B, folds):
+    """k-fold 교차검증 평균 오차 (px). 캘리브레이션 포인트 순서대로 fold 를 교차 배정"""
+    fold_ids = np.arange(len(A)) % folds
+    residuals = []
+    for k in range(folds):
+        test = fold_ids == k
+        if np.count_nonzero(~test) < 4:
+            return float('inf')
+        _, compiled = fit_fn(A[~test], B[~test])
+        residuals.append(np.linalg.norm(compiled.predict(A[test]) - B[test], axis=1))
+    residuals = np.concatenate(residuals)
+    residuals = residuals[np.isfinite(residuals)]
+    if len(residuals) == 0:
+        return float('inf')
+    return float(residuals.mean())
+
 class GazeCalibrator:
     def __init__(self, screen_width=1920, screen_height=1080, window_width=1344, window_height=756):
         # 화면 설정
@@ -42,6 +112,7 @@ class GazeCalibrator:
         self.poly_model_y = None
         self.rbf_x = None
         self.rbf_y = None
+        self.compiled_transform = None
         
         # 캘리브레이션 타겟 포인트
         self.calib_targets = [
@@ -53,6 +124,7 @@ class GazeCalibrator:
         self.calib_index = 0
         self.calibrating = True
         self.samples_per_point = 1
+        self.CALIB_CV_FOLDS = 0  # 0: 학습 오차로 선택, k>=2: k-fold 교차검증 오차로 선택
         
         # 카메라 설정
         self.FLIP_CAMERA = True
@@ -140,8 +212,13 @@ class GazeCalibrator:
         print(f"[CALIB] Angles: yaw={np.degrees(yaw):.1f}°, pitch={np.degrees(pitch):.1f}°")
         print(f"[CALIB] Target: {target_point}")
     
-    def compute_transform(self):
-        """캘리브레이션 변환 행렬 계산"""
+    def compute_transform(self, cv_folds=None):
+        """캘리브레이션 변환 행렬 계산
+
+        후보 모델(Homography, Affine2D, Polynomial 2/3차, RBF 3종)을 순서대로 fit 하고
+        CompiledTransform 으로 잔차를 한 번에 계산한다.
+        cv_folds >= 2 이면 k-fold 교차검증 오차로 모델을 선택 (기본값: self.CALIB_CV_FOLDS)
+        """
         if len(self.calib_vectors) < 4:
             print("[ERROR] Need at least 4 calibration points!")
             return False
@@ -151,106 +228,52 @@ class GazeCalibrator:
         
         print(f"[CALIB] Computing transform from {len(self.calib_vectors)} points")
         
-        methods = []
+        if cv_folds is None:
+            cv_folds = self.CALIB_CV_FOLDS
+        use_cv = cv_folds >= 2 and len(A) >= cv_folds
         
-        # 기하학적 변환
-        try:
-            homo_result = cv2.findHomography(A, B, cv2.RANSAC, 5.0)
-            if homo_result is not None and homo_result[0] is not None:
-                methods.append(("Homography", homo_result[0], "geometric"))
-        except Exception as e:
-            print(f"[CALIB] Homography failed: {e}")
+        def evaluate(candidate):
+            method_name, method_type, fit_fn = candidate
+            native, compiled = fit_fn(A, B)
+            error = _mean_error(compiled, A, B)
+            cv_error = _cross_val_error(fit_fn, A, B, cv_folds) if use_cv else None
+            return method_name, method_type, native, compiled, error, cv_error
         
-        try:
-            affine_result = cv2.estimateAffine2D(A, B, method=cv2.RANSAC, confidence=0.95)
-            if affine_result is not None and affine_result[0] is not None:
-                methods.append(("Affine2D", affine_result[0], "geometric"))
-        except Exception as e:
-            print(f"[CALIB] Affine2D failed: {e}")
-        
-        # 다항식 회귀
-        try:
-            for degree in [2, 3]:
-                poly_x = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                poly_y = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                
-                poly_x.fit(A, B[:, 0])
-                poly_y.fit(A, B[:, 1])
-                
-                methods.append((f"Polynomial_{degree}D", (poly_x, poly_y), "polynomial"))
-        except Exception as e:
-            print(f"[CALIB] Polynomial regression failed: {e}")
-        
-        # RBF 보간
-        try:
-            for function in ['multiquadric', 'thin_plate', 'gaussian']:
-                rbf_x_model = Rbf(A[:, 0], A[:, 1], B[:, 0], function=function, smooth=0.1)
-                rbf_y_model = Rbf(A[:, 0], A[:, 1], B[:, 1], function=function, smooth=0.1)
-                methods.append((f"RBF_{function}", (rbf_x_model, rbf_y_model), "rbf"))
-        except Exception as e:
-            print(f"[CALIB] RBF interpolation failed: {e}")
+        # 후보 fit + 평가 (포인트 수십 개 규모라 스레드 풀 생성 비용이 fit 보다 큼 → 인라인)
+        results = []
+        for candidate in CALIBRATION_CANDIDATES:
+            try:
+                results.append(evaluate(candidate))
+            except Exception as e:
+                print(f"[CALIB] {candidate[0]} failed: {e}")
         
         # 최적 방법 선택
-        best_method = None
-        best_transform = None
-        best_error = float('inf')
-        best_type = None
+        best = None
+        best_score = float('inf')
         
-        for method_name, transform, method_type in methods:
-            try:
-                if method_type == "geometric":
-                    if method_name == "Homography":
-                        A_homo = np.column_stack((A, np.ones(len(A))))
-                        transformed = []
-                        for point in A_homo:
-                            result_homo = np.dot(transform, point)
-                            if result_homo[2] != 0:
-                                transformed.append([result_homo[0]/result_homo[2], result_homo[1]/result_homo[2]])
-                        transformed = np.array(transformed)
-                    else:  # Affine
-                        A_affine = np.column_stack((A, np.ones(len(A))))
-                        transformed = np.array([np.dot(transform, point) for point in A_affine])
-                
-                elif method_type == "polynomial":
-                    poly_x, poly_y = transform
-                    pred_x = poly_x.predict(A)
-                    pred_y = poly_y.predict(A)
-                    transformed = np.column_stack((pred_x, pred_y))
-                
-                elif method_type == "rbf":
-                    rbf_x_model, rbf_y_model = transform
-                    pred_x = rbf_x_model(A[:, 0], A[:, 1])
-                    pred_y = rbf_y_model(A[:, 0], A[:, 1])
-                    transformed = np.column_stack((pred_x, pred_y))
-                
-                error = np.mean(np.sqrt(np.sum((transformed - B)**2, axis=1)))
+        for method_name, method_type, native, compiled, error, cv_error in results:
+            if cv_error is not None:
+                print(f"[CALIB] {method_name}: avg_error={error:.1f}px, cv_error={cv_error:.1f}px")
+            else:
                 print(f"[CALIB] {method_name}: avg_error={error:.1f}px")
-                
-                if error < best_error:
-                    best_error = error
-                    best_method = method_name
-                    best_transform = transform
-                    best_type = method_type
             
-            except Exception as e:
-                print(f"[CALIB] {method_name} evaluation failed: {e}")
+            score = cv_error if cv_error is not None else error
+            if score < best_score:
+                best_score = score
+                best = (method_name, method_type, native, compiled)
         
-        if best_transform is not None:
+        if best is not None:
+            best_method, best_type, best_transform, compiled = best
             self.transform_matrix = best_transform
             self.transform_method = best_type
+            self.compiled_transform = compiled
             
             if best_type == "polynomial":
                 self.poly_model_x, self.poly_model_y = best_transform
             elif best_type == "rbf":
                 self.rbf_x, self.rbf_y = best_transform
                 
-            print(f"[CALIB] Selected {best_method} (type: {best_type}) with error {best_error:.1f}")
+            print(f"[CALIB] Selected {best_method} (type: {best_type}) with error {best_score:.1f}")
             return True
         else:
             print("[ERROR] All transformation methods failed!")
@@ -289,6 +312,10 @@ class GazeCalibrator:
         elif self.transform_method == "geometric" and self.transform_matrix is not None:
             calib_data["transform_matrix"] = self.transform_matrix.tolist()
         
+        # 다시 fit 하지 않고 바로 적용 가능한 형태 (RBF 포함)
+        if self.compiled_transform is not None:
+            calib_data["compiled_transform"] = self.compiled_transform.to_dict()
+        
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(calib_data, f, indent=2, ensure_ascii=False)
         
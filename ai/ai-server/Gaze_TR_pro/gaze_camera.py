@@ -0,0 +1,77 @@
+"""
+Native-frame camera geometry
+프레임을 (WINDOW_WIDTH, WINDOW_HEIGHT) 로 resize + 좌우 flip 하는 대신
+카메라 내부 파라미터를 원본 프레임 크기에 맞게 바꾸고, 시선 벡터를 수학적으로 좌우 반전
+"""
+
+import numpy as np
+
+
+class NativeFrameCamera:
+    """ptgaze Camera 대용 (얼굴 모델/정규화기가 사용하는 속성만 가짐)"""
+
+    def __init__(self, camera_matrix, dist_coefficients, width, height):
+        self.camera_matrix = camera_matrix
+        self.dist_coefficients = dist_coefficients
+        self.width = width
+        self.height = height
+
+
+def native_camera_matrix(camera_matrix, pipeline_size, frame_size, mirror=False):
+    """resize(+flip) 된 pipeline_size 이미지에 쓰던 내부 파라미터를 원본 frame_size 이미지용으로 변환
+
+    cv2.resize 픽셀 중심 규약: x = (u + 0.5) / sx - 0.5  (sx = frame_w / pipeline_w)
+    - 크기 변환: fx' = sx * fx, cx' = sx * (cx + 0.5) - 0.5
+    - 좌우 반전(x_f = W - 1 - x): 같은 광선이 x 방향으로 뒤집히도록 cx' = sx * (W - 0.5 - cx) - 0.5
+    """
+    pipeline_w, pipeline_h = pipeline_size
+    frame_w, frame_h = frame_size
+    sx = frame_w / pipeline_w
+    sy = frame_h / pipeline_h
+
+    K = np.asarray(camera_matrix, dtype=np.float64)
+    fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+    if mirror:
+        cx_native = sx * (pipeline_w - 0.5 - cx) - 0.5
+    else:
+        cx_native = sx * (cx + 0.5) - 0.5
+    cy_native = sy * (cy + 0.5) - 0.5
+
+    return np.array([
+        [sx * fx, 0.0, cx_native],
+        [0.0, sy * fy, cy_native],
+        [0.0, 0.0, 1.0]
+    ])
+
+
+def native_dist_coefficients(dist_coefficients, mirror=False):
+    """왜곡 계수는 정규화 좌표 기준이라 크기 변환과 무관, 좌우 반전 시 접선 계수 p2 만 부호 반전"""
+    dist = np.array(dist_coefficients, dtype=np.float64).reshape(-1)
+    if mirror and dist.size > 3:
+        dist[3] = -dist[3]
+    return dist
+
+
+def build_native_camera(camera, pipeline_size, frame_size, mirror=False):
+    """ptgaze Camera → 원본 프레임용 NativeFrameCamera"""
+    return NativeFrameCamera(
+        native_camera_matrix(camera.camera_matrix, pipeline_size, frame_size, mirror),
+        native_dist_coefficients(camera.dist_coefficients, mirror),
+        frame_size[0],
+        frame_size[1]
+    )
+
+
+def mirror_gaze_vectors(gaze_vectors):
+    """카메라 좌표계 시선 벡터의 x 성분 반전 (flip 된 이미지에서 추정한 벡터와 대응)"""
+    vectors = np.array(gaze_vectors, dtype=np.float64)
+    vectors[..., 0] = -vectors[..., 0]
+    return vectors
+
+
+def gaze_angle_difference_deg(a, b):
+    """(N,3) 시선 벡터 쌍의 각도 차이 (도)"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 3)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 3)
+    cos = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
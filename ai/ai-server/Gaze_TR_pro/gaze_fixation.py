@@ -0,0 +1,145 @@
+"""
+Online fixation / saccade segmentation
+보정된 시선 좌표를 한 점씩 받아 fixation(중심, 시작, 지속시간)과 saccade 수를 산출 (상태 크기 O(1))
+"""
+
+import math
+
+# I-VT: 연속 샘플 간 속도(px/s)가 이 값 미만이면 fixation
+FIXATION_VELOCITY_THRESHOLD = 1000.0
+
+# I-DT: fixation 후보의 분산 (max-min x) + (max-min y) 가 이 값(px) 이하이면 fixation
+FIXATION_DISPERSION_THRESHOLD = 80.0
+
+# 이보다 짧은(초) fixation 은 내보내지 않음
+FIXATION_MIN_DURATION = 0.1
+
+
+class FixationDetector:
+    """스트리밍 fixation 검출기
+
+    - method="ivt": 속도 임계값 (직전 샘플과의 속도만 필요)
+    - method="idt": 분산 임계값 (현재 fixation 의 bounding box 만 유지)
+    update() 는 fixation 이 끝나는 순간 그 fixation 을 반환하고, 나머지 경우 None
+    """
+
+    def __init__(self, method="ivt", velocity_threshold=FIXATION_VELOCITY_THRESHOLD,
+                 dispersion_threshold=FIXATION_DISPERSION_THRESHOLD, min_duration=FIXATION_MIN_DURATION):
+        if method not in ("ivt", "idt"):
+            raise ValueError(f"Unsupported fixation method: {method}")
+        self.method = method
+        self.velocity_threshold = velocity_threshold
+        self.dispersion_threshold = dispersion_threshold
+        self.min_duration = min_duration
+        self.reset()
+
+    def reset(self):
+        """검출 상태와 누적 카운터 초기화"""
+        self._prev = None  # 직전 샘플 (t, x, y)
+        self._in_saccade = False
+        self._reset_cluster()
+        self.fixation_count = 0
+        self.saccade_count = 0
+        self.total_fixation_duration = 0.0
+
+    def _reset_cluster(self):
+        self._count = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._start = None
+        self._end = None
+        self._min_x = self._max_x = self._min_y = self._max_y = None
+
+    def _add_to_cluster(self, t, x, y):
+        if self._count == 0:
+            self._start = t
+            self._min_x = self._max_x = x
+            self._min_y = self._max_y = y
+        else:
+            self._min_x, self._max_x = min(self._min_x, x), max(self._max_x, x)
+            self._min_y, self._max_y = min(self._min_y, y), max(self._max_y, y)
+        self._count += 1
+        self._sum_x += x
+        self._sum_y += y
+        self._end = t
+
+    def _cluster_fixation(self):
+        """현재 후보가 최소 지속시간을 넘으면 fixation dict, 아니면 None"""
+        if self._count == 0:
+            return None
+        duration = self._end - self._start
+        if duration < self.min_duration:
+            return None
+        return {
+            "start": round(self._start, 3),
+            "end": round(self._end, 3),
+            "duration": round(duration, 3),
+            "x": round(self._sum_x / self._count, 1),
+            "y": round(self._sum_y / self._count, 1),
+            "samples": self._count
+        }
+
+    def _close_cluster(self):
+        fixation = self._cluster_fixation()
+        if fixation is not None:
+            self.fixation_count += 1
+            self.total_fixation_duration += fixation["duration"]
+        self._reset_cluster()
+        return fixation
+
+    def update(self, t, x, y):
+        """샘플 하나 반영 (끝난 fixation 이 있으면 반환)"""
+        t, x, y = float(t), float(x), float(y)
+        prev, self._prev = self._prev, (t, x, y)
+
+        if self.method == "idt":
+            if self._count:
+                min_x, max_x = min(self._min_x, x), max(self._max_x, x)
+                min_y, max_y = min(self._min_y, y), max(self._max_y, y)
+                if (max_x - min_x) + (max_y - min_y) > self.dispersion_threshold:
+                    fixation = self._close_cluster()
+                    self.saccade_count += 1
+                    self._add_to_cluster(t, x, y)
+                    return fixation
+            self._add_to_cluster(t, x, y)
+            return None
+
+        # I-VT
+        if prev is None:
+            return None
+        dt = t - prev[0]
+        velocity = math.hypot(x - prev[1], y - prev[2]) / dt if dt > 0 else math.inf
+        if velocity < self.velocity_threshold:
+            if self._count == 0:
+                self._add_to_cluster(*prev)
+            self._add_to_cluster(t, x, y)
+            self._in_saccade = False
+            return None
+
+        if not self._in_saccade:
+            self.saccade_count += 1
+            self._in_saccade = True
+        return self._close_cluster()
+
+    def current(self):
+        """진행 중인 fixation (최소 지속시간을 넘었을 때만, 상태는 유지)"""
+        return self._cluster_fixation()
+
+    def flush(self):
+        """스트림 종료: 진행 중인 fixation 을 마감하여 반환"""
+        return self._close_cluster()
+
+    def summary(self):
+        """fixation/saccade 집계 (진행 중인 fixation 포함)"""
+        count, total = self.fixation_count, self.total_fixation_duration
+        pending = self.current()
+        if pending is not None:
+            count += 1
+            total += pending["duration"]
+        return {
+            "method": self.method,
+            "fixation_count": count,
+            "saccade_count": self.saccade_count,
+            "total_fixation_duration": round(total, 3),
+            "mean_fixation_duration": round(total / count, 3) if count else 0.0
+        }
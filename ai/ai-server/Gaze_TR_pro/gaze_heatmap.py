@@ -0,0 +1,76 @@
+"""
+Vectorized gaze heatmap builder
+화면 좌표 점들을 한 번에 격자로 집계하고 가우시안 커널을 적용하는 numpy 유틸리티
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# 기본 히트맵 격자 크기 (GazeTracker.HEATMAP_GRID_W/H 와 동일)
+DEFAULT_GRID_W = 160
+DEFAULT_GRID_H = 90
+
+
+def points_to_grid_indices(points, window_width, window_height, grid_w=DEFAULT_GRID_W, grid_h=DEFAULT_GRID_H):
+    """(N,2) 화면 좌표 → 격자 인덱스 (gx, gy)
+
+    GazeTracker.add_gaze_to_heatmap 과 동일한 규칙: int(x / 셀 크기) 후 격자 범위로 제한
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    gx = np.trunc(points[:, 0] / (window_width / grid_w)).astype(np.int64)
+    gy = np.trunc(points[:, 1] / (window_height / grid_h)).astype(np.int64)
+    return np.clip(gx, 0, grid_w - 1), np.clip(gy, 0, grid_h - 1)
+
+
+def bin_grid_indices(gx, gy, grid_w=DEFAULT_GRID_W, grid_h=DEFAULT_GRID_H, out=None):
+    """격자 인덱스별 응시 횟수 (grid_h, grid_w). out 이 주어지면 그 배열에 누적"""
+    flat = np.asarray(gy, dtype=np.int64) * grid_w + np.asarray(gx, dtype=np.int64)
+    counts = np.bincount(flat, minlength=grid_w * grid_h).reshape(grid_h, grid_w)
+    if out is None:
+        return counts.astype(np.int32)
+    out += counts.astype(out.dtype, copy=False)
+    return out
+
+
+def accumulate_heatmap(points, window_width, window_height, grid_w=DEFAULT_GRID_W, grid_h=DEFAULT_GRID_H, out=None):
+    """화면 좌표 점들을 응시 횟수 격자로 집계"""
+    gx, gy = points_to_grid_indices(points, window_width, window_height, grid_w, grid_h)
+    return bin_grid_indices(gx, gy, grid_w, grid_h, out=out)
+
+
+@lru_cache(maxsize=16)
+def gaussian_kernel(radius=2, sigma=1.0):
+    """(2r+1, 2r+1) 가우시안 가중치 exp(-(dx²+dy²) / 2σ²) (정규화하지 않음, 읽기 전용)"""
+    d = np.arange(-radius, radius + 1, dtype=np.float64)
+    kernel = np.exp(-(d[None, :] ** 2 + d[:, None] ** 2) / (2.0 * sigma ** 2))
+    kernel.setflags(write=False)
+    return kernel
+
+
+def splat_gaussian(counts, kernel):
+    """응시 횟수 격자에 커널을 합성곱 (격자 밖으로 나가는 가중치는 버림)
+
+    점마다 주변 셀에 가중치를 더하는 것과 동일한 결과를 커널 크기만큼의 배열 덧셈으로 계산
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    kh, kw = kernel.shape
+    ry, rx = kh // 2, kw // 2
+    h, w = counts.shape
+    padded = np.zeros((h + 2 * ry, w + 2 * rx))
+    for dy in range(kh):
+        for dx in range(kw):
+            padded[dy:dy + h, dx:dx + w] += kernel[dy, dx] * counts
+    return padded[ry:ry + h, rx:rx + w]
+
+
+def build_heatmap(points, window_width, window_height, grid_w=DEFAULT_GRID_W, grid_h=DEFAULT_GRID_H,
+                  sigma=None, radius=2):
+    """점 집합으로부터 임의 크기의 히트맵 생성
+
+    sigma 가 None 이면 응시 횟수(int32), 아니면 가우시안을 적용한 float 격자
+    """
+    counts = accumulate_heatmap(points, window_width, window_height, grid_w, grid_h)
+    if sigma is None:
+        return counts
+    return splat_gaussian(counts, gaussian_kernel(radius, float(sigma)))
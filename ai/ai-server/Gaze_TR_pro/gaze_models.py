@@ -0,0 +1,137 @@
+"""
+Shared ptgaze model holders
+ptgaze 모델(GazeEstimator, LandmarkEstimator)을 프로세스 당 한 번만 로드해 여러 GazeTracker 세션이 공유
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import torch
+from omegaconf import OmegaConf
+from ptgaze.gaze_estimator import GazeEstimator
+from ptgaze.head_pose_estimation import HeadPoseNormalizer, LandmarkEstimator
+
+# 동시에 얼굴 탐지를 수행할 수 있는 세션 수 (mediapipe FaceMesh 는 프레임 간 상태를 가지므로 세션마다 독점)
+LANDMARK_POOL_SIZE = 2
+
+
+def resolve_device(device=None):
+    """None 이면 CUDA 가용 여부로 결정"""
+    return device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def build_ptgaze_config(device=None):
+    """ETH-XGaze + mediapipe 설정"""
+    home = os.path.expanduser("~")
+
+    camera_params_path = os.path.join(os.path.dirname(__file__), "calib", "sample_params.yaml")
+    try:
+        import ptgaze
+        ptgaze_path = os.path.dirname(ptgaze.__file__)
+        normalized_params_path = os.path.join(
+            ptgaze_path,
+            "data",
+            "normalized_camera_params",
+            "eth-xgaze.yaml"
+        )
+    except ImportError:
+        normalized_params_path = os.path.join(
+            os.path.dirname(__file__),
+            "venv",
+            "Lib",
+            "site-packages",
+            "ptgaze",
+            "data",
+            "normalized_camera_params",
+            "eth-xgaze.yaml"
+        )
+
+    return OmegaConf.create({
+        "mode": "ETH-XGaze",
+        "device": resolve_device(device),
+        "model": {"name": "resnet18"},
+        "face_detector": {
+            "mode": "mediapipe",
+            "dlib_model_path": os.path.join(home, ".ptgaze", "dlib", "shape_predictor_68_face_landmarks.dat"),
+            "mediapipe_max_num_faces": 1,
+            "mediapipe_static_image_mode": False
+        },
+        "gaze_estimator": {
+            "checkpoint": os.path.join(home, ".ptgaze", "models", "eth-xgaze_resnet18.pth"),
+            "camera_params": camera_params_path,
+            "normalized_camera_params": normalized_params_path,
+            "use_dummy_camera_params": False,
+            "normalized_camera_distance": 0.6,
+            "image_size": [224, 224]
+        }
+    })
+
+
+class GazeModels:
+    """한 번 로드한 ptgaze 모델 보관
+
+    - gaze_estimator: 시선 모델(ResNet) + 3D 얼굴 모델 + 정규화기. 읽기 전용이라 세션 간 동시 사용 가능
+    - landmark 탐지기: 프레임 간 추적 상태가 있으므로 풀에서 세션 단위로 빌려 씀 (최대 pool_size 개 생성)
+    """
+
+    def __init__(self, device=None, pool_size=LANDMARK_POOL_SIZE):
+        self.config = build_ptgaze_config(device)
+        self.device = self.config.device
+        self.pool_size = max(1, int(pool_size))
+
+        self.gaze_estimator = GazeEstimator(self.config)
+
+        # GazeEstimator 가 내부에 만든 탐지기를 첫 번째 풀 항목으로 재사용
+        self._landmark_pool = queue.LifoQueue()
+        self._landmark_pool.put(self.gaze_estimator._landmark_estimator)
+        self._landmark_created = 1
+        self._lock = threading.Lock()
+        print(f"[INFO] Gaze models loaded (device={self.device}, landmark pool={self.pool_size})")
+
+    def _acquire_landmark_estimator(self):
+        try:
+            return self._landmark_pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._landmark_created < self.pool_size
+            if create:
+                self._landmark_created += 1
+        if create:
+            return LandmarkEstimator(self.config)
+        return self._landmark_pool.get()
+
+    def head_pose_normalizer(self, camera):
+        """다른 카메라 파라미터(원본 프레임 크기 등)용 정규화기 (정규화 카메라/거리는 공유)"""
+        return HeadPoseNormalizer(
+            camera,
+            self.gaze_estimator._normalized_camera,
+            self.config.gaze_estimator.normalized_camera_distance
+        )
+
+    @contextmanager
+    def landmark_session(self):
+        """세션이 독점 사용할 얼굴 탐지기 (사용 후 풀에 반납)"""
+        estimator = self._acquire_landmark_estimator()
+        try:
+            yield estimator
+        finally:
+            self._landmark_pool.put(estimator)
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_gaze_models(device=None):
+    """디바이스별 GazeModels (프로세스 당 한 번만 로드)"""
+    key = resolve_device(device)
+    with _models_lock:
+        models = _models.get(key)
+        if models is None:
+            models = GazeModels(key)
+            _models[key] = models
+        return models
@@ -0,0 +1,226 @@
+"""
+Struct-of-arrays gaze sample recorder
+시선 샘플을 프레임마다 dict 로 쌓는 대신 numpy 열(t, raw_x, raw_y, cal_x, cal_y, confidence)로 보관
+"""
+
+import json
+
+import numpy as np
+
+from gaze_fixation import FixationDetector
+
+# 열 이름과 dtype (샘플 당 28 byte)
+COLUMNS = (
+    ("t", np.float64),
+    ("raw_x", np.int32),
+    ("raw_y", np.int32),
+    ("cal_x", np.int32),
+    ("cal_y", np.int32),
+    ("confidence", np.float32),
+)
+
+# 중앙 영역: 화면 가장자리에서 1/4 씩 제외 (GazeTracker.calculate_center_gaze_ratio 와 동일한 비율)
+CENTER_MARGIN = 0.25
+
+
+class GazeRecorder:
+    """미리 할당된 numpy 열에 시선 샘플을 기록 (용량이 차면 두 배로 확장)
+
+    - stats(): 누적 통계 (center ratio, 평균/표준편차, dispersion). 기록 시점에 갱신되므로 O(1)
+    - fixations: 기록과 동시에 FixationDetector 로 검출한 fixation 목록
+    - timeline(): 시간 간격 다운샘플 또는 fixation 단위 타임라인
+    - save_npz()/load_npz(): 바이너리 저장
+    """
+
+    def __init__(self, window_width, window_height, capacity=1024, fixation_detector=None):
+        self.window_width = window_width
+        self.window_height = window_height
+        self.fixation_detector = fixation_detector or FixationDetector()
+        self.fixations = []
+        self._capacity = max(1, int(capacity))
+        self._columns = {name: np.empty(self._capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self._size = 0
+        self._reset_stats()
+
+    # ---------- 기록 ----------
+    def _reset_stats(self):
+        self._center_count = 0
+        self._mean = np.zeros(2)
+        self._m2 = np.zeros(2)  # 편차 제곱합 (Welford/Chan)
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def append(self, timestamp, raw_point, calibrated_point, confidence=1.0):
+        """샘플 하나 기록"""
+        self.extend([timestamp], [raw_point], [calibrated_point], [confidence])
+
+    def extend(self, timestamps, raw_points, calibrated_points, confidences=None):
+        """샘플 N개를 한 번에 기록 (raw/calibrated: (N,2))"""
+        raw = np.asarray(raw_points).reshape(-1, 2)
+        cal = np.asarray(calibrated_points).reshape(-1, 2)
+        n = len(cal)
+        if n == 0:
+            return
+
+        self._reserve(n)
+        i, j = self._size, self._size + n
+        cols = self._columns
+        cols["t"][i:j] = timestamps
+        cols["raw_x"][i:j] = raw[:, 0]
+        cols["raw_y"][i:j] = raw[:, 1]
+        cols["cal_x"][i:j] = cal[:, 0]
+        cols["cal_y"][i:j] = cal[:, 1]
+        cols["confidence"][i:j] = 1.0 if confidences is None else confidences
+        self._size = j
+        self._update_stats(cal.astype(np.float64))
+
+        detector = self.fixation_detector
+        for t, (x, y) in zip(cols["t"][i:j].tolist(), cal.tolist()):
+            fixation = detector.update(t, x, y)
+            if fixation is not None:
+                self.fixations.append(fixation)
+
+    def _update_stats(self, cal):
+        # 배치 평균/분산을 누적 값과 병합 (Chan et al.)
+        n_a = self._size - len(cal)
+        n_b = len(cal)
+        mean_b = cal.mean(axis=0)
+        m2_b = ((cal - mean_b) ** 2).sum(axis=0)
+        delta = mean_b - self._mean
+        total = n_a + n_b
+        self._mean = self._mean + delta * (n_b / total)
+        self._m2 = self._m2 + m2_b + delta ** 2 * (n_a * n_b / total)
+
+        x0, x1 = self.window_width * CENTER_MARGIN, self.window_width * (1 - CENTER_MARGIN)
+        y0, y1 = self.window_height * CENTER_MARGIN, self.window_height * (1 - CENTER_MARGIN)
+        inside = (cal[:, 0] >= x0) & (cal[:, 0] < x1) & (cal[:, 1] >= y0) & (cal[:, 1] < y1)
+        self._center_count += int(np.count_nonzero(inside))
+
+    def clear(self):
+        self._size = 0
+        self._reset_stats()
+        self.fixation_detector.reset()
+        self.fixations = []
+
+    # ---------- 조회 ----------
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def column(self, name):
+        """열 뷰 (복사 없음, 길이 = 샘플 수)"""
+        return self._columns[name][:self._size]
+
+    def calibrated_points(self):
+        """(N,2) 보정 좌표"""
+        return np.column_stack((self.column("cal_x"), self.column("cal_y")))
+
+    def last_calibrated_point(self):
+        if self._size == 0:
+            return None
+        i = self._size - 1
+        return int(self._columns["cal_x"][i]), int(self._columns["cal_y"][i])
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def stats(self):
+        """누적 통계 (샘플 추가 시점에 갱신되어 전체 재계산 없음)"""
+        n = self._size
+        if n == 0:
+            return {"samples": 0, "center_ratio": 0.0, "mean": None, "std": None, "dispersion": 0.0, "duration_s": 0.0}
+        std = np.sqrt(self._m2 / n)
+        t = self._columns["t"]
+        return {
+            "samples": n,
+            "center_ratio": round(self._center_count / n * 100, 2),
+            "mean": [round(float(v), 2) for v in self._mean],
+            "std": [round(float(v), 2) for v in std],
+            "dispersion": round(float(np.hypot(std[0], std[1])), 2),
+            "duration_s": round(float(t[n - 1] - t[0]), 3)
+        }
+
+    # ---------- 타임라인 ----------
+    def timeline(self, mode="downsample", step_s=None, max_points=None):
+        """타임라인 내보내기
+
+        - downsample: step_s 초(또는 max_points 개) 구간별 평균 좌표
+        - fixations: 기록 중 검출된 fixation 목록 (진행 중인 fixation 포함)
+        """
+        if self._size == 0:
+            return []
+        if mode == "downsample":
+            return self._downsample(step_s, max_points)
+        if mode == "fixations":
+            pending = self.fixation_detector.current()
+            return self.fixations + ([pending] if pending is not None else [])
+        raise ValueError(f"Unsupported timeline mode: {mode}")
+
+    def fixation_summary(self):
+        return self.fixation_detector.summary()
+
+    def _downsample(self, step_s=None, max_points=None):
+        t = self.column("t")
+        cal = self.calibrated_points().astype(np.float64)
+        duration = float(t[-1] - t[0])
+        if step_s is None:
+            step_s = duration / max_points if max_points and duration > 0 else 1.0
+        step_s = max(float(step_s), 1e-6)
+
+        bins = np.floor((t - t[0]) / step_s).astype(np.int64)
+        if max_points:
+            bins = np.minimum(bins, max_points - 1)  # 마지막 샘플이 별도 구간으로 떨어지지 않도록
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        counts = np.diff(np.append(starts, len(bins)))
+        sums = np.add.reduceat(cal, starts, axis=0)
+        means = sums / counts[:, None]
+        return [
+            {"t": round(float(t[0] + b * step_s), 3), "x": round(float(x), 1), "y": round(float(y), 1), "samples": int(c)}
+            for b, (x, y), c in zip(bins[starts].tolist(), means.tolist(), counts.tolist())
+        ]
+
+    # ---------- 저장/변환 ----------
+    def to_records(self):
+        """기존 gaze_data 형식 (dict 리스트)"""
+        t = self.column("t").tolist()
+        raw = np.column_stack((self.column("raw_x"), self.column("raw_y"))).tolist()
+        cal = self.calibrated_points().tolist()
+        return [
+            {"timestamp": ts, "raw_point": tuple(r), "calibrated_point": tuple(c)}
+            for ts, r, c in zip(t, raw, cal)
+        ]
+
+    def save_npz(self, filename, compressed=True):
+        """열 배열 + 메타데이터를 npz 로 저장"""
+        meta = json.dumps({"window_width": self.window_width, "window_height": self.window_height})
+        arrays = {name: self.column(name) for name, _ in COLUMNS}
+        (np.savez_compressed if compressed else np.savez)(filename, meta=np.array(meta), **arrays)
+        return filename
+
+    @classmethod
+    def load_npz(cls, filename):
+        with np.load(filename) as data:
+            meta = json.loads(str(data["meta"]))
+            n = len(data["t"])
+            recorder = cls(meta["window_width"], meta["window_height"], capacity=max(1, n))
+            recorder.extend(
+                data["t"],
+                np.column_stack((data["raw_x"], data["raw_y"])),
+                np.column_stack((data["cal_x"], data["cal_y"])),
+                data["confidence"]
+            )
+        return recorder
@@ -1,15 +1,29 @@
 import cv2
+import functools
+import itertools
 import numpy as np
 import os
 import json
+import torch
 from datetime import datetime
-from omegaconf import OmegaConf
-from ptgaze.gaze_estimator import GazeEstimator
-from ptgaze.head_pose_estimation import LandmarkEstimator
 from scipy.interpolate import Rbf
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.linear_model import LinearRegression
 from sklearn.pipeline import Pipeline
+from gaze_transform import (
+    CompiledTransform,
+    angles_to_screen_coords,
+    apply_compiled_transform,
+    calibration_key,
+    gaze_vectors_to_angles,
+    transform_cache,
+)
+from gaze_heatmap import accumulate_heatmap, build_heatmap
+from gaze_models import get_gaze_models
+from gaze_recorder import GazeRecorder
+from calibration_index import INDEX_FILENAME, get_calibration_index
+from gaze_camera import build_native_camera, mirror_gaze_vectors
+from live_capture import LatencyStats, LiveCapture
 
 # NumPy compatibility fix for versions >= 1.20
 import warnings
@@ -24,8 +38,24 @@ with warnings.catch_warnings():
     if not hasattr(np, 'complex'):
         np.complex = complex
 
+def _with_landmark_estimator(method):
+    """처리 메서드 실행 동안 세션 전용 얼굴 탐지기를 풀에서 빌려 self.landmark_estimator 로 제공"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.landmark_estimator is not None:  # 중첩 호출
+            return method(self, *args, **kwargs)
+        with self.models.landmark_session() as estimator:
+            self.landmark_estimator = estimator
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.landmark_estimator = None
+    return wrapper
+
 class GazeTracker:
-    def __init__(self, screen_width=1920, screen_height=1080, window_width=1344, window_height=756):
+    def __init__(self, screen_width=1920, screen_height=1080, window_width=1344, window_height=756, device=None,
+                 models=None):
+        """시선 추적 세션 (요청마다 생성). 모델은 models(기본: 프로세스 공유 GazeModels)에서 가져옴"""
         # 화면 설정
         self.SCREEN_WIDTH_PX = screen_width
         self.SCREEN_HEIGHT_PX = screen_height
@@ -41,6 +71,7 @@ class GazeTracker:
         self.poly_model_y = None
         self.rbf_x = None
         self.rbf_y = None
+        self.compiled_transform = None  # numpy 로 컴파일된 변환 (apply_transform_batch 용)
         
         # 히트맵 설정
         self.HEATMAP_GRID_W = 160
@@ -49,66 +80,31 @@ class GazeTracker:
         
         # 카메라 설정
         self.FLIP_CAMERA = True
+        # True 면 프레임 resize/flip 없이 원본 크기로 추론 (내부 파라미터 변환 + 시선 벡터 좌우 반전)
+        self.NATIVE_FRAME_PATH = False
+        self._native_geometry = {}
+        
+        # 추론 설정 (None이면 CUDA 가용 여부로 결정)
+        self.device = device
+        self.GAZE_BATCH_SIZE = 1
         
-        # 시선 추적 데이터
-        self.gaze_data = []
+        # 시선 추적 데이터 (numpy 열 기반 기록기)
+        self.gaze_data = GazeRecorder(self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
         self.tracking_active = False
+        self.live_stats = None
         
         # ptgaze 초기화
-        self._init_ptgaze()
+        self._init_ptgaze(models)
         
         # 히트맵 초기화
         self.initialize_gaze_heatmap()
     
-    def _init_ptgaze(self):
-        """ptgaze 모델 초기화"""
-        home = os.path.expanduser("~")
-        
-        camera_params_path = os.path.join(os.path.dirname(__file__), "calib", "sample_params.yaml")
-        try:
-            import ptgaze
-            ptgaze_path = os.path.dirname(ptgaze.__file__)
-            normalized_params_path = os.path.join(
-                ptgaze_path,
-                "data",
-                "normalized_camera_params",
-                "eth-xgaze.yaml"
-            )
-        except ImportError:
-            normalized_params_path = os.path.join(
-                os.path.dirname(__file__),
-                "venv",
-                "Lib",
-                "site-packages",
-                "ptgaze",
-                "data",
-                "normalized_camera_params",
-                "eth-xgaze.yaml"
-            )
-        
-        config = OmegaConf.create({
-            "mode": "ETH-XGaze",
-            "device": "cuda" if __import__('torch').cuda.is_available() else "cpu",
-            "model": {"name": "resnet18"},
-            "face_detector": {
-                "mode": "mediapipe",
-                "dlib_model_path": os.path.join(home, ".ptgaze", "dlib", "shape_predictor_68_face_landmarks.dat"),
-                "mediapipe_max_num_faces": 1,
-                "mediapipe_static_image_mode": False
-            },
-            "gaze_estimator": {
-                "checkpoint": os.path.join(home, ".ptgaze", "models", "eth-xgaze_resnet18.pth"),
-                "camera_params": camera_params_path,
-                "normalized_camera_params": normalized_params_path,
-                "use_dummy_camera_params": False,
-                "normalized_camera_distance": 0.6,
-                "image_size": [224, 224]
-            }
-        })
-        
+    def _init_ptgaze(self, models=None):
+        """ptgaze 모델 연결 (프로세스 공유 모델을 사용하므로 최초 1회만 로드)"""
         try:
-            self.gaze_estimator = GazeEstimator(config)
-            self.landmark_estimator = LandmarkEstimator(config)
+            self.models = models or get_gaze_models(self.device)
+            self.gaze_estimator = self.models.gaze_estimator
+            self.landmark_estimator = None  # 처리 중에만 풀에서 빌려 옴
             print("[INFO] Gaze estimator initialized successfully")
         except Exception as e:
             print(f"[ERROR] Failed to initialize gaze estimator: {e}")
@@ -122,10 +118,11 @@ class GazeTracker:
     def load_calibration_from_localstorage(self):
         """프론트엔드 로컬 스토리지에서 캘리브레이션 데이터 자동 로드"""
         try:
-            # 프론트엔드 디렉토리에서 gaze_calibration_data 파일 찾기
-            current_dir = os.path.dirname(__file__)
+            # 프론트엔드 디렉토리, 현재 디렉토리 순으로 gaze_calibration_data 파일 찾기 (색인 조회)
+            current_dir = os.path.dirname(os.path.abspath(__file__))
             project_root = os.path.abspath(os.path.join(current_dir, "../../"))
             frontend_root = os.path.join(project_root, "frontend")
+            index = get_calibration_index(os.path.join(current_dir, "calibration_data", INDEX_FILENAME))
             
             calib_file_patterns = [
                 "gaze_calibration_data.json",
@@ -133,21 +130,16 @@ class GazeTracker:
             ]
             
             calib_path = None
-            for pattern in calib_file_patterns:
-                import glob
-                files = glob.glob(os.path.join(frontend_root, pattern))
-                if files:
-                    # 가장 최신 파일 선택
-                    calib_path = max(files, key=os.path.getmtime)
-                    break
-            
-            if not calib_path:
-                # 현재 디렉토리에서도 찾아보기
+            for directory in (frontend_root, os.getcwd()):
+                index.sync(directory, calib_file_patterns)
                 for pattern in calib_file_patterns:
-                    files = glob.glob(pattern)
-                    if files:
-                        calib_path = max(files, key=os.path.getmtime)
+                    # 가장 최신 파일 선택
+                    latest = index.latest(directory, pattern=pattern, order_by="mtime")
+                    if latest:
+                        calib_path = latest["filepath"]
                         break
+                if calib_path:
+                    break
             
             if not calib_path:
                 print("[WARNING] No calibration data found in local storage")
@@ -159,6 +151,76 @@ class GazeTracker:
             print(f"[ERROR] Failed to load calibration from local storage: {e}")
             return False
 
+    def _restore_transform_models(self, calib_data):
+        """캘리브레이션 데이터에서 변환 모델을 복원하고 numpy 변환으로 컴파일"""
+        self.calib_vectors = calib_data.get('calibration_vectors', [])
+        self.calib_points = calib_data.get('calibration_points', [])
+        self.transform_method = calib_data.get('transform_method', None)
+        self.transform_matrix = None
+        self.poly_model_x = None
+        self.poly_model_y = None
+        self.rbf_x = None
+        self.rbf_y = None
+        self.compiled_transform = None
+        
+        # 같은 캘리브레이션이면 fit 결과 재사용 (요청/인스턴스 간 공유)
+        cache_key = calibration_key(calib_data)
+        cached = transform_cache.get(cache_key)
+        if cached is not None:
+            for attr, value in cached.items():
+                setattr(self, attr, value)
+            print(f"[INFO] Calibration transform cache hit ({cache_key[:12]})")
+            return
+        
+        # 변환 모델 복원 (직렬화된 컴파일 모델이 있으면 fit 생략)
+        if calib_data.get("compiled_transform"):
+            self.compiled_transform = CompiledTransform.from_dict(calib_data["compiled_transform"])
+            if self.compiled_transform.method == "geometric":
+                self.transform_matrix = self.compiled_transform.matrix
+        
+        elif self.transform_method == "polynomial" and "polynomial_models" in calib_data:
+            poly_data = calib_data["polynomial_models"]
+            degree = poly_data["degree"]
+            
+            # 다항식 모델 재생성
+            A = np.array(self.calib_vectors, dtype=np.float32)
+            B = np.array(self.calib_points, dtype=np.float32)
+            
+            self.poly_model_x = Pipeline([
+                ('poly', PolynomialFeatures(degree=degree)),
+                ('linear', LinearRegression())
+            ])
+            self.poly_model_y = Pipeline([
+                ('poly', PolynomialFeatures(degree=degree)),
+                ('linear', LinearRegression())
+            ])
+            
+            self.poly_model_x.fit(A, B[:, 0])
+            self.poly_model_y.fit(A, B[:, 1])
+            self.compiled_transform = CompiledTransform.from_polynomial(self.poly_model_x, self.poly_model_y)
+            
+        elif self.transform_method == "geometric" and "transform_matrix" in calib_data:
+            self.transform_matrix = np.array(calib_data["transform_matrix"], dtype=np.float32)
+            self.compiled_transform = CompiledTransform.from_matrix(self.transform_matrix)
+        
+        elif self.transform_method == "rbf":
+            # RBF 모델 재생성
+            A = np.array(self.calib_vectors, dtype=np.float32)
+            B = np.array(self.calib_points, dtype=np.float32)
+            
+            self.rbf_x = Rbf(A[:, 0], A[:, 1], B[:, 0], function='multiquadric', smooth=0.1)
+            self.rbf_y = Rbf(A[:, 0], A[:, 1], B[:, 1], function='multiquadric', smooth=0.1)
+            self.compiled_transform = CompiledTransform.from_rbf(self.rbf_x, self.rbf_y)
+        
+        transform_cache.put(cache_key, {
+            "transform_matrix": self.transform_matrix,
+            "poly_model_x": self.poly_model_x,
+            "poly_model_y": self.poly_model_y,
+            "rbf_x": self.rbf_x,
+            "rbf_y": self.rbf_y,
+            "compiled_transform": self.compiled_transform
+        })
+
     def load_calibration_from_data(self, calib_data):
         """캘리브레이션 데이터를 딕셔너리에서 직접 로드"""
         try:
@@ -166,41 +228,7 @@ class GazeTracker:
                 print("[WARNING] No calibration data provided")
                 return False
             
-            self.calib_vectors = calib_data.get('calibration_vectors', [])
-            self.calib_points = calib_data.get('calibration_points', [])
-            self.transform_method = calib_data.get('transform_method', None)
-            
-            # 변환 모델 복원
-            if self.transform_method == "polynomial" and "polynomial_models" in calib_data:
-                poly_data = calib_data["polynomial_models"]
-                degree = poly_data["degree"]
-                
-                # 다항식 모델 재생성
-                A = np.array(self.calib_vectors, dtype=np.float32)
-                B = np.array(self.calib_points, dtype=np.float32)
-                
-                self.poly_model_x = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                self.poly_model_y = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                
-                self.poly_model_x.fit(A, B[:, 0])
-                self.poly_model_y.fit(A, B[:, 1])
-                
-            elif self.transform_method == "geometric" and "transform_matrix" in calib_data:
-                self.transform_matrix = np.array(calib_data["transform_matrix"], dtype=np.float32)
-            
-            elif self.transform_method == "rbf":
-                # RBF 모델 재생성
-                A = np.array(self.calib_vectors, dtype=np.float32)
-                B = np.array(self.calib_points, dtype=np.float32)
-                
-                self.rbf_x = Rbf(A[:, 0], A[:, 1], B[:, 0], function='multiquadric', smooth=0.1)
-                self.rbf_y = Rbf(A[:, 0], A[:, 1], B[:, 1], function='multiquadric', smooth=0.1)
+            self._restore_transform_models(calib_data)
             
             print(f"[INFO] Calibration data loaded from dict: {len(self.calib_points)} points, method: {self.transform_method}")
             return True
@@ -215,41 +243,7 @@ class GazeTracker:
             with open(filename, 'r', encoding='utf-8') as f:
                 calib_data = json.load(f)
             
-            self.calib_vectors = calib_data.get('calibration_vectors', [])
-            self.calib_points = calib_data.get('calibration_points', [])
-            self.transform_method = calib_data.get('transform_method', None)
-            
-            # 변환 모델 복원
-            if self.transform_method == "polynomial" and "polynomial_models" in calib_data:
-                poly_data = calib_data["polynomial_models"]
-                degree = poly_data["degree"]
-                
-                # 다항식 모델 재생성
-                A = np.array(self.calib_vectors, dtype=np.float32)
-                B = np.array(self.calib_points, dtype=np.float32)
-                
-                self.poly_model_x = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                self.poly_model_y = Pipeline([
-                    ('poly', PolynomialFeatures(degree=degree)),
-                    ('linear', LinearRegression())
-                ])
-                
-                self.poly_model_x.fit(A, B[:, 0])
-                self.poly_model_y.fit(A, B[:, 1])
-                
-            elif self.transform_method == "geometric" and "transform_matrix" in calib_data:
-                self.transform_matrix = np.array(calib_data["transform_matrix"], dtype=np.float32)
-            
-            elif self.transform_method == "rbf":
-                # RBF 모델 재생성
-                A = np.array(self.calib_vectors, dtype=np.float32)
-                B = np.array(self.calib_points, dtype=np.float32)
-                
-                self.rbf_x = Rbf(A[:, 0], A[:, 1], B[:, 0], function='multiquadric', smooth=0.1)
-                self.rbf_y = Rbf(A[:, 0], A[:, 1], B[:, 1], function='multiquadric', smooth=0.1)
+            self._restore_transform_models(calib_data)
             
             print(f"[INFO] Calibration data loaded: {len(self.calib_points)} points, method: {self.transform_method}")
             return True
@@ -271,65 +265,56 @@ class GazeTracker:
         
         return screen_x, screen_y
     
-    def apply_transform(self, gaze_vector):
-        """캘리브레이션 변환 적용"""
-        if self.transform_matrix is None and self.poly_model_x is None and self.rbf_x is None:
-            return self.gaze_to_screen_coords(gaze_vector)
+    def gaze_to_screen_coords_batch(self, gaze_vectors):
+        """(N,3) 시선 벡터 → (N,2) 원시 화면 좌표 (gaze_to_screen_coords 의 벡터화 버전)"""
+        angles = gaze_vectors_to_angles(gaze_vectors)
+        return angles_to_screen_coords(angles, self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
+    
+    def apply_transform_batch(self, gaze_vectors):
+        """(N,3) 시선 벡터 → (raw (N,2), calibrated (N,2)) 정수 좌표
         
-        vx, vy, vz = gaze_vector[0], gaze_vector[1], gaze_vector[2]
-        yaw = np.arctan2(-vx, -vz)
-        pitch = np.arcsin(-vy)
+        raw 는 화면 범위로 제한된 원시 좌표, calibrated 는 apply_transform 과 동일한 규칙의 보정 좌표.
+        변환 방식별로 numpy 연산 한 번에 전체 시퀀스를 처리
+        """
+        angles = gaze_vectors_to_angles(gaze_vectors)
+        raw = angles_to_screen_coords(angles, self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
         
         try:
-            if self.transform_method == "geometric" and self.transform_matrix is not None:
-                if self.transform_matrix.shape[0] == 3:  # Homography
-                    point = np.array([yaw, pitch, 1], dtype=np.float32)
-                    result = np.dot(self.transform_matrix, point)
-                    if result[2] != 0:
-                        transformed_x = int(result[0] / result[2])
-                        transformed_y = int(result[1] / result[2])
-                    else:
-                        return self.gaze_to_screen_coords(gaze_vector)
-                else:  # Affine
-                    vec = np.array([yaw, pitch, 1], dtype=np.float32)
-                    result = np.dot(self.transform_matrix, vec)
-                    transformed_x = int(result[0])
-                    transformed_y = int(result[1])
-            
-            elif self.transform_method == "polynomial" and self.poly_model_x is not None:
-                input_point = np.array([[yaw, pitch]])
-                transformed_x = int(self.poly_model_x.predict(input_point)[0])
-                transformed_y = int(self.poly_model_y.predict(input_point)[0])
-            
-            elif self.transform_method == "rbf" and self.rbf_x is not None:
-                transformed_x = int(self.rbf_x(yaw, pitch))
-                transformed_y = int(self.rbf_y(yaw, pitch))
-            
-            else:
-                return self.gaze_to_screen_coords(gaze_vector)
-        
+            calibrated = apply_compiled_transform(
+                self.compiled_transform, angles, raw, self.WINDOW_WIDTH, self.WINDOW_HEIGHT
+            )
         except Exception as e:
             print(f"[ERROR] Transform apply failed: {e}")
-            return self.gaze_to_screen_coords(gaze_vector)
-        
-        # 화면 범위 내로 제한
-        transformed_x = max(0, min(transformed_x, self.WINDOW_WIDTH - 1))
-        transformed_y = max(0, min(transformed_y, self.WINDOW_HEIGHT - 1))
+            calibrated = raw.copy()
         
-        return transformed_x, transformed_y
+        raw = np.clip(raw, 0, [self.WINDOW_WIDTH - 1, self.WINDOW_HEIGHT - 1])
+        return raw, calibrated
+    
+    def apply_transform(self, gaze_vector):
+        """캘리브레이션 변환 적용 (단일 프레임)"""
+        _, calibrated = self.apply_transform_batch([gaze_vector])
+        return int(calibrated[0, 0]), int(calibrated[0, 1])
     
     def add_gaze_to_heatmap(self, x, y):
         """히트맵에 시선 데이터 추가"""
+        self.add_gaze_points_to_heatmap([(x, y)])
+    
+    def add_gaze_points_to_heatmap(self, points):
+        """(N,2) 화면 좌표를 한 번에 히트맵에 누적"""
         if self.gaze_heatmap_2d is None:
             self.initialize_gaze_heatmap()
         
-        grid_x = int(x / (self.WINDOW_WIDTH / self.HEATMAP_GRID_W))
-        grid_y = int(y / (self.WINDOW_HEIGHT / self.HEATMAP_GRID_H))
-        
-        grid_x = max(0, min(grid_x, self.HEATMAP_GRID_W - 1))
-        grid_y = max(0, min(grid_y, self.HEATMAP_GRID_H - 1))
-        
-        self.gaze_heatmap_2d[grid_y][grid_x] += 1
+        accumulate_heatmap(
+            points, self.WINDOW_WIDTH, self.WINDOW_HEIGHT,
+            self.HEATMAP_GRID_W, self.HEATMAP_GRID_H, out=self.gaze_heatmap_2d
+        )
+    
+    def compute_heatmap(self, grid_w=None, grid_h=None, sigma=None):
+        """기록된 보정 좌표로부터 임의 크기의 히트맵 계산 (sigma 지정 시 가우시안 적용)"""
+        grid_w = grid_w or self.HEATMAP_GRID_W
+        grid_h = grid_h or self.HEATMAP_GRID_H
+        points = self.gaze_data.calibrated_points()
+        return build_heatmap(points, self.WINDOW_WIDTH, self.WINDOW_HEIGHT, grid_w, grid_h, sigma=sigma)
     
     def record_gaze_data(self, raw_point, calibrated_point, timestamp=None):
         """시선 데이터 기록"""
@@ -340,16 +325,154 @@ class GazeTracker:
         self.add_gaze_to_heatmap(calibrated_point[0], calibrated_point[1])
         
         # 상세 데이터 기록
-        gaze_entry = {
-            "timestamp": timestamp,
-            "raw_point": raw_point,
-            "calibrated_point": calibrated_point
-        }
-        self.gaze_data.append(gaze_entry)
-    
-    def process_frames(self, frames, calib_data=None):
-        """프레임 리스트에서 시선 추적"""
-        if not frames:
+        self.gaze_data.append(timestamp, raw_point, calibrated_point)
+
+    def _record_gaze_vectors(self, gaze_vectors, timestamps):
+        """시선 벡터 시퀀스를 한 번에 화면 좌표로 변환하여 순서대로 기록"""
+        raw_points, calibrated_points = self.apply_transform_batch(gaze_vectors)
+        self.add_gaze_points_to_heatmap(calibrated_points)
+        now = datetime.now().timestamp()
+        timestamps = [now if timestamp is None else timestamp for timestamp in timestamps]
+        self.gaze_data.extend(timestamps, raw_points, calibrated_points)
+
+    def _record_gaze_vector(self, gaze_vector, timestamp):
+        """시선 벡터를 화면 좌표로 변환하여 기록"""
+        self._record_gaze_vectors([gaze_vector], [timestamp])
+
+    def _prepare_frame(self, frame):
+        """모델 입력 프레임과 카메라 기하 반환
+
+        기본: (WINDOW_WIDTH, WINDOW_HEIGHT) 로 resize + flip 한 프레임, None
+        NATIVE_FRAME_PATH: 원본 프레임, (원본 크기용 camera, normalizer, 좌우 반전 여부)
+        """
+        if not self.NATIVE_FRAME_PATH:
+            frame = cv2.resize(frame, (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
+            if self.FLIP_CAMERA:
+                frame = cv2.flip(frame, 1)
+            return frame, None
+        
+        height, width = frame.shape[:2]
+        key = (width, height, bool(self.FLIP_CAMERA))
+        geometry = self._native_geometry.get(key)
+        if geometry is None:
+            camera = build_native_camera(
+                self.gaze_estimator.camera,
+                (self.WINDOW_WIDTH, self.WINDOW_HEIGHT),
+                (width, height),
+                mirror=self.FLIP_CAMERA
+            )
+            geometry = (camera, self.models.head_pose_normalizer(camera), bool(self.FLIP_CAMERA))
+            self._native_geometry[key] = geometry
+        return frame, geometry
+
+    def _normalize_face(self, frame, face, geometry=None):
+        """머리 자세 추정 + 얼굴 정규화만 수행하고 시선 모델 입력 텐서 반환
+
+        GazeEstimator.estimate_gaze 에서 모델 호출 직전까지의 단계와 동일
+        (geometry 가 있으면 원본 프레임용 카메라/정규화기 사용)
+        """
+        estimator = self.gaze_estimator
+        camera, normalizer = (estimator.camera, estimator._head_pose_normalizer) if geometry is None else geometry[:2]
+        estimator._face_model3d.estimate_head_pose(face, camera)
+        estimator._face_model3d.compute_3d_pose(face)
+        estimator._face_model3d.compute_face_eye_centers(face, estimator._config.mode)
+        normalizer.normalize(frame, face)
+        return estimator._transform(face.normalized_image)
+
+    def _estimate_face_gaze(self, frame, face, geometry=None):
+        """얼굴 하나의 시선 추정 (face.gaze_vector 채움, flip 대신 벡터를 좌우 반전)"""
+        if geometry is None:
+            self.gaze_estimator.estimate_gaze(frame, face)
+            return
+        self._estimate_gaze_batch([face], [self._normalize_face(frame, face, geometry)], mirror=geometry[2])
+
+    @torch.no_grad()
+    def _estimate_gaze_batch(self, faces, images, mirror=False):
+        """정규화된 얼굴 패치 배치를 ETH-XGaze 모델에 한 번에 통과시켜 face.gaze_vector 채움
+
+        mirror: 원본(비반전) 프레임에서 추정한 경우 flip 된 프레임 기준 벡터로 좌우 반전
+        """
+        estimator = self.gaze_estimator
+        device = torch.device(estimator._config.device)
+        batch = torch.stack(images).to(device)
+        predictions = estimator._gaze_estimation_model(batch).cpu().numpy()
+
+        for face, prediction in zip(faces, predictions):
+            face.normalized_gaze_angles = prediction
+            face.angle_to_vector()
+            face.denormalize_gaze_vector()
+            if mirror and face.gaze_vector is not None:
+                face.gaze_vector = mirror_gaze_vectors(face.gaze_vector)
+
+    def _flush_gaze_batch(self, pending, mirror=False):
+        """대기 중인 (timestamp, face, image) 배치를 추론하고 프레임 순서대로 기록, 성공 개수 반환
+
+        배치 추론이 실패하면 같은 배치를 프레임 하나씩 다시 추론 (문제 프레임만 버림)
+        """
+        if not pending:
+            return 0
+
+        try:
+            try:
+                self._estimate_gaze_batch([p[1] for p in pending], [p[2] for p in pending], mirror=mirror)
+                items = pending
+            except Exception as e:
+                print(f"[WARNING] Gaze batch of {len(pending)} failed, retrying per frame: {e}")
+                items = []
+                for item in pending:
+                    try:
+                        self._estimate_gaze_batch([item[1]], [item[2]], mirror=mirror)
+                        items.append(item)
+                    except Exception as frame_error:
+                        print(f"[WARNING] Gaze frame at {item[0]:.3f}s failed: {frame_error}")
+
+            tracked_items = [(timestamp, face.gaze_vector) for timestamp, face, _ in items
+                             if face.gaze_vector is not None]
+            if tracked_items:
+                self._record_gaze_vectors([v for _, v in tracked_items], [t for t, _ in tracked_items])
+            return len(tracked_items)
+        except Exception as e:
+            print(f"[WARNING] Recording gaze batch of {len(pending)} failed: {e}")
+            return 0
+        finally:
+            pending.clear()
+
+    @_with_landmark_estimator
+    def process_frame(self, frame, timestamp=None):
+        """단일 프레임 시선 추적 후 기록, 보정된 화면 좌표 (x, y) 반환 (얼굴/시선이 없으면 None)"""
+        frame, geometry = self._prepare_frame(frame)
+        
+        faces = self.landmark_estimator.detect_faces(frame)
+        if len(faces) == 0:
+            return None
+        
+        face = faces[0]
+        self._estimate_face_gaze(frame, face, geometry)
+        if face.gaze_vector is None:
+            return None
+        
+        self._record_gaze_vector(face.gaze_vector, timestamp)
+        return self.gaze_data.last_calibrated_point()
+
+    @_with_landmark_estimator
+    def process_frames(self, frames, calib_data=None, batch_size=None, timeline=None, expected_frames=None, fps=30.0):
+        """프레임 이터러블(리스트, 제너레이터, 스트리밍 디코더 등)에서 시선 추적
+
+        프레임은 한 번만 순회하며 결과는 기록기에 바로 누적되므로 전체 프레임을 메모리에 올릴 필요가 없음
+        expected_frames 는 진행률 로그용 (없으면 len() 이 가능한 경우에만 사용)
+        batch_size > 1 이면 얼굴 탐지/정규화는 프레임마다 수행하고,
+        정규화된 얼굴 패치를 모아 시선 모델을 배치 단위로 실행
+        timeline 에 "downsample" 또는 "fixations" 를 주면 결과에 시선 타임라인 포함
+        fps 는 입력 프레임 간격 기준 (stride 로 프레임을 건너뛰면 원본 fps / stride)
+        """
+        fps = float(fps) if fps and fps > 0 else 30.0
+        if expected_frames is None and hasattr(frames, "__len__"):
+            expected_frames = len(frames)
+        
+        # 첫 프레임만 미리 꺼내 빈 입력 확인 (제너레이터도 소비하지 않고 되돌림)
+        frame_iter = iter(frames)
+        first_frame = next(frame_iter, None)
+        if first_frame is None:
             print("[ERROR] No frames provided")
             return {
                 "success": False,
@@ -366,60 +489,61 @@ class GazeTracker:
             print("[INFO] No calibration data provided, attempting auto-load")
             self.load_calibration_from_localstorage()
         
-        print(f"[INFO] Processing {len(frames)} frames for gaze tracking")
-        
+        batch_size = max(1, int(batch_size or self.GAZE_BATCH_SIZE))
+        total_label = expected_frames if expected_frames else "streamed"
+        print(f"[INFO] Processing {total_label} frames for gaze tracking (batch_size={batch_size})")
+
         # 히트맵 초기화
         self.initialize_gaze_heatmap()
         self.gaze_data.clear()
-        
+
         frame_count = 0
         successful_tracks = 0
-        
+        pending = []  # 배치 대기열: (timestamp, face, normalized image tensor)
+        mirror = bool(self.NATIVE_FRAME_PATH and self.FLIP_CAMERA)
+
         try:
-            for frame_idx, frame in enumerate(frames):
+            for frame_idx, frame in enumerate(itertools.chain([first_frame], frame_iter)):
                 frame_count += 1
-                timestamp = frame_idx / 30.0  # 30fps 가정
-                
-                # 프레임 크기 조정
-                frame = cv2.resize(frame, (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
-                
-                if self.FLIP_CAMERA:
-                    frame = cv2.flip(frame, 1)
-                
+                timestamp = frame_idx / fps
+
+                # 프레임 크기 조정/반전 (NATIVE_FRAME_PATH 면 원본 그대로, 카메라 기하로 대체)
+                frame, geometry = self._prepare_frame(frame)
+
                 # 얼굴 탐지
                 faces = self.landmark_estimator.detect_faces(frame)
                 if len(faces) == 0:
                     continue
-                
+
                 face = faces[0]
-                
+
                 # 시선 추정
                 try:
-                    self.gaze_estimator.estimate_gaze(frame, face)
-                    gaze_vector = face.gaze_vector
-                    if gaze_vector is None:
-                        continue
-                    
-                    # 시선 좌표 변환
-                    raw_point = self.gaze_to_screen_coords(gaze_vector)
-                    calibrated_point = self.apply_transform(gaze_vector)
-                    
-                    # 화면 범위 내로 제한
-                    raw_point = (
-                        max(0, min(raw_point[0], self.WINDOW_WIDTH - 1)),
-                        max(0, min(raw_point[1], self.WINDOW_HEIGHT - 1))
-                    )
-                    
-                    # 데이터 기록
-                    self.record_gaze_data(raw_point, calibrated_point, timestamp)
-                    successful_tracks += 1
-                    
+                    if batch_size == 1:
+                        self._estimate_face_gaze(frame, face, geometry)
+                        gaze_vector = face.gaze_vector
+                        if gaze_vector is None:
+                            continue
+
+                        self._record_gaze_vector(gaze_vector, timestamp)
+                        successful_tracks += 1
+                    else:
+                        pending.append((timestamp, face, self._normalize_face(frame, face, geometry)))
+                        if len(pending) >= batch_size:
+                            successful_tracks += self._flush_gaze_batch(pending, mirror)
+
                     if frame_count % 50 == 0:
-                        print(f"[INFO] Processed {frame_count}/{len(frames)} frames ({frame_count/len(frames)*100:.1f}%)")
-                
+                        if expected_frames:
+                            print(f"[INFO] Processed {frame_count}/{expected_frames} frames ({frame_count/expected_frames*100:.1f}%)")
+                        else:
+                            print(f"[INFO] Processed {frame_count} frames")
+
                 except Exception as e:
                     continue
-        
+
+            # 남은 배치
+            successful_tracks += self._flush_gaze_batch(pending, mirror)
+
         except Exception as e:
             print(f"[ERROR] Error processing frames: {e}")
             return {
@@ -437,13 +561,7 @@ class GazeTracker:
             center_ratio = self.calculate_center_gaze_ratio()
             
             # 히트맵 데이터를 압축 형태로 포맷팅
-            heatmap_formatted = None
-            if self.gaze_heatmap_2d is not None:
-                heatmap_array = self.gaze_heatmap_2d.tolist()
-                heatmap_lines = []
-                for row in heatmap_array:
-                    heatmap_lines.append(json.dumps(row, separators=(',', ':')))
-                heatmap_formatted = '[\n' + ',\n'.join(heatmap_lines) + '\n]'
+            heatmap_formatted = self.format_heatmap_compact(self.gaze_heatmap_2d)
             
             result = {
                 "success": True,
@@ -468,8 +586,13 @@ class GazeTracker:
                     "center_gaze_percentage": round(center_ratio, 2),
                     "peripheral_gaze_percentage": round(100 - center_ratio, 2),
                     "gaze_distribution": "concentrated" if center_ratio > 60 else "distributed" if center_ratio > 30 else "scattered"
-                }
+                },
+                "gaze_stats": self.gaze_data.stats(),
+                "fixations": self.gaze_data.timeline("fixations"),
+                "fixation_summary": self.gaze_data.fixation_summary()
             }
+            if timeline:
+                result["timeline"] = self.gaze_data.timeline(timeline)
             
             return result
         else:
@@ -481,6 +604,7 @@ class GazeTracker:
                 "tracked_frames": 0
             }
 
+    @_with_landmark_estimator
     def process_video_file(self, video_path, output_prefix=None, auto_load_calibration=True):
         """동영상 파일에서 시선 추적"""
         if not os.path.exists(video_path):
@@ -620,36 +744,92 @@ class GazeTracker:
                 "tracked_frames": 0
             }
     
-    def process_webcam_live(self, duration_seconds=None):
-        """웹캠에서 실시간 시선 추적"""
-        cap = cv2.VideoCapture(0)
+    def _estimate_live_point(self, frame):
+        """실시간 프레임 하나의 (raw_point, calibrated_point, 오류 메시지) (실패 시 좌표는 None)"""
+        faces = self.landmark_estimator.detect_faces(frame)
+        if len(faces) == 0:
+            return None, None, ("No face detected", (30, 50), 1, (0, 0, 255), 2)
+        
+        face = faces[0]
+        try:
+            self.gaze_estimator.estimate_gaze(frame, face)
+            gaze_vector = face.gaze_vector
+            if gaze_vector is None:
+                return None, None, ("Gaze estimation failed", (30, 80), 1, (0, 255, 255), 2)
+        except Exception as e:
+            return None, None, (f"Error: {str(e)[:50]}", (30, 80), 0.7, (0, 0, 255), 2)
+        
+        # 시선 좌표 변환
+        raw_point = self.gaze_to_screen_coords(gaze_vector)
+        calibrated_point = self.apply_transform(gaze_vector)
+        
+        # 화면 범위 내로 제한
+        raw_point = (
+            max(0, min(raw_point[0], frame.shape[1] - 1)),
+            max(0, min(raw_point[1], frame.shape[0] - 1))
+        )
+        return raw_point, calibrated_point, None
+    
+    def _show_live_frame(self, frame, raw_point, calibrated_point, message):
+        """실시간 화면 표시 후 눌린 키 반환"""
+        if message is not None:
+            text, org, scale, color, thickness = message
+            cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cv2.imshow("Gaze Tracking", frame)
+            return cv2.waitKey(1) & 0xFF
+        
+        # 시선 위치 표시
+        cv2.circle(frame, calibrated_point, 10, (0, 255, 0), -1)  # 녹색 (보정된 시선)
+        cv2.circle(frame, raw_point, 5, (0, 0, 255), -1)  # 빨간색 (원시 시선)
+        
+        # 상태 정보 표시
+        status_text = "Recording" if self.tracking_active else "Paused"
+        status_color = (0, 255, 0) if self.tracking_active else (0, 0, 255)
+        cv2.putText(frame, f"Status: {status_text}", (30, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, status_color, 2)
+        
+        total_samples = np.sum(self.gaze_heatmap_2d) if self.gaze_heatmap_2d is not None else 0
+        cv2.putText(frame, f"Samples: {total_samples}", (30, 90),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        
+        cv2.putText(frame, f"Raw: {raw_point}, Cal: {calibrated_point}", 
+                    (30, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+        cv2.imshow("Gaze Tracking", frame)
+        return cv2.waitKey(1) & 0xFF
+    
+    @_with_landmark_estimator
+    def process_webcam_live(self, duration_seconds=None, source=None, display=True):
+        """웹캠(또는 source)에서 실시간 시선 추적
+
+        캡처 스레드가 단일 슬롯 버퍼에 최신 프레임만 남기고, 추론 루프는 항상 가장 최근 프레임을 처리
+        (추론이 밀리면 지난 프레임은 버림). 캡처→결과 지연 통계는 self.live_stats 에 저장
+        source: read() 를 제공하는 영상 소스 (기본 cv2.VideoCapture(0), 테스트용 SyntheticVideoSource 등)
+        display=False: 창 없이 추적된 모든 프레임을 기록
+        """
+        cap = source if source is not None else cv2.VideoCapture(0)
         if not cap.isOpened():
             print("[ERROR] Cannot open webcam")
             return False
         
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.WINDOW_WIDTH)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.WINDOW_HEIGHT)
-        cv2.namedWindow("Gaze Tracking", cv2.WINDOW_AUTOSIZE)
-        
-        print("[INFO] Starting live gaze tracking")
-        print("[INFO] Press 's' to start/stop recording, 'q' to quit")
+        if display:
+            cv2.namedWindow("Gaze Tracking", cv2.WINDOW_AUTOSIZE)
+            print("[INFO] Starting live gaze tracking")
+            print("[INFO] Press 's' to start/stop recording, 'q' to quit")
         
         # 히트맵 초기화
         self.initialize_gaze_heatmap()
         self.gaze_data.clear()
         
-        start_time = datetime.now()
+        # 캡처 스레드가 종료하면서 cap 을 해제 (read 중인 cap 을 여기서 release 하지 않도록)
+        capture = LiveCapture(cap, release_source=True)
+        latency = LatencyStats()
         
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # 시간 제한 확인
-                if duration_seconds and (datetime.now() - start_time).seconds >= duration_seconds:
-                    break
-                
+            capture.start()
+            for frame, captured_at in capture.frames(duration_seconds=duration_seconds):
                 frame = cv2.resize(frame, (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
                 
                 if self.FLIP_CAMERA:
@@ -657,71 +837,17 @@ class GazeTracker:
                 
                 frame = cv2.convertScaleAbs(frame, alpha=1.2, beta=30)
                 
-                # 얼굴 탐지
-                faces = self.landmark_estimator.detect_faces(frame)
-                if len(faces) == 0:
-                    cv2.putText(frame, "No face detected", (30, 50),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                    cv2.imshow("Gaze Tracking", frame)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-                    continue
-                
-                face = faces[0]
-                
-                # 시선 추정
-                try:
-                    self.gaze_estimator.estimate_gaze(frame, face)
-                    gaze_vector = face.gaze_vector
-                    if gaze_vector is None:
-                        cv2.putText(frame, "Gaze estimation failed", (30, 80),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-                        cv2.imshow("Gaze Tracking", frame)
-                        if cv2.waitKey(1) & 0xFF == ord('q'):
-                            break
-                        continue
-                except Exception as e:
-                    cv2.putText(frame, f"Error: {str(e)[:50]}", (30, 80),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                    cv2.imshow("Gaze Tracking", frame)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-                    continue
-                
-                # 시선 좌표 변환
-                raw_point = self.gaze_to_screen_coords(gaze_vector)
-                calibrated_point = self.apply_transform(gaze_vector)
+                raw_point, calibrated_point, message = self._estimate_live_point(frame)
+                latency.record(captured_at)
                 
-                # 화면 범위 내로 제한
-                raw_point = (
-                    max(0, min(raw_point[0], frame.shape[1] - 1)),
-                    max(0, min(raw_point[1], frame.shape[0] - 1))
-                )
-                
-                # 시선 위치 표시
-                cv2.circle(frame, calibrated_point, 10, (0, 255, 0), -1)  # 녹색 (보정된 시선)
-                cv2.circle(frame, raw_point, 5, (0, 0, 255), -1)  # 빨간색 (원시 시선)
-                
-                # 데이터 기록 (활성화 시에만)
-                if self.tracking_active:
+                # 데이터 기록 (활성화 시에만, 창 없이 실행하면 항상)
+                if calibrated_point is not None and (self.tracking_active or not display):
                     self.record_gaze_data(raw_point, calibrated_point)
                 
-                # 상태 정보 표시
-                status_text = "Recording" if self.tracking_active else "Paused"
-                status_color = (0, 255, 0) if self.tracking_active else (0, 0, 255)
-                cv2.putText(frame, f"Status: {status_text}", (30, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, status_color, 2)
-                
-                total_samples = np.sum(self.gaze_heatmap_2d) if self.gaze_heatmap_2d is not None else 0
-                cv2.putText(frame, f"Samples: {total_samples}", (30, 90),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                cv2.putText(frame, f"Raw: {raw_point}, Cal: {calibrated_point}", 
-                            (30, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                
-                cv2.imshow("Gaze Tracking", frame)
+                if not display:
+                    continue
                 
-                key = cv2.waitKey(1) & 0xFF
+                key = self._show_live_frame(frame, raw_point, calibrated_point, message)
                 
                 if key == ord('s'):
                     self.tracking_active = not self.tracking_active
@@ -733,8 +859,11 @@ class GazeTracker:
         except KeyboardInterrupt:
             print("\n[INFO] Live tracking interrupted")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
+            capture.stop()
+            if display:
+                cv2.destroyAllWindows()
+            self.live_stats = latency.summary(capture)
+            print(f"[INFO] Live latency: {self.live_stats}")
         
         # 결과 저장
         if len(self.gaze_data) > 0:
@@ -750,12 +879,8 @@ class GazeTracker:
         if heatmap_2d is None:
             return None
         
-        # 각 행을 문자열로 변환
-        rows = []
-        for row in heatmap_2d:
-            row_str = '[' + ','.join(map(str, row)) + ']'
-            rows.append(row_str)
-        
+        # 각 행을 문자열로 변환 (tolist 로 한 번에 파이썬 값으로 변환 후 join)
+        rows = ['[' + ','.join(map(str, row)) + ']' for row in np.asarray(heatmap_2d).tolist()]
         return '[\n' + ',\n'.join(rows) + '\n]'
     
     def calculate_center_gaze_ratio(self):
@@ -821,18 +946,28 @@ class GazeTracker:
             saved_files.append(heatmap_filename)
             print(f"[INFO] Heatmap saved: {heatmap_filename}")
         
-        # 상세 시선 데이터 저장
+        # 상세 시선 데이터 저장 (샘플 열은 npz, 요약/타임라인은 JSON)
         if self.gaze_data:
-            detailed_filename = f"results/{prefix}_detailed_{timestamp}.json"
-            with open(detailed_filename, 'w', encoding='utf-8') as f:
-                json.dump(self.gaze_data, f, indent=2, ensure_ascii=False)
-            
+            detailed_filename = self.gaze_data.save_npz(f"results/{prefix}_detailed_{timestamp}.npz")
             saved_files.append(detailed_filename)
             print(f"[INFO] Detailed gaze data saved: {detailed_filename}")
+            
+            summary = {
+                "stats": self.gaze_data.stats(),
+                "timeline": self.gaze_data.timeline("downsample", step_s=1.0),
+                "fixations": self.gaze_data.timeline("fixations")
+            }
+            summary_filename = f"results/{prefix}_timeline_{timestamp}.json"
+            with open(summary_filename, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, separators=(',', ':'))
+            
+            saved_files.append(summary_filename)
+            print(f"[INFO] Gaze timeline saved: {summary_filename}")
         
         print(f"[INFO] Tracking results saved with prefix: {prefix}")
         return saved_files
 
+
 if __name__ == "__main__":
     tracker = GazeTracker()
     
@@ -865,4 +1000,4 @@ if __name__ == "__main__":
         if tracker.load_calibration_data(calib_file):
             tracker.process_webcam_live()
         else:
-            print("[ERROR] Failed to load calibration data")
\ No newline at end of file
+            print("[ERROR] Failed to load calibration data")
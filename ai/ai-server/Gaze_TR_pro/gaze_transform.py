@@ -0,0 +1,267 @@
+"""
+Vectorized calibration transforms
+캘리브레이션 변환(geometric / polynomial / rbf)을 시선 시퀀스 전체에 한 번에 적용하기 위한 numpy 유틸리티
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# gaze_to_screen_coords 와 동일한 스케일링 팩터
+SCALE_FACTOR = 800
+
+# 프로세스 전역 캘리브레이션 모델 캐시 크기 (사용자 세션 수 기준)
+CALIBRATION_CACHE_SIZE = 64
+
+
+def gaze_vectors_to_angles(gaze_vectors):
+    """(N,3) 시선 벡터 → (N,2) [yaw, pitch] 각도"""
+    v = np.asarray(gaze_vectors, dtype=np.float64).reshape(-1, 3)
+    yaw = np.arctan2(-v[:, 0], -v[:, 2])
+    pitch = np.arcsin(-v[:, 1])
+    return np.column_stack((yaw, pitch))
+
+
+def angles_to_screen_coords(angles, window_width, window_height, scale_factor=SCALE_FACTOR):
+    """(N,2) 각도 → (N,2) 원시 화면 좌표 (정수, 범위 제한 없음)"""
+    center = np.array([window_width / 2, window_height / 2])
+    return np.trunc(np.tan(angles) * scale_factor + center).astype(np.int64)
+
+
+def _thin_plate(r):
+    # xlogy(r**2, r): r=0 에서 0
+    return r ** 2 * np.log(np.where(r > 0, r, 1.0))
+
+
+# scipy.interpolate.Rbf 와 동일한 기저 함수 (epsilon 으로 스케일)
+_RBF_KERNELS = {
+    "multiquadric": lambda r, eps: np.sqrt((r / eps) ** 2 + 1),
+    "inverse_multiquadric": lambda r, eps: 1.0 / np.sqrt((r / eps) ** 2 + 1),
+    "gaussian": lambda r, eps: np.exp(-(r / eps) ** 2),
+    "linear": lambda r, eps: r,
+    "cubic": lambda r, eps: r ** 3,
+    "quintic": lambda r, eps: r ** 5,
+    "thin_plate": lambda r, eps: _thin_plate(r),
+}
+_RBF_ALIASES = {"inverse": "inverse_multiquadric", "thin-plate": "thin_plate"}
+
+
+class CompiledTransform:
+    """fit 이 끝난 캘리브레이션 모델을 numpy 연산만으로 적용할 수 있게 보관
+
+    - polynomial: PolynomialFeatures 지수 행렬 + 계수 행렬 (sklearn 호출 없이 matmul 한 번)
+    - geometric: 3x3 homography 또는 2x3 affine 행렬
+    - rbf: 중심점/가중치/epsilon/기저 함수 (scipy Rbf 없이 거리 행렬 한 번으로 평가)
+
+    to_dict()/from_dict() 로 JSON 직렬화되어 다시 fit 하지 않고 복원 가능
+    """
+
+    def __init__(self, method, matrix=None, powers=None, weights=None, intercept=None,
+                 centers=None, epsilon=None, function=None):
+        self.method = method
+        self.matrix = matrix
+        self.powers = powers
+        self.weights = weights        # polynomial: (F,2) 계수 / rbf: (M,2) 노드 가중치
+        self.intercept = intercept
+        self.centers = centers        # rbf: (M,2) 중심점
+        self.epsilon = epsilon
+        self.function = function
+
+    @classmethod
+    def from_polynomial(cls, poly_model_x, poly_model_y):
+        """학습된 Pipeline(PolynomialFeatures + LinearRegression) 두 개를 계수 행렬로 컴파일"""
+        powers = np.asarray(poly_model_x.named_steps['poly'].powers_, dtype=np.int64)
+        weights = np.column_stack((
+            poly_model_x.named_steps['linear'].coef_,
+            poly_model_y.named_steps['linear'].coef_
+        )).astype(np.float64)
+        intercept = np.array([
+            float(poly_model_x.named_steps['linear'].intercept_),
+            float(poly_model_y.named_steps['linear'].intercept_)
+        ])
+        return cls("polynomial", powers=powers, weights=weights, intercept=intercept)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        return cls("geometric", matrix=np.asarray(matrix, dtype=np.float64))
+
+    @classmethod
+    def from_rbf(cls, rbf_x, rbf_y):
+        """같은 중심점으로 학습된 scipy Rbf 두 개(x, y)를 컴파일"""
+        function = rbf_x.function
+        if not isinstance(function, str):
+            raise ValueError("Only named RBF functions can be compiled")
+        function = _RBF_ALIASES.get(function.lower(), function.lower())
+        if function not in _RBF_KERNELS:
+            raise ValueError(f"Unsupported RBF function: {function}")
+
+        return cls(
+            "rbf",
+            centers=np.asarray(rbf_x.xi, dtype=np.float64).T,
+            weights=np.column_stack((rbf_x.nodes, rbf_y.nodes)).astype(np.float64),
+            epsilon=float(rbf_x.epsilon),
+            function=function
+        )
+
+    def to_dict(self):
+        """JSON 직렬화 가능한 형태"""
+        data = {"method": self.method}
+        if self.method == "polynomial":
+            data.update({
+                "powers": self.powers.tolist(),
+                "weights": self.weights.tolist(),
+                "intercept": self.intercept.tolist()
+            })
+        elif self.method == "geometric":
+            data["matrix"] = self.matrix.tolist()
+        elif self.method == "rbf":
+            data.update({
+                "centers": self.centers.tolist(),
+                "weights": self.weights.tolist(),
+                "epsilon": self.epsilon,
+                "function": self.function
+            })
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        method = data["method"]
+        if method == "polynomial":
+            return cls(
+                method,
+                powers=np.asarray(data["powers"], dtype=np.int64),
+                weights=np.asarray(data["weights"], dtype=np.float64),
+                intercept=np.asarray(data["intercept"], dtype=np.float64)
+            )
+        if method == "geometric":
+            return cls.from_matrix(data["matrix"])
+        if method == "rbf":
+            return cls(
+                method,
+                centers=np.asarray(data["centers"], dtype=np.float64),
+                weights=np.asarray(data["weights"], dtype=np.float64),
+                epsilon=float(data["epsilon"]),
+                function=data["function"]
+            )
+        raise ValueError(f"Unsupported transform method: {method}")
+
+    def predict(self, angles):
+        """(N,2) [yaw, pitch] → (N,2) 실수 화면 좌표. 변환이 불가능한 행은 NaN"""
+        angles = np.asarray(angles, dtype=np.float64).reshape(-1, 2)
+
+        if self.method == "polynomial":
+            features = np.prod(angles[:, None, :] ** self.powers[None, :, :], axis=2)
+            return features @ self.weights + self.intercept
+
+        if self.method == "geometric":
+            homo = np.column_stack((angles, np.ones(len(angles))))
+            result = homo @ self.matrix.T
+            if self.matrix.shape[0] == 3:  # Homography
+                w = result[:, 2:3]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return np.where(w != 0, result[:, :2] / w, np.nan)
+            return result[:, :2]  # Affine
+
+        if self.method == "rbf":
+            r = np.sqrt(np.sum((angles[:, None, :] - self.centers[None, :, :]) ** 2, axis=2))
+            return _RBF_KERNELS[self.function](r, self.epsilon) @ self.weights
+
+        raise ValueError(f"Unsupported transform method: {self.method}")
+
+
+def apply_compiled_transform(compiled, angles, fallback, window_width, window_height):
+    """보정 좌표 (N,2) 정수 배열 반환
+
+    변환 결과는 화면 범위로 제한하고, 변환이 불가능한 행(또는 compiled 가 None)은
+    fallback(범위 제한 없는 원시 좌표)을 그대로 사용 — GazeTracker.apply_transform 과 동일한 규칙
+    """
+    out = np.array(fallback, dtype=np.int64, copy=True)
+    if compiled is None or len(out) == 0:
+        return out
+
+    pred = compiled.predict(angles)
+    valid = np.all(np.isfinite(pred), axis=1)
+    upper = np.array([window_width - 1, window_height - 1])
+    out[valid] = np.clip(np.trunc(pred[valid]), 0, upper).astype(np.int64)
+    return out
+
+
+# ===============================
+# fit 결과 캐시 (캘리브레이션 데이터 해시 기준)
+# ===============================
+# 변환 결과에 영향을 주는 필드만 해시 (timestamp 등 메타데이터는 제외)
+_CALIBRATION_KEY_FIELDS = (
+    "calibration_vectors", "calibration_points", "transform_method", "transform_matrix", "compiled_transform"
+)
+
+
+def calibration_key(calib_data):
+    """캘리브레이션 데이터의 안정적인 해시 키 (sha256 hex)"""
+    payload = {field: calib_data.get(field) for field in _CALIBRATION_KEY_FIELDS}
+    payload["degree"] = (calib_data.get("polynomial_models") or {}).get("degree")
+    encoded = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(',', ':'),
+        default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o)
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TransformCache:
+    """fit 이 끝난 변환 모델을 보관하는 스레드 안전 LRU 캐시
+
+    값은 읽기 전용으로 공유되므로 여러 요청/트래커 인스턴스가 동시에 사용해도 안전
+    """
+
+    def __init__(self, maxsize=CALIBRATION_CACHE_SIZE):
+        self.maxsize = max(1, int(maxsize))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+
+
+transform_cache = TransformCache()
+
+
+def get_transform_cache_stats():
+    """캘리브레이션 모델 캐시 hit/miss 통계"""
+    return transform_cache.stats()
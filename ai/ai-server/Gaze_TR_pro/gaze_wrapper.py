@@ -8,6 +8,7 @@ import json
 from typing import Dict, Any, Optional
 from gaze_tracking import GazeTracker
 from calibration_manager import CalibrationManager
+from gaze_heatmap import bin_grid_indices, gaussian_kernel, splat_gaussian
 
 def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -25,7 +26,7 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
         import numpy as np
         from datetime import datetime
         
-        # 트래커 초기화
+        # 트래커 세션 생성 (ptgaze 모델은 프로세스 공유, 최초 1회만 로드)
         tracker = GazeTracker()
         
         # 캘리브레이션 데이터 로드 (선택적)
@@ -67,6 +68,8 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
         heatmap_width = 160
         heatmap_data = np.zeros((heatmap_height, heatmap_width))
         
+        heatmap_xs = []
+        heatmap_ys = []
         gaze_points = []
         frame_count = 0
         processed_frames = 0
@@ -84,33 +87,19 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
                 continue
             
             try:
-                # 시선 추적 수행
-                gaze_result = tracker.process_frame(frame)
+                # 시선 추적 수행 (보정 좌표, 캘리브레이션이 없으면 원시 좌표)
+                gaze_result = tracker.process_frame(frame, timestamp=frame_count / fps)
                 
                 if gaze_result is not None and len(gaze_result) >= 2:
                     gx, gy = gaze_result[0], gaze_result[1]
                     
                     # 화면 좌표를 0-1 범위로 정규화
-                    if calibration_loaded:
-                        # 캘리브레이션이 있으면 변환된 좌표 사용
-                        norm_x = max(0, min(1, gx))
-                        norm_y = max(0, min(1, gy))
-                    else:
-                        # 캘리브레이션이 없으면 기본 변환 적용
-                        norm_x = max(0, min(1, (gx + 1) / 2))  # -1~1 -> 0~1
-                        norm_y = max(0, min(1, (gy + 1) / 2))
+                    norm_x = max(0, min(1, gx / tracker.WINDOW_WIDTH))
+                    norm_y = max(0, min(1, gy / tracker.WINDOW_HEIGHT))
                     
-                    # 히트맵 좌표로 변환
-                    hx = int(norm_x * (heatmap_width - 1))
-                    hy = int(norm_y * (heatmap_height - 1))
-                    
-                    # 히트맵에 가중치 추가 (가우시안 분포)
-                    for dy in range(-2, 3):
-                        for dx in range(-2, 3):
-                            nx, ny = hx + dx, hy + dy
-                            if 0 <= nx < heatmap_width and 0 <= ny < heatmap_height:
-                                weight = np.exp(-(dx*dx + dy*dy) / 2.0)
-                                heatmap_data[ny, nx] += weight
+                    # 히트맵 좌표로 변환 (가우시안 가중치는 루프 종료 후 한 번에 적용)
+                    heatmap_xs.append(int(norm_x * (heatmap_width - 1)))
+                    heatmap_ys.append(int(norm_y * (heatmap_height - 1)))
                     
                     # 시간스탬프 계산
                     timestamp = frame_count / fps
@@ -131,16 +120,18 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
         
         cap.release()
         
+        # 히트맵에 가중치 추가 (5x5 가우시안 분포)
+        if heatmap_xs:
+            counts = bin_grid_indices(heatmap_xs, heatmap_ys, heatmap_width, heatmap_height)
+            heatmap_data = splat_gaussian(counts, gaussian_kernel(2, 1.0))
+        
         # 결과가 없으면 기본 데이터 생성
         if processed_frames == 0:
             # 중앙 영역에 기본 패턴 생성
             center_x, center_y = heatmap_width // 2, heatmap_height // 2
-            for dy in range(-10, 11):
-                for dx in range(-15, 16):
-                    nx, ny = center_x + dx, center_y + dy
-                    if 0 <= nx < heatmap_width and 0 <= ny < heatmap_height:
-                        weight = np.exp(-(dx*dx/200 + dy*dy/100))
-                        heatmap_data[ny, nx] = weight * 50
+            dy = np.arange(-10, 11)[:, None]
+            dx = np.arange(-15, 16)[None, :]
+            heatmap_data[center_y - 10:center_y + 11, center_x - 15:center_x + 16] = np.exp(-(dx*dx/200 + dy*dy/100)) * 50
             
             # 기본 시선 포인트 생성
             for i in range(20):
@@ -154,6 +145,12 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
                     "confidence": 0.45
                 })
         
+        # fixation 목록 (트래커가 기록과 동시에 검출, 좌표는 0-1 범위로 정규화)
+        fixations = [
+            {**fx, "x": round(fx["x"] / tracker.WINDOW_WIDTH, 4), "y": round(fx["y"] / tracker.WINDOW_HEIGHT, 4)}
+            for fx in tracker.gaze_data.timeline("fixations")
+        ]
+        
         # 히트맵 정규화 및 분석
         if heatmap_data.sum() > 0:
             heatmap_data = heatmap_data / heatmap_data.max() * 100
@@ -193,11 +190,13 @@ def infer_gaze(video_path: str, calib_path: Optional[str] = None) -> Dict[str, A
             },
             "heatmap_data": heatmap_data.tolist(),
             "gaze_points": gaze_points[-100:],  # 최근 100개만
+            "fixations": fixations,
             "analysis": {
                 "center_gaze_percentage": round(center_percentage, 1),
                 "peripheral_gaze_percentage": round(100 - center_percentage, 1),
                 "gaze_distribution": distribution,
                 "total_gaze_points": len(gaze_points),
+                "fixation_summary": tracker.gaze_data.fixation_summary(),
                 "average_confidence": round(np.mean([p["confidence"] for p in gaze_points]) if gaze_points else 0.5, 2)
             }
         }
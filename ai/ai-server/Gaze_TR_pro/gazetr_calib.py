@@ -12,6 +12,7 @@ import matplotlib.pyplot as plt
 from collections import defaultdict
 from datetime import datetime
 import json
+from gaze_heatmap import accumulate_heatmap
 
 # NumPy compatibility fix for versions >= 1.20
 import warnings
@@ -340,16 +341,8 @@ def add_gaze_to_heatmap(x, y):
     if gaze_heatmap_2d is None:
         initialize_gaze_heatmap()
     
-    # 좌표를 격자 인덱스로 변환
-    grid_x = int(x / (WINDOW_WIDTH / HEATMAP_GRID_W))
-    grid_y = int(y / (WINDOW_HEIGHT / HEATMAP_GRID_H))
-    
-    # 경계 확인
-    grid_x = max(0, min(grid_x, HEATMAP_GRID_W - 1))
-    grid_y = max(0, min(grid_y, HEATMAP_GRID_H - 1))
-    
-    # 해당 격자의 응시 횟수 증가
-    gaze_heatmap_2d[grid_y][grid_x] += 1
+    # 좌표를 격자 인덱스로 변환 후 해당 격자의 응시 횟수 증가 (경계는 격자 범위로 제한)
+    accumulate_heatmap([(x, y)], WINDOW_WIDTH, WINDOW_HEIGHT, HEATMAP_GRID_W, HEATMAP_GRID_H, out=gaze_heatmap_2d)
 
 
 def save_gaze_heatmap_2d(filename=None):
@@ -0,0 +1,200 @@
+"""
+Low-latency live capture
+캡처 스레드가 단일 슬롯 버퍼에 최신 프레임만 남기고, 추론 루프는 항상 가장 최근 프레임을 처리
+(추론이 느리면 밀린 프레임은 버려서 지연이 누적되지 않음)
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# 지연 통계에 보관할 최근 프레임 수
+LATENCY_WINDOW = 10000
+
+
+class LiveCapture:
+    """캡처 스레드 + 단일 슬롯 버퍼
+
+    source 는 cv2.VideoCapture 처럼 read() -> (ret, frame) 를 제공하면 됨
+    source 에 last_capture_time 속성이 있으면 그 값을 캡처 시각으로 사용 (합성 소스)
+    release_source=True 면 source.release() 는 캡처 스레드가 마지막 read() 를 마친 뒤 직접 호출
+    (stop() 의 join 이 시간 초과돼도 read 중인 소스를 다른 스레드에서 해제하지 않음)
+    """
+
+    def __init__(self, source, clock=time.perf_counter, release_source=False):
+        self.source = source
+        self.clock = clock
+        self.release_source = release_source
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = None
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-capture", daemon=True)
+        self.captured = 0
+        self.dropped = 0  # 처리되기 전에 새 프레임으로 덮어써진 프레임 수
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.source.read()
+                if not ret:
+                    break
+                captured_at = getattr(self.source, "last_capture_time", None)
+                if captured_at is None:
+                    captured_at = self.clock()
+                with self._cond:
+                    if self._frame is not None:
+                        self.dropped += 1
+                    self._frame, self._captured_at = frame, captured_at
+                    self.captured += 1
+                    self._cond.notify()
+        finally:
+            if self.release_source:
+                self.source.release()
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    def latest(self, timeout=0.5):
+        """가장 최근 프레임 (frame, captured_at). 새 프레임이 없으면 대기, 소스가 끝나면 None"""
+        with self._cond:
+            while self._frame is None:
+                if self._closed:
+                    return None
+                self._cond.wait(timeout)
+            item = (self._frame, self._captured_at)
+            self._frame = None
+            return item
+
+    def frames(self, duration_seconds=None, max_frames=None):
+        """최신 프레임 이터레이터 (시간/개수 제한 또는 소스 종료까지)"""
+        deadline = self.clock() + duration_seconds if duration_seconds else None
+        count = 0
+        while max_frames is None or count < max_frames:
+            if deadline is not None and self.clock() >= deadline:
+                break
+            item = self.latest()
+            if item is None:
+                break
+            count += 1
+            yield item
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread.ident is None:
+            # 시작 전이면 스레드가 해제할 수 없으므로 여기서 해제
+            if self.release_source:
+                self.source.release()
+            return
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            print("[WARNING] Capture thread still in read(); source will be released when it exits")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class LatencyStats:
+    """프레임별 캡처→결과 지연 통계"""
+
+    def __init__(self, clock=time.perf_counter, window=LATENCY_WINDOW):
+        self.clock = clock
+        self._latencies = deque(maxlen=window)
+        self.processed = 0
+        self._first = None
+        self._last = None
+
+    def record(self, captured_at, finished_at=None):
+        finished_at = self.clock() if finished_at is None else finished_at
+        self._latencies.append(finished_at - captured_at)
+        self.processed += 1
+        if self._first is None:
+            self._first = finished_at
+        self._last = finished_at
+
+    def summary(self, capture=None):
+        """지연(ms) 평균/p50/p95/최대 + 처리 fps (capture 를 주면 캡처/드롭 수 포함)"""
+        result = {"processed": self.processed}
+        if self._latencies:
+            ms = np.asarray(self._latencies) * 1000
+            result.update({
+                "latency_mean_ms": round(float(ms.mean()), 1),
+                "latency_p50_ms": round(float(np.percentile(ms, 50)), 1),
+                "latency_p95_ms": round(float(np.percentile(ms, 95)), 1),
+                "latency_max_ms": round(float(ms.max()), 1)
+            })
+        if self.processed > 1 and self._last > self._first:
+            result["processed_fps"] = round((self.processed - 1) / (self._last - self._first), 1)
+        if capture is not None:
+            result["captured"] = capture.captured
+            result["dropped"] = capture.dropped
+        return result
+
+
+class SyntheticVideoSource:
+    """웹캠 대용 합성 소스 (cv2.VideoCapture 호환: read/isOpened/release/set)
+
+    frames 를 fps 속도로 실시간 재생. 읽는 쪽이 늦어도 프레임 i 의 캡처 시각은 start + i / fps
+    (웹캠 드라이버 버퍼에 쌓인 프레임을 뒤늦게 읽는 상황과 동일)
+    """
+
+    def __init__(self, frames, fps=30.0, loop=False, clock=time.perf_counter):
+        self.frames = frames
+        self.fps = float(fps)
+        self.loop = loop
+        self.clock = clock
+        self._index = 0
+        self._start = None
+        self._opened = True
+        self.last_capture_time = None
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False
+
+    def read(self):
+        if not self._opened or (self._index >= len(self.frames) and not self.loop):
+            return False, None
+        if self._start is None:
+            self._start = self.clock()
+
+        scheduled = self._start + self._index / self.fps
+        wait = scheduled - self.clock()
+        if wait > 0:
+            time.sleep(wait)
+
+        frame = self.frames[self._index % len(self.frames)]
+        self._index += 1
+        self.last_capture_time = scheduled
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def run_live_loop(source, process_fn, duration_seconds=None, max_frames=None, on_result=None):
+    """캡처 스레드 + 최신 프레임 처리 루프, 지연 통계 반환
+
+    process_fn(frame) -> result, on_result(frame, result) 가 False 를 반환하면 종료
+    """
+    stats = LatencyStats()
+    with LiveCapture(source) as capture:
+        for frame, captured_at in capture.frames(duration_seconds, max_frames):
+            result = process_fn(frame)
+            stats.record(captured_at)
+            if on_result is not None and on_result(frame, result) is False:
+                break
+    return stats.summary(capture)
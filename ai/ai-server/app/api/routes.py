@@ -2,42 +2,54 @@
 from __future__ import annotations
 
 import ast
+import asyncio
 import json
 import logging
 import re
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 from uuid import UUID
 
 import httpx
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
+from decouple import config
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from sqlalchemy import or_
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal, get_db
-from app.models import EvaluationSession, QuestionAnswerPair, generate_uuid
+from app.models import EVAL_CLAIMED, EvaluationSession, QuestionAnswerPair, generate_uuid
 from app.schemas import EvaluationSessionRead
 from app.services.analysis_db_service import get_or_create_qa_pair, save_results_to_qa
 from app.services.analysis_service import analyze_all
 from app.services.face_service import infer_face_video as infer_face
 from app.services.gaze_service import infer_gaze
+from app.utils.gms_cache import gms_cache_metrics
+from app.utils.gms_governor import governor_metrics
+from app.utils.http_client import get_http_client, http_client_metrics
+from app.utils.local_stt import local_stt_metrics
+from app.utils.stt_stream import StreamClosedError, get_stream, open_stream, pop_stream
+from app.utils.heatmap_codec import DEFAULT_HEATMAP_FORMAT, encode_heatmaps_in, negotiate_heatmap_format
 from app.utils.posture import analyze_video_bytes
 from app.utils.urls import to_files_relative
 from app.utils.uuid_tools import to_uuid_bytes, to_uuid_str
 from app.utils.gpt import (
-    ask_gpt_if_ends_async,
+    evaluate_answers_async,
+    evaluate_answers_batched_async,
     generate_followup_question,
     generate_initial_question,
     generate_second_followup_question,
-    parse_gpt_result,
+    gpt_usage_metrics,
 )
 from app.utils.stt import (
     transcribe_audio_async,  # 레거시
     transcribe_audio_bytes,
+    transcribe_audio_verbose,
     transcribe_and_analyze,
+    analyze_speech_rate_async,
+    STT_BACKEND,
 )
 
 router = APIRouter()
@@ -45,6 +57,13 @@ log = logging.getLogger(__name__)
 
 MAX_FOLLOWUPS_PER_ORDER = 2
 
+# 답변 평가를 세션 마지막 답변 이후 일괄로 (실시간 평가 결과를 보여주지 않는 세션용, 요청의 deferred_eval 로 덮어씀)
+GPT_EVAL_DEFERRED = config('GPT_EVAL_DEFERRED', default=False, cast=bool)
+# 꼬리질문 생성 실패 시 503 응답의 Retry-After (초)
+FOLLOWUP_RETRY_AFTER_S = config('FOLLOWUP_RETRY_AFTER_S', default=2, cast=int)
+# 일괄 평가 선점(end_type=EVALUATING)이 이보다 오래되면 평가하던 워커가 죽은 것으로 보고 다시 선점 (초)
+BATCH_EVAL_LEASE_S = config('BATCH_EVAL_LEASE_S', default=300, cast=int)
+
 def _parse_questions_list(qs_raw):
     if isinstance(qs_raw, list):
         return [str(x).strip() for x in qs_raw]
@@ -67,7 +86,16 @@ def _parse_questions_list(qs_raw):
             return [x.strip() for x in items]
     raise HTTPException(status_code=500, detail="GPT 질문 파싱 실패")
 
+_EVAL_LEVELS = ("OUTSTANDING", "NORMAL", "INADEQUATE")
+
 def map_end_type(result: Dict[str, Any]) -> str:
+    level = result.get("end_level")
+    if level in _EVAL_LEVELS:
+        # JSON 모드 등급. is_ended 와 어긋나면 is_ended 를 따름
+        if not result.get("is_ended"):
+            return "INADEQUATE"
+        return "NORMAL" if level == "INADEQUATE" else level
+    # 텍스트 모드: 근거 문장 키워드
     reason = (result.get("reason_end") or "").lower()
     if result.get("is_ended") and any(k in reason for k in ("깔끔", "명확", "완결")):
         return "OUTSTANDING"
@@ -76,6 +104,9 @@ def map_end_type(result: Dict[str, Any]) -> str:
     return "INADEQUATE"
 
 def map_stop_words(result: Dict[str, Any]) -> str:
+    if result.get("filler_level") in _EVAL_LEVELS:
+        return result["filler_level"]
+    # 텍스트 모드: 코멘트 키워드
     comment = (result.get("gpt_comment") or "").lower()
     if "추임새 거의 없음" in comment or "매우 깔끔" in comment:
         return "OUTSTANDING"
@@ -83,20 +114,82 @@ def map_stop_words(result: Dict[str, Any]) -> str:
         return "NORMAL"
     return "INADEQUATE"
 
+def _eval_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """GPT 평가 결과 → QuestionAnswerPair 컬럼 값 (실시간/일괄 평가 공통)"""
+    return {
+        "end_type": map_end_type(result),
+        "reason_end": result.get("reason_end", ""),
+        "context_matched": result.get("context_matched", False),
+        "reason_context": result.get("reason_context", ""),
+        "gpt_comment": result.get("gpt_comment", ""),
+        "stopwords": map_stop_words(result),
+    }
+
+async def _noop():
+    return None
+
 def _is_unanswered(col):
     return or_(col.is_(None), col == "")
 
+def _is_followup_placeholder(pair: QuestionAnswerPair) -> bool:
+    """꼬리질문 생성이 실패해 질문이 빈 채로 저장된 행 (다음 요청에서 재생성)"""
+    return pair.sub_order > 0 and not (pair.question or "").strip()
+
+def _followup_unavailable(order: int, sub_order: int) -> JSONResponse:
+    """꼬리질문 생성 실패 → 재시도 가능한 503 (같은 order 로 다시 요청하면 질문을 재생성)"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "꼬리질문 생성 실패, 잠시 후 다시 요청하세요.",
+            "retryable": True,
+            "order": order,
+            "sub_order": sub_order,
+        },
+        headers={"Retry-After": str(FOLLOWUP_RETRY_AFTER_S)},
+    )
+
+async def _regenerate_followup(db: Session, pair: QuestionAnswerPair, client: httpx.AsyncClient) -> Optional[str]:
+    """빈 질문 행의 꼬리질문을 같은 order 의 이전 질문/답변으로 다시 생성 (실패 시 None)"""
+    prev = {
+        row.sub_order: row
+        for row in db.query(QuestionAnswerPair).filter(
+            QuestionAnswerPair.session_id == pair.session_id,
+            QuestionAnswerPair.order == pair.order,
+            QuestionAnswerPair.sub_order < pair.sub_order,
+        )
+    }
+    base, follow1 = prev.get(0), prev.get(1)
+    try:
+        if pair.sub_order == 1:
+            next_q = await generate_followup_question(base.question, base.answer or "", client=client)
+        else:
+            next_q = await generate_second_followup_question(
+                base_question=base.question,
+                answer1=base.answer or "",
+                followup1=follow1.question,
+                answer2=follow1.answer or "",
+                client=client,
+            )
+    except Exception as e:
+        log.error("[followup] 꼬리질문 재생성 실패: %s", e)
+        return None
+    return (next_q or "").strip() or None
+
 class PromptStartRequest(BaseModel):
     userId: UUID
     text: str
 
 @router.post("/v1/prompt-start", response_model=EvaluationSessionRead)
-async def prompt_start(payload: PromptStartRequest, db: Session = Depends(get_db)):
+async def prompt_start(
+    payload: PromptStartRequest,
+    db: Session = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     try:
         user_id = payload.userId
         text = payload.text
 
-        qs_raw = await generate_initial_question(text)
+        qs_raw = await generate_initial_question(text, client=client)
         qs = _parse_questions_list(qs_raw)
         if not qs:
             raise HTTPException(status_code=500, detail="GPT 질문 생성 실패")
@@ -147,11 +240,19 @@ async def followup_question(
     session_id: str = Form(...),
     order: int = Form(...),
     sub_order: int = Form(...),
-    audio: UploadFile = File(...),
+    audio: Optional[UploadFile] = File(None),
+    stream_id: Optional[str] = Form(None),
     question_index: Optional[int] = Form(None),
+    deferred_eval: Optional[bool] = Form(None),
     db: Session = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
+    deferred = GPT_EVAL_DEFERRED if deferred_eval is None else deferred_eval
+    # 스트림은 어느 경로로 끝나든(조기 반환/오류 포함) 먼저 레지스트리에서 꺼내고 finally 에서 정리
+    stream = pop_stream(stream_id) if stream_id else None
     try:
+        if stream_id and stream is None:
+            raise HTTPException(status_code=404, detail="stream_id 에 해당하는 스트림이 없습니다.")
         try:
             session_uuid = UUID(session_id.strip())
         except Exception:
@@ -182,7 +283,11 @@ async def followup_question(
                       .first()
                 )
                 if (base.answer or "") != "" and not follow1:
-                    next_q = await generate_followup_question(base.question, base.answer or "")
+                    try:
+                        next_q = await generate_followup_question(base.question, base.answer or "", client=client)
+                    except Exception as e:
+                        log.error("[followup] 꼬리질문 생성 실패: %s", e)
+                        return _followup_unavailable(order, 1)
                     current = QuestionAnswerPair(
                         session_id=session_val,
                         order=order,
@@ -209,12 +314,17 @@ async def followup_question(
                               .first()
                         )
                         if not follow2:
-                            next_q = await generate_second_followup_question(
-                                base_question=base.question,
-                                answer1=base.answer or "",
-                                followup1=follow1.question,
-                                answer2=follow1.answer or "",
-                            )
+                            try:
+                                next_q = await generate_second_followup_question(
+                                    base_question=base.question,
+                                    answer1=base.answer or "",
+                                    followup1=follow1.question,
+                                    answer2=follow1.answer or "",
+                                    client=client,
+                                )
+                            except Exception as e:
+                                log.error("[followup] 꼬리질문 생성 실패: %s", e)
+                                return _followup_unavailable(order, 2)
                             current = QuestionAnswerPair(
                                 session_id=session_val,
                                 order=order,
@@ -248,11 +358,30 @@ async def followup_question(
 
         if not current:
             log.info("[followup] no unanswered rows found → finished")
+            # 이전 일괄 평가가 실패해 남은 답변이 있으면 다시 시도
+            background_tasks.add_task(_bg_evaluate_session, session_val)
             return {"finished": True, "analysis": None}
 
         log.info("[followup] session=%s -> current(order=%s, sub=%s, id=%s)",
                  to_uuid_str(session_val), current.order, current.sub_order, to_uuid_str(current.id))
 
+        if _is_followup_placeholder(current):
+            # 이전 요청에서 꼬리질문 생성이 실패해 빈 질문으로 남은 행 → 질문만 재생성해서 반환 (오디오는 사용 안 함)
+            next_q = await _regenerate_followup(db, current, client)
+            if next_q is None:
+                return _followup_unavailable(current.order, current.sub_order)
+            current.question = next_q
+            db.add(current)
+            db.commit()
+            log.info("[followup] regenerated placeholder, order=%s, sub=%s", current.order, current.sub_order)
+            return {
+                "order": current.order,
+                "sub_order": current.sub_order,
+                "question": next_q,
+                "switch_order": False,
+                "analysis": None,
+            }
+
         raw_q = (current.question or "").strip()
         if raw_q.startswith("["):
             try:
@@ -271,51 +400,40 @@ async def followup_question(
             db.commit()
             db.refresh(current)
 
-        audio_bytes = await audio.read()
-        filename = audio.filename or "audio.wav"
-        content_type = audio.content_type or "audio/wav"
-        if not audio_bytes:
-            raise HTTPException(status_code=400, detail="오디오가 비어있습니다.")
-
-        answer = await transcribe_audio_bytes(audio_bytes, filename, content_type)
-
-        try:
-            gpt_text = await ask_gpt_if_ends_async([current.question], [answer])
-            parsed = parse_gpt_result(gpt_text) or []
-        except Exception as ge:
-            log.error("[followup] GPT 호출 실패: %s", ge)
-            parsed = []
-
-        if not parsed:
-            parsed = [{
-                "is_ended": False,
-                "reason_end": "파싱/호출 실패",
-                "context_matched": True,
-                "reason_context": "임시 기본값",
-                "gpt_comment": "임시 기본값",
-            }]
-
-        res = parsed[0]
-        is_ended = bool(res.get("is_ended", False))
-        log.info("[followup] ended=%s, order=%s, sub=%s", is_ended, current.order, current.sub_order)
-
-        current.answer = answer
-        current.end_type = map_end_type(res)
-        current.reason_end = res.get("reason_end", "")
-        current.context_matched = res.get("context_matched", False)
-        current.reason_context = res.get("reason_context", "")
-        current.gpt_comment = res.get("gpt_comment", "")
-        current.stopwords = map_stop_words(res)
-        db.add(current)
-        db.commit()
-        db.refresh(current)
-
-        background_tasks.add_task(_bg_analyze_and_persist, current.id, audio_bytes)
-
-        if current.sub_order < MAX_FOLLOWUPS_PER_ORDER:
-            if current.sub_order == 0:
-                next_q = await generate_followup_question(current.question, answer)
-            else:
+        analysis = None
+        if stream is not None:
+            # 스트리밍 STT: 녹음 중 닫힌 구간은 이미 STT 됨 → 마지막 구간만 처리 후 이어 붙임
+            streamed = await stream.finish()
+            transcription, analysis = streamed["transcription"], streamed["analysis"]
+            audio_bytes = stream.wav_bytes()
+            if transcription is None:
+                log.warning("[followup] 스트림 구간 STT 전부 실패 → 전체 오디오로 재시도")
+                transcription = await transcribe_audio_verbose(audio_bytes, "audio.wav", "audio/wav", client=client)
+        else:
+            if audio is None:
+                raise HTTPException(status_code=400, detail="audio 또는 stream_id 가 필요합니다.")
+            audio_bytes = await audio.read()
+            filename = audio.filename or "audio.wav"
+            content_type = audio.content_type or "audio/wav"
+            if not audio_bytes:
+                raise HTTPException(status_code=400, detail="오디오가 비어있습니다.")
+
+            # verbose_json 1회 호출: text 는 여기서, segments 는 백그라운드 발화 속도 분석에서 재사용
+            transcription = await transcribe_audio_verbose(audio_bytes, filename, content_type, client=client)
+        answer = transcription.get("text", "") if transcription else "[음성 인식 실패]"
+
+        # 다음 꼬리질문은 질문/답변 텍스트에만 의존 → 답변 평가와 동시에 생성
+        next_sub = current.sub_order + 1
+        need_followup = current.sub_order < MAX_FOLLOWUPS_PER_ORDER
+        existing_next = None
+        q0 = None
+        if need_followup:
+            existing_next = (
+                db.query(QuestionAnswerPair)
+                  .filter_by(session_id=session_val, order=current.order, sub_order=next_sub)
+                  .first()
+            )
+            if current.sub_order > 0 and existing_next is None:
                 q0 = (
                     db.query(QuestionAnswerPair)
                       .filter_by(session_id=session_val, order=current.order, sub_order=0)
@@ -323,49 +441,90 @@ async def followup_question(
                 )
                 if not q0:
                     raise HTTPException(status_code=404, detail="첫 질문이 존재하지 않습니다.")
-                next_q = await generate_second_followup_question(
-                    base_question=q0.question,
-                    answer1=q0.answer or "",
-                    followup1=current.question,
-                    answer2=answer,
-                )
 
-            exists = (
-                db.query(QuestionAnswerPair.id)
-                  .filter_by(session_id=session_val,
-                             order=current.order,
-                             sub_order=current.sub_order + 1)
-                  .first()
+        def _followup_call():
+            if current.sub_order == 0:
+                return generate_followup_question(current.question, answer, client=client)
+            return generate_second_followup_question(
+                base_question=q0.question,
+                answer1=q0.answer or "",
+                followup1=current.question,
+                answer2=answer,
+                client=client,
             )
-            if not exists:
-                new_pair = QuestionAnswerPair(
-                    session_id=session_val,
-                    order=current.order,
-                    sub_order=current.sub_order + 1,
-                    question=next_q.strip(),
-                    answer=None,
-                    is_ended=False,
-                    reason_end="",
-                    context_matched=False,
-                    reason_context="",
-                    gpt_comment="",
-                    end_type="",
-                    stopwords="",
-                    created_at=datetime.utcnow(),
-                )
-                db.add(new_pair)
-                db.commit()
-                db.refresh(new_pair)
-            else:
-                new_pair = (
-                    db.query(QuestionAnswerPair)
-                      .filter_by(session_id=session_val,
-                                 order=current.order,
-                                 sub_order=current.sub_order + 1)
-                      .first()
-                )
 
-            return {
+        generate = need_followup and existing_next is None
+        eval_result, followup_result = await asyncio.gather(
+            _noop() if deferred else evaluate_answers_async([current.question], [answer], client=client),
+            _followup_call() if generate else _noop(),
+            return_exceptions=True,
+        )
+
+        # 부분 실패 처리: 평가 실패 → 기본값, 꼬리질문 실패 → 빈 질문 행 저장 후 재시도 가능한 503
+        # (일시적 오류 재시도는 gms_governor 가 백오프/재시도 예산 안에서 이미 수행)
+        parsed = []
+        if isinstance(eval_result, BaseException):
+            log.error("[followup] GPT 호출 실패: %s", eval_result)
+        else:
+            parsed = eval_result or []
+
+        next_q = None
+        if generate:
+            if isinstance(followup_result, BaseException):
+                log.error("[followup] 꼬리질문 생성 실패 → 빈 질문 행 저장: %s", followup_result)
+                followup_result = None
+            next_q = (followup_result or "").strip()
+
+        current.answer = answer
+        if deferred:
+            # 평가 컬럼(end_type 등)은 비워 둠 → 세션 마지막 답변 후 _bg_evaluate_session 이 일괄 평가
+            log.info("[followup] deferred eval, order=%s, sub=%s", current.order, current.sub_order)
+        else:
+            if not parsed:
+                parsed = [{
+                    "is_ended": False,
+                    "reason_end": "파싱/호출 실패",
+                    "context_matched": True,
+                    "reason_context": "임시 기본값",
+                    "gpt_comment": "임시 기본값",
+                }]
+
+            res = parsed[0]
+            is_ended = bool(res.get("is_ended", False))
+            log.info("[followup] ended=%s, order=%s, sub=%s", is_ended, current.order, current.sub_order)
+
+            for column, value in _eval_fields(res).items():
+                setattr(current, column, value)
+        db.add(current)
+
+        new_pair = existing_next
+        if new_pair is None and generate:
+            # next_q 가 비어 있으면 placeholder: 다음 요청에서 _regenerate_followup 으로 채움
+            new_pair = QuestionAnswerPair(
+                session_id=session_val,
+                order=current.order,
+                sub_order=next_sub,
+                question=next_q,
+                answer=None,
+                is_ended=False,
+                reason_end="",
+                context_matched=False,
+                reason_context="",
+                gpt_comment="",
+                end_type="",
+                stopwords="",
+                created_at=datetime.utcnow(),
+            )
+            db.add(new_pair)
+
+        # 커밋 후 만료된 속성을 다시 읽지 않도록 응답 값은 미리 확보
+        qa_id, order_now = current.id, current.order
+        followup_resp = None
+        if new_pair is not None and _is_followup_placeholder(new_pair):
+            # 답변/평가는 저장하고 백그라운드 분석도 그대로 진행 (JSONResponse 라 background_tasks 유지)
+            followup_resp = _followup_unavailable(new_pair.order, new_pair.sub_order)
+        elif new_pair is not None:
+            followup_resp = {
                 "order": new_pair.order,
                 "sub_order": new_pair.sub_order,
                 "question": new_pair.question,
@@ -373,11 +532,19 @@ async def followup_question(
                 "analysis": None,
             }
 
+        # 답변 평가 + 다음 꼬리질문을 한 번에 커밋
+        db.commit()
+
+        background_tasks.add_task(_bg_analyze_and_persist, qa_id, audio_bytes, transcription, analysis)
+
+        if followup_resp is not None:
+            return followup_resp
+
         next_row = (
             db.query(QuestionAnswerPair)
               .filter(
                   QuestionAnswerPair.session_id == session_val,
-                  QuestionAnswerPair.order == current.order + 1,
+                  QuestionAnswerPair.order == order_now + 1,
                   QuestionAnswerPair.sub_order == 0,
                   _is_unanswered(QuestionAnswerPair.answer),
               )
@@ -385,13 +552,15 @@ async def followup_question(
         )
         if next_row:
             return {
-                "order": current.order + 1,
+                "order": order_now + 1,
                 "sub_order": 0,
                 "question": next_row.question,
                 "switch_order": True,
                 "analysis": None,
             }
 
+        # 세션 마지막 답변 → 지연 평가로 저장된 답변들을 한 번에 평가
+        background_tasks.add_task(_bg_evaluate_session, session_val)
         return {"finished": True, "analysis": None}
 
     except HTTPException:
@@ -400,6 +569,60 @@ async def followup_question(
         log.error("[followup] unexpected error: %s", e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal error in followup_question")
+    finally:
+        if stream is not None:
+            # finish() 까지 끝났으면 남은 STT 작업이 없어 no-op, 그 전에 끝났으면 진행 중인 구간 STT 취소
+            await stream.cancel()
+
+@router.post("/v1/stt/stream")
+async def stt_stream_open(
+    sample_rate: int = Form(16000),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    # 답변 녹음 시작 시 호출 → 이후 PCM16 mono 청크를 /v1/stt/stream/{stream_id} 로 전송,
+    # 녹음이 끝나면 /v1/followup-question 에 audio 대신 stream_id 전달
+    try:
+        stream_id = open_stream(sample_rate, client=client)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"stream_id": stream_id, "sample_rate": sample_rate, "format": "pcm_s16le"}
+
+@router.post("/v1/stt/stream/{stream_id}")
+async def stt_stream_feed(stream_id: str, request: Request):
+    stream = get_stream(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="stream_id 에 해당하는 스트림이 없습니다.")
+    # 청크 단위 전송(Transfer-Encoding: chunked)도 그대로 흘려 받음
+    try:
+        async for data in request.stream():
+            if data:
+                await stream.feed(data)
+    except StreamClosedError as e:
+        # 녹음 종료(/v1/followup-question 의 finish)와 겹친 늦은 청크
+        raise HTTPException(status_code=409, detail=str(e))
+    return stream.status()
+
+@router.get("/v1/metrics/gms-cache")
+async def gms_cache_stats():
+    return gms_cache_metrics()
+
+@router.get("/v1/metrics/gms-governor")
+async def gms_governor_stats():
+    return governor_metrics()
+
+@router.get("/v1/metrics/gpt-usage")
+async def gpt_usage_stats():
+    return gpt_usage_metrics()
+
+@router.get("/v1/metrics/http-client")
+async def http_client_stats():
+    # GMS 공유 커넥션 풀: 요청 수 대비 새 커넥션 수(reuse_ratio), 엔드포인트별 지연
+    return http_client_metrics()
+
+@router.get("/v1/metrics/stt")
+async def stt_stats():
+    # 로컬 Whisper 워커 풀 상태 (큐 깊이, 원격으로 넘긴 요청 수, 실시간 배율)
+    return {"backend": STT_BACKEND, "local": local_stt_metrics()}
 
 @router.post("/v1/analyze/complete")
 async def analyze_complete(
@@ -412,6 +635,7 @@ async def analyze_complete(
     return_points: bool = Form(False),
     calib_data: Optional[str] = Form(None),
     return_debug: bool = Form(False),
+    with_gaze: Optional[bool] = Form(None),  # 미지정이면 calib_data 가 있을 때만 gaze 분석
     db: Session = Depends(get_db),
 ):
     data = await file.read()
@@ -435,6 +659,7 @@ async def analyze_complete(
             return_points=return_points,
             calib_data=parsed_calib_data,
             return_debug=return_debug,
+            with_gaze=with_gaze,
         )
     except Exception as e:
         log.exception("complete analysis 실패")
@@ -460,6 +685,7 @@ async def analyze_complete(
         "posture_result": qa.posture_result,
         "face_result": qa.face_result,
         "gaze_result": qa.gaze_result,
+        "gaze_skip_reason": out.get("gaze_skip_reason"),
         "created_at": qa.created_at.isoformat() + "Z" if qa.created_at else None,
     }
     if return_debug and isinstance(out, dict) and out.get("debug") is not None:
@@ -478,6 +704,7 @@ async def analyze_complete_by_url(
     thumbnail_url: Optional[str] = Form(None),
     calib_data: Optional[str] = Form(None),
     return_debug: bool = Form(False),
+    with_gaze: Optional[bool] = Form(None),  # 미지정이면 calib_data 가 있을 때만 gaze 분석
     db: Session = Depends(get_db),
 ):
     parsed_calib_data = None
@@ -506,6 +733,7 @@ async def analyze_complete_by_url(
             return_points=return_points,
             calib_data=parsed_calib_data,
             return_debug=return_debug,
+            with_gaze=with_gaze,
         )
     except Exception as e:
         log.exception("URL 분석 실패")
@@ -533,6 +761,7 @@ async def analyze_complete_by_url(
         "posture_result": qa.posture_result,
         "face_result": qa.face_result,
         "gaze_result": qa.gaze_result,
+        "gaze_skip_reason": out.get("gaze_skip_reason"),
         "created_at": qa.created_at.isoformat() + "Z" if qa.created_at else None,
     }
     if return_debug and isinstance(out, dict) and out.get("debug") is not None:
@@ -551,7 +780,13 @@ async def face_predict(file: UploadFile = File(...), device: str = "cpu"):
         raise HTTPException(500, f"face inference 실패: {e}")
 
 @router.post("/v1/gaze/predict")
-async def gaze_predict(file: UploadFile = File(...)):
+async def gaze_predict(request: Request, file: UploadFile = File(...), heatmap_format: Optional[str] = None):
+    # 히트맵 포맷 협상: ?heatmap_format= > Accept: application/json; heatmap=... > dense(기존 포맷)
+    try:
+        fmt = negotiate_heatmap_format(heatmap_format, request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
     data = await file.read()
     if not data:
         raise HTTPException(400, "빈 파일")
@@ -559,23 +794,9 @@ async def gaze_predict(file: UploadFile = File(...)):
         from fastapi import Response
         out = infer_gaze(data)
 
-        def compress_heatmap_data(d):
-            if isinstance(d, dict):
-                result = {}
-                for k, v in d.items():
-                    if k == "heatmap_data" and isinstance(v, list):
-                        result[k] = v
-                    elif isinstance(v, dict):
-                        result[k] = compress_heatmap_data(v)
-                    elif isinstance(v, list):
-                        result[k] = [compress_heatmap_data(i) if isinstance(i, dict) else i for i in v]
-                    else:
-                        result[k] = v
-                return result
-            return d
-
-        compressed_out = compress_heatmap_data(out)
-        result = {"ok": True, "result": compressed_out}
+        if fmt != DEFAULT_HEATMAP_FORMAT:
+            out = encode_heatmaps_in(out, fmt)
+        result = {"ok": True, "result": out}
         json_str = json.dumps(result, separators=(',', ':'), ensure_ascii=False)
         return Response(content=json_str, media_type="application/json")
     except Exception as e:
@@ -593,10 +814,98 @@ async def posture_report(file: UploadFile = File(...)):
     report = analyze_video_bytes(data)
     return JSONResponse(content=report)
 
-async def _bg_analyze_and_persist(qa_id: bytes, audio_bytes: bytes):
+async def _bg_evaluate_session(session_val: bytes):
+    """
+    지연 평가 모드로 저장된 답변(answer 있음, end_type 비어 있음)을 묶음 요청으로 평가하고
+    한 번의 bulk UPDATE 로 반영. 평가가 누락된 쌍은 그대로 두어 다음 종료 요청에서 재시도.
+    워커 프로세스가 여러 개여도 같은 답변을 두 번 평가하지 않도록 행마다 조건부 UPDATE 로 선점
+    """
     db = SessionLocal()
+    claimed: list = []
+    evaluated: set = set()
     try:
-        analysis = await transcribe_and_analyze(audio_bytes)
+        stale_before = datetime.utcnow() - timedelta(seconds=BATCH_EVAL_LEASE_S)
+        unclaimed = or_(
+            QuestionAnswerPair.end_type.is_(None),
+            QuestionAnswerPair.end_type == "",
+            and_(QuestionAnswerPair.end_type == EVAL_CLAIMED, QuestionAnswerPair.updated_at < stale_before),
+        )
+        pending = (
+            db.query(QuestionAnswerPair.id, QuestionAnswerPair.question, QuestionAnswerPair.answer)
+              .filter(
+                  QuestionAnswerPair.session_id == session_val,
+                  QuestionAnswerPair.answer.isnot(None),
+                  QuestionAnswerPair.answer != "",
+                  unclaimed,
+              )
+              .order_by(QuestionAnswerPair.order.asc(), QuestionAnswerPair.sub_order.asc())
+              .all()
+        )
+        if not pending:
+            return
+
+        # 다른 워커가 먼저 선점한 행은 WHERE 조건이 맞지 않아 0행 → 건너뜀
+        now = datetime.utcnow()
+        for qa in pending:
+            updated = (
+                db.query(QuestionAnswerPair)
+                  .filter(QuestionAnswerPair.id == qa.id, unclaimed)
+                  .update({"end_type": EVAL_CLAIMED, "updated_at": now}, synchronize_session=False)
+            )
+            if updated:
+                claimed.append(qa)
+        db.commit()
+        if not claimed:
+            return
+
+        results = await evaluate_answers_batched_async(
+            [qa.question for qa in claimed], [qa.answer for qa in claimed], client=get_http_client()
+        )
+        now = datetime.utcnow()
+        mappings = [
+            {"id": qa.id, "updated_at": now, **_eval_fields(res)}
+            for qa, res in zip(claimed, results)
+            if res is not None
+        ]
+        if mappings:
+            db.bulk_update_mappings(QuestionAnswerPair, mappings)
+            db.commit()
+            evaluated = {m["id"] for m in mappings}
+        log.info("[bg] 일괄 평가 %d/%d쌍 반영 (session=%s)", len(mappings), len(claimed), to_uuid_str(session_val))
+    except Exception as e:
+        log.exception("Batched evaluation failed: %s", e)
+    finally:
+        # 평가 결과를 못 받은 행은 선점 해제 → 다음 종료 요청에서 재시도
+        released = [qa.id for qa in claimed if qa.id not in evaluated]
+        if released:
+            try:
+                db.rollback()
+                (db.query(QuestionAnswerPair)
+                   .filter(QuestionAnswerPair.id.in_(released), QuestionAnswerPair.end_type == EVAL_CLAIMED)
+                   .update({"end_type": ""}, synchronize_session=False))
+                db.commit()
+            except Exception as e:
+                log.error("[bg] 일괄 평가 선점 해제 실패 (%ds 후 재선점): %s", BATCH_EVAL_LEASE_S, e)
+        db.close()
+
+
+async def _bg_analyze_and_persist(
+    qa_id: bytes,
+    audio_bytes: bytes,
+    transcription: Optional[dict] = None,
+    analysis: Optional[dict] = None,
+):
+    db = SessionLocal()
+    try:
+        if analysis is not None:
+            # 스트리밍 STT 에서 구간별로 누적한 VAD/segments 로 이미 계산됨
+            pass
+        elif transcription is not None:
+            # 요청 경로에서 받은 segments 로 로컬 분석만 수행 (Whisper 재업로드 없음)
+            analysis = await analyze_speech_rate_async(audio_bytes, transcription)
+        else:
+            # 요청 경로 STT 가 실패한 경우에만 다시 호출
+            analysis = await transcribe_and_analyze(audio_bytes)
         qa = db.get(QuestionAnswerPair, qa_id)
         if qa:
             try:
@@ -9,6 +9,9 @@ from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 import json
 
+from app.utils.http_client import startup_http_client, shutdown_http_client
+from app.utils.stt import startup_stt
+
 # 커스텀 JSON 응답 클래스
 class CompactJSONResponse(JSONResponse):
     def render(self, content) -> bytes:
@@ -80,6 +83,19 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def _startup_clients():
+    # GMS(STT/GPT) 호출용 공유 커넥션 풀 (keep-alive, HTTP/2)
+    await startup_http_client()
+    # STT_BACKEND=local 이면 로컬 Whisper 모델을 워커마다 미리 로딩
+    await startup_stt()
+
+
+@app.on_event("shutdown")
+async def _shutdown_clients():
+    await shutdown_http_client()
+
+
 @app.get("/test")
 def test():
     return {"msg": "CORS OK!"}
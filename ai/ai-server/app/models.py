@@ -34,6 +34,10 @@ class EvaluationSession(Base):
     )
 
 
+# 지연 평가 일괄 처리 중인 행의 end_type (워커 간 선점 표시, 평가가 끝나면 등급으로 덮어씀)
+EVAL_CLAIMED = "EVALUATING"
+
+
 class QuestionAnswerPair(Base):
     __tablename__ = "question_answer_pair"
 
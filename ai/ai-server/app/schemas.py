@@ -1,6 +1,6 @@
 # app/schemas.py
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, field_validator
@@ -59,3 +59,22 @@ class EvaluationSessionRead(EvaluationSessionBase):
         if isinstance(v, str):
             return UUID(v)
         return v
+
+# GPT 답변 평가 (structured JSON 출력)
+EvaluationLevel = Literal["OUTSTANDING", "NORMAL", "INADEQUATE"]
+
+class AnswerEvaluation(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    order: int
+    is_ended: bool
+    reason_end: str = ""
+    context_matched: bool
+    reason_context: str = ""
+    gpt_comment: str = ""
+    # end_type / stopwords 컬럼용 등급 (텍스트 모드 결과에는 없음 → 코멘트 키워드로 대체)
+    end_level: Optional[EvaluationLevel] = None
+    filler_level: Optional[EvaluationLevel] = None
+
+class AnswerEvaluationList(BaseModel):
+    evaluations: List[AnswerEvaluation]
@@ -1,5 +1,5 @@
 # - GPU 디코드(NVDEC) → GPU 스케일(scale_cuda/npp) → NVENC
-# - 직렬 처리(병렬 X)로 CPU 경합 최소
+# - 직렬 처리(병렬 X)로 CPU 경합 최소 (posture → face). gaze 는 켜져 있을 때만 별도 스레드에서 동시 실행
 # - 기본 해상도 960x540, 기본 fps 30
 # - posture/face 모두 전 프레임(stride=1)
 # - CPU thread 1 강제 (OpenMP/MKL/BLAS/OpenCV/TensorFlow/PyTorch)
@@ -42,8 +42,8 @@ _log("INFO", "BOOT", f"OMP={os.getenv('OMP_NUM_THREADS')} MKL={os.getenv('MKL_NU
 
 # bytes 경로 (호환)
 from app.utils.posture import analyze_video_bytes
-# [GAZE-REMOVED] from app.services.gaze_service import infer_gaze, infer_gaze_frames
 from app.services.face_service import infer_face_video, infer_face_frames
+from app.services.gaze_service import infer_gaze_frames
 
 # frames 경로 지원 여부 확인
 try:
@@ -60,6 +60,16 @@ def _env_true(name: str, default: str = "0") -> bool:
     return str(v).lower() in ("1", "true", "yes", "on")
 
 
+def _env_size(name: str, default: str) -> Optional[Tuple[int, int]]:
+    # "WxH" 형식 (빈 값/0 이면 None)
+    v = (os.getenv(name, default) or "").lower().strip()
+    try:
+        w, h = (int(x) for x in v.split("x"))
+        return (w, h) if w > 0 and h > 0 else None
+    except Exception:
+        return None
+
+
 # ---------- ffmpeg helpers ----------
 _ffmpeg_cap_cache: Dict[str, Dict[str, bool]] = {"encoder": {}, "filter": {}, "decoder": {}}
 _ffmpeg_version_cache: Optional[str] = None
@@ -508,6 +518,65 @@ class VideoFrameIterator:
             raise RuntimeError(f"VideoFrameIterator failed: {e}")
 
 
+# ---------- gaze stage ----------
+class _BGRFrames:
+    """디코드된 RGB 프레임 리스트를 복사 없이 BGR 로 보여주는 시퀀스 (gaze 트래커 입력용)
+
+    len() 지원, 프레임은 꺼낼 때마다 하나씩만 연속 메모리로 변환
+    """
+
+    def __init__(self, rgb_frames: List[Any], stride: int = 1):
+        self._frames = rgb_frames
+        self._stride = max(1, int(stride))
+
+    def __len__(self) -> int:
+        return (len(self._frames) + self._stride - 1) // self._stride
+
+    def __iter__(self):
+        import numpy as np
+        for i in range(0, len(self._frames), self._stride):
+            yield np.ascontiguousarray(self._frames[i][..., ::-1])
+
+
+def _gaze_enabled(with_gaze: Optional[bool], calib_data: Optional[dict] = None) -> Tuple[bool, Optional[str]]:
+    # DISABLE_GAZE 가 최우선, 그 다음 호출 인자, 인자가 없으면 캘리브레이션이 있거나 ENABLE_GAZE 일 때만 켬
+    if _env_true("DISABLE_GAZE", "0"):
+        return False, "DISABLE_GAZE=1"
+    if with_gaze is None:
+        if calib_data or _env_true("ENABLE_GAZE", "0"):
+            return True, None
+        return False, "opt-in (with_gaze=True, calib_data 또는 ENABLE_GAZE=1)"
+    if not with_gaze:
+        return False, "with_gaze=False"
+    return True, None
+
+
+def _decode_size_for(resize_to: Optional[Tuple[int, int]], gaze_on: bool) -> Optional[Tuple[int, int]]:
+    """단일 디코드 해상도: 요청 해상도를 gaze 최소 해상도(GAZE_MIN_SIZE) 이상으로 맞춤"""
+    if not resize_to or not gaze_on:
+        return resize_to
+    need = _env_size("GAZE_MIN_SIZE", "960x540")
+    if not need:
+        return resize_to
+    size = (max(int(resize_to[0]), need[0]), max(int(resize_to[1]), need[1]))
+    if size != tuple(resize_to):
+        _log("INFO", "GAZE", f"decode size raised for gaze: {resize_to} -> {size}")
+    return size
+
+
+def _run_gaze(frames_rgb: List[Any], calib_data: Optional[dict], fps: float) -> Tuple[Dict[str, Any], float]:
+    t = time.time()
+    stride = max(1, int(os.getenv("GAZE_STRIDE", "1")))
+    try:
+        # stride 로 프레임을 건너뛰므로 트래커 타임스탬프는 fps / stride 기준
+        gaze = infer_gaze_frames(_BGRFrames(frames_rgb, stride=stride), calib_data=calib_data,
+                                 fps=(fps or 30.0) / stride)
+    except Exception as e:
+        _log("ERROR", "GAZE", f"gaze stage failed -> {e}")
+        gaze = {"status": "error", "error": str(e)}
+    return gaze, time.time() - t
+
+
 # ---------- posture meta fix ----------
 def _fix_posture_meta(posture: Dict[str, Any], decoded_frames: int, fps_used: float) -> None:
     try:
@@ -527,12 +596,13 @@ def analyze_all(
     device: Optional[str] = None,
     stride: int = 1,
     return_points: bool = False,
-    calib_data: Optional[dict] = None,  # [GAZE-REMOVED] 더 이상 사용하지 않음(호환 파라미터만 보존)
+    calib_data: Optional[dict] = None,  # 요청별 gaze 캘리브레이션
     target_fps: int = 30,
     resize_to: Tuple[int, int] = (960, 540),
     max_frames: Optional[int] = None,
     return_debug: bool = False,
     stream_mode: str = "auto",
+    with_gaze: Optional[bool] = None,
 ):
     _log("INFO", "ENTRY", f"analyze_all target_fps={target_fps} resize_to={resize_to} stream_mode={stream_mode}")
 
@@ -557,12 +627,15 @@ def analyze_all(
     _log("INFO", "ENV", f"ALLOW_CPU_FALLBACK={_env_true('ALLOW_CPU_FALLBACK','0')} "
                          f"REQUIRE_NVDEC={_env_true('REQUIRE_NVDEC','1')}")
 
+    gaze_on, gaze_skip = _gaze_enabled(with_gaze, calib_data)
+    _log("INFO", "GAZE", f"enabled={gaze_on}" + (f" ({gaze_skip})" if gaze_skip else ""))
+
     t_pre = time.time()
     mp4_path, dbg = preprocess_video_to_mp4_file(
         video_bytes=video_bytes,
         target_fps=target_fps,
         max_frames=max_frames,
-        resize_to=resize_to,
+        resize_to=_decode_size_for(resize_to, gaze_on),
         keep_aspect=False,
         drop_audio=True,
     )
@@ -573,6 +646,7 @@ def analyze_all(
 
     try:
         t0 = time.time()
+        gaze: Optional[Dict[str, Any]] = None
 
         if stream_mode == "frames" or (stream_mode == "auto" and frames_api_ok):
             _log("INFO", "MODE", "single-decode FRAMES path")
@@ -582,14 +656,34 @@ def analyze_all(
             fps_used = float(target_fps) if target_fps else 0.0
             _log("INFO", "FRAMES", f"decoded={n_all} fps_used={fps_used} (decode_time={time.time()-t_dec:.3f}s)")
 
-            t_pose = time.time()
-            posture = analyze_video_frames(frames_all)  # type: ignore
-            _fix_posture_meta(posture, decoded_frames=n_all, fps_used=fps_used)
-            _log("INFO", "TIME", f"posture(frames)={time.time()-t_pose:.3f}s")
+            # gaze: 같은 프레임을 별도 스레드에서 동시에 소비 (추가 디코드/임시파일 없음)
+            gaze_future = None
+            gaze_pool = None
+            if gaze_on:
+                from concurrent.futures import ThreadPoolExecutor
+                gaze_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gaze")
+                gaze_future = gaze_pool.submit(_run_gaze, frames_all, calib_data, fps_used)
 
-            t_face = time.time()
-            face = infer_face_frames(frames_all, device=device, stride=1, return_points=return_points)  # type: ignore
-            _log("INFO", "TIME", f"face(frames)={time.time()-t_face:.3f}s")
+            try:
+                t_pose = time.time()
+                posture = analyze_video_frames(frames_all)  # type: ignore
+                _fix_posture_meta(posture, decoded_frames=n_all, fps_used=fps_used)
+                dt_pose = time.time() - t_pose
+                _log("INFO", "TIME", f"posture(frames)={dt_pose:.3f}s")
+
+                t_face = time.time()
+                face = infer_face_frames(frames_all, device=device, stride=1, return_points=return_points)  # type: ignore
+                dt_face = time.time() - t_face
+                _log("INFO", "TIME", f"face(frames)={dt_face:.3f}s")
+            finally:
+                if gaze_pool is not None:
+                    gaze_pool.shutdown(wait=True)
+
+            timings = {"posture": dt_pose, "face": dt_face}
+            if gaze_future is not None:
+                gaze, timings["gaze"] = gaze_future.result()
+                _log("INFO", "TIME", f"gaze(frames)={timings['gaze']:.3f}s")
+            timings["total"] = time.time() - t0
 
             dbg.update({
                 "analyze_mode": "single-decode/frames",
@@ -598,8 +692,10 @@ def analyze_all(
                 "postprocess_fps": target_fps,
                 "effective_fps_face": target_fps,
                 "frames_total_decoded": n_all,
-                "timings_s": {"total": time.time() - t0},
-                "parallel": False
+                "gaze_enabled": gaze_on,
+                "gaze_skip_reason": gaze_skip,
+                "timings_s": timings,
+                "parallel": gaze_on
             })
 
         else:
@@ -615,13 +711,24 @@ def analyze_all(
             face = infer_face_video(processed_bytes, device, 1, None, return_points)
             _log("INFO", "TIME", f"face(bytes)={time.time()-t_face:.3f}s")
 
+            timings = {}
+            if gaze_on:
+                # 공유 프레임이 없는 경로 → gaze 를 요청한 경우에만 따로 디코드
+                frames_gaze = list(VideoFrameIterator(mp4_path, stride=1))
+                gaze, timings["gaze"] = _run_gaze(frames_gaze, calib_data, float(target_fps) if target_fps else 0.0)
+                del frames_gaze
+                _log("INFO", "TIME", f"gaze(bytes)={timings['gaze']:.3f}s")
+            timings["total"] = time.time() - t0
+
             dbg.update({
                 "analyze_mode": "bytes(compat)",
                 "frames_api": False,
                 "stride_face": 1,
                 "postprocess_fps": target_fps,
                 "effective_fps_face": target_fps,
-                "timings_s": {"total": time.time() - t0},
+                "gaze_enabled": gaze_on,
+                "gaze_skip_reason": gaze_skip,
+                "timings_s": timings,
                 "parallel": False
             })
 
@@ -631,7 +738,8 @@ def analyze_all(
             "stride": 1,
             "posture": posture,
             "emotion": face,
-            "gaze": None,  # [GAZE-REMOVED] 완전 제거(호환을 위해 None만 유지)
+            "gaze": gaze,  # 비활성/건너뜀이면 None
+            "gaze_skip_reason": gaze_skip,  # gaze 를 돌렸으면 None
         }
         if return_debug:
             out["debug"] = dbg
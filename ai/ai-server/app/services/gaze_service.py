@@ -1,14 +1,17 @@
 # app/services/gaze_service.py
-# - 기존 옵셔널 임포트/싱글톤(_calibrator_instance, _tracker_instance) 유지
+# - 기존 옵셔널 임포트/싱글톤(_calibrator_instance) 유지
+# - 트래커는 요청마다 새 세션(GazeTracker) 생성, ptgaze 모델(GazeModels)만 프로세스 전역 공유
 # - GAZE_BACKEND=auto|native|lite, DISABLE_GAZE=1 지원
 # - 네이티브 모듈(gaze_calibration, gaze_tracking) 있으면 사용
 #   없거나 초기화 실패하면 라이트 백엔드로 폴백( GAZE_STRICT=1 이면 폴백 금지 )
 # - MARK 파일 경로는 GAZE_MARK_PATH 로 전달, 없으면 경고만
+# - GAZE_NATIVE_FRAMES=1 이면 트래커가 resize/flip 없이 원본 프레임으로 추론
 # - CPU 부담 최소화를 위해 기본은 프레임 카운트/경량 통계만 수행
+#   (프레임 수는 컨테이너 메타데이터 → 패킷 스캔 → 디코드 순으로 구함)
 
 from __future__ import annotations
-import os, tempfile
-from typing import Iterable, Optional, Dict, Any
+import io, json, os, shutil, subprocess, tempfile, time
+from typing import Iterable, Optional, Dict, Any, Tuple
 
 import cv2
 
@@ -42,9 +45,27 @@ except Exception as e:
     print(f"[gaze] import warning (tracker): {e}")
     NativeTracker = None  # type: ignore
 
+try:
+    from gaze_models import get_gaze_models  # type: ignore
+except Exception as e:
+    print(f"[gaze] import warning (models): {e}")
+    get_gaze_models = None  # type: ignore
+
+try:
+    from gaze_transform import get_transform_cache_stats  # type: ignore
+except Exception as e:
+    print(f"[gaze] import warning (transform cache): {e}")
+    get_transform_cache_stats = None  # type: ignore
+
 # singletons (복원)
 _calibrator_instance: Any | None = None
-_tracker_instance: Any | None = None
+_tracker_instance: Any | None = None  # 라이트 트래커(무상태)만 공유
+# 네이티브 트래커 초기화 실패 시 라이트로 폴백하고 일정 시간 뒤 재시도
+# (연속 실패마다 간격 2배, GAZE_NATIVE_RETRY_MAX_S 까지. 성공하면 초기화)
+GAZE_NATIVE_RETRY_S = float(os.getenv("GAZE_NATIVE_RETRY_S", "60"))
+GAZE_NATIVE_RETRY_MAX_S = float(os.getenv("GAZE_NATIVE_RETRY_MAX_S", "900"))
+_native_tracker_failures = 0
+_native_tracker_retry_at = 0.0  # time.monotonic() 기준
 
 
 # ----- lite fallback implementations -----
@@ -70,10 +91,13 @@ class LiteTracker:
         print("[gaze][lite] Tracker ready")
 
     def infer_frames(self, frames: Iterable[Any], calib_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        # 프레임 전체를 한 번만 순회하여 카운트
-        count = 0
-        for _ in frames:
-            count += 1
+        # 길이를 알 수 있으면 순회하지 않음, 아니면 한 번만 순회하여 카운트
+        try:
+            count = len(frames)  # type: ignore[arg-type]
+        except TypeError:
+            count = 0
+            for _ in frames:
+                count += 1
         return {
             "status": "ok",
             "frames": int(count),
@@ -106,6 +130,87 @@ def _mark_path() -> Optional[str]:
     return os.getenv("GAZE_MARK_PATH")
 
 
+# ----- frame counting (메타데이터 우선) -----
+def _count_frames_pyav(file_bytes: bytes) -> Tuple[Optional[int], Optional[str]]:
+    """PyAV: 스트림 nb_frames → 패킷 수 (디코드 없음, 임시파일 없음)"""
+    try:
+        import av  # type: ignore
+    except Exception:
+        return None, None
+    try:
+        with av.open(io.BytesIO(file_bytes)) as container:
+            if not container.streams.video:
+                return None, None
+            stream = container.streams.video[0]
+            if stream.frames and stream.frames > 0:
+                return int(stream.frames), "pyav:nb_frames"
+            # webm 등 헤더에 프레임 수가 없으면 디멕스만 해서 패킷 수 집계
+            count = sum(1 for packet in container.demux(stream) if packet.size)
+            return (count, "pyav:packets") if count > 0 else (None, None)
+    except Exception as e:
+        print(f"[gaze] pyav frame count failed: {e}")
+        return None, None
+
+
+def _ffprobe_path() -> Optional[str]:
+    name = os.getenv("FFPROBE_BIN") or "ffprobe"
+    return name if "/" in name else shutil.which(name)
+
+
+def _count_frames_ffprobe(path: str) -> Tuple[Optional[int], Optional[str]]:
+    """ffprobe: nb_frames → -count_packets (디코드 없음)"""
+    ffprobe = _ffprobe_path()
+    if not ffprobe:
+        return None, None
+    base = [ffprobe, "-v", "error", "-select_streams", "v:0", "-of", "json"]
+    for extra, key, source in (
+        (["-show_entries", "stream=nb_frames"], "nb_frames", "ffprobe:nb_frames"),
+        (["-count_packets", "-show_entries", "stream=nb_read_packets"], "nb_read_packets", "ffprobe:packets"),
+    ):
+        try:
+            out = subprocess.run(base + extra + [path], capture_output=True, text=True, timeout=30)
+            streams = json.loads(out.stdout or "{}").get("streams") or [{}]
+            value = int(streams[0].get(key) or 0)
+            if value > 0:
+                return value, source
+        except Exception as e:
+            print(f"[gaze] ffprobe frame count failed ({key}): {e}")
+    return None, None
+
+
+def _count_frames_decode(path: str) -> int:
+    """최후 수단: 헤더가 깨진 경우 실제로 프레임을 넘기며 카운트 (색 변환 없는 grab)"""
+    cap = cv2.VideoCapture(path)
+    count = 0
+    try:
+        while cap.grab():
+            count += 1
+    finally:
+        cap.release()
+    return count
+
+
+def count_video_frames(file_bytes: bytes) -> Tuple[int, str]:
+    """(프레임 수, 출처) — pyav 메타/패킷 → ffprobe 메타/패킷 → 디코드"""
+    count, source = _count_frames_pyav(file_bytes)
+    if count is not None:
+        return count, source  # type: ignore[return-value]
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
+        tmp.write(file_bytes)
+        path = tmp.name
+    try:
+        count, source = _count_frames_ffprobe(path)
+        if count is not None:
+            return count, source  # type: ignore[return-value]
+        return _count_frames_decode(path), "decode"
+    finally:
+        try:
+            os.remove(path)
+        except Exception:
+            pass
+
+
 # ----- singletons getters -----
 def get_calibrator() -> Any:
     """GazeCalibrator 싱글톤 반환 (네이티브 우선, 실패 시 라이트)"""
@@ -132,38 +237,53 @@ def get_calibrator() -> Any:
 
 
 def get_tracker() -> Any:
-    """GazeTracker 싱글톤 반환 (네이티브 우선, 실패 시 라이트)"""
-    global _tracker_instance
-    if _tracker_instance is not None:
-        return _tracker_instance
+    """요청별 GazeTracker 세션 반환 (네이티브 우선, 실패 시 라이트)
+
+    네이티브 세션은 gaze_data/히트맵/캘리브레이션 상태를 각자 가지므로 동시 요청끼리 섞이지 않고,
+    ptgaze 모델은 get_gaze_models() 로 한 번만 로드해 공유한다
+    """
+    global _tracker_instance, _native_tracker_failures, _native_tracker_retry_at
 
     choice = _backend_choice()
     mark = _mark_path()
 
-    if choice in ("native", "auto") and NativeTracker is not None:
+    if choice in ("native", "auto") and NativeTracker is not None and time.monotonic() >= _native_tracker_retry_at:
         try:
-            # mark_path 인자를 지원할 수도, 안 할 수도 있으므로 안전하게 시도
-            try:
-                _tracker_instance = NativeTracker(mark_path=mark)  # type: ignore[call-arg]
-            except TypeError:
-                _tracker_instance = NativeTracker()  # type: ignore[call-arg]
             # MARK 유효성 체크(과거 "could not find MARK" 대응)
             if mark and not os.path.exists(mark):
                 raise FileNotFoundError("could not find MARK")
-            print("[gaze] using native Tracker")
-            return _tracker_instance
+            models = get_gaze_models() if get_gaze_models is not None else None
+            tracker = NativeTracker(models=models)  # type: ignore[call-arg]
+            # GAZE_NATIVE_FRAMES=1: resize/flip 없이 원본 프레임으로 추론 (카메라 파라미터 변환)
+            tracker.NATIVE_FRAME_PATH = _env_true("GAZE_NATIVE_FRAMES", "0")
+            if _native_tracker_failures:
+                print(f"[gaze] native Tracker recovered after {_native_tracker_failures} failure(s)")
+                _native_tracker_failures = 0
+            return tracker
         except Exception as e:
-            print(f"[gaze] native Tracker init failed: {e}")
             if _strict_fail():
+                print(f"[gaze] native Tracker init failed: {e}")
                 raise
-            # fall through to lite
-
-    # lite fallback
-    _tracker_instance = LiteTracker(mark_path=mark)
-    print("[gaze] using lite Tracker")
+            # 재시도 시각까지는 바로 라이트로 (매 요청 모델 로드 재시도 방지)
+            _native_tracker_failures += 1
+            delay = min(GAZE_NATIVE_RETRY_S * 2 ** (_native_tracker_failures - 1), GAZE_NATIVE_RETRY_MAX_S)
+            _native_tracker_retry_at = time.monotonic() + delay
+            print(f"[gaze] native Tracker init failed ({_native_tracker_failures}x), retry in {delay:.0f}s: {e}")
+
+    # lite fallback (무상태라 공유)
+    if _tracker_instance is None:
+        _tracker_instance = LiteTracker(mark_path=mark)
+        print("[gaze] using lite Tracker")
     return _tracker_instance
 
 
+def calibration_cache_stats() -> Dict[str, Any]:
+    """캘리브레이션 모델 캐시 hit/miss 통계 (요청/트래커 인스턴스 간 공유)"""
+    if get_transform_cache_stats is None:
+        return {"status": "unavailable"}
+    return {"status": "ok", **get_transform_cache_stats()}
+
+
 # ----- public APIs (analysis_service 가 호출) -----
 def run_calibration(calib_data: Dict[str, Any] | None) -> Dict[str, Any]:
     """선택적: 보정 단계가 따로 필요하면 사용"""
@@ -183,58 +303,35 @@ def run_calibration(calib_data: Dict[str, Any] | None) -> Dict[str, Any]:
     return LiteCalibrator().fit(calib_data)
 
 
-def infer_gaze_frames(frames: Iterable[Any], calib_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    """프레임 이터러블 입력(단일 순회)"""
+def infer_gaze_frames(frames: Iterable[Any], calib_data: Dict[str, Any] | None = None,
+                      fps: float | None = None) -> Dict[str, Any]:
+    """프레임 이터러블 입력(단일 순회). 요청마다 새 트래커 세션 사용
+
+    fps: 전달되는 프레임의 실제 간격 (stride 로 건너뛴 경우 원본 fps / stride) — 타임스탬프 계산용
+    """
     if _env_true("DISABLE_GAZE", "0"):
         return {"status": "disabled", "reason": "env"}
     tracker = get_tracker()
-
-    # 네이티브/라이트 공통으로 처리될 수 있게 메소드 탐색
-    for name in ("process_frames", "infer_frames", "track_frames", "infer", "run"):
-        if hasattr(tracker, name):
-            fn = getattr(tracker, name)
-            try:
-                return fn(frames, calib_data=calib_data)
-            except TypeError:
-                # 시그니처가 다르면 인자 축소해서 재시도
-                try:
-                    return fn(frames)
-                except Exception as e:
-                    raise
-
-    # 마지막 수단: 라이트 추론
-    return LiteTracker(_mark_path()).infer_frames(frames, calib_data=calib_data)
+    if isinstance(tracker, LiteTracker):
+        return tracker.infer_frames(frames, calib_data=calib_data)
+    # 네이티브 GazeTracker.process_frames — frames 는 한 번만 순회되므로 호출도 한 번만
+    return tracker.process_frames(frames, calib_data=calib_data, fps=fps or 30.0)
 
 
 def infer_gaze(file_bytes: bytes, calib_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    """바이트 입력(임시파일 디코드) — CPU 부담이 커서 frames 경로 권장"""
+    """바이트 입력 — 프레임 수는 메타데이터/패킷 스캔으로 구하고 디코드는 폴백으로만 사용"""
     if _env_true("DISABLE_GAZE", "0"):
         return {"status": "disabled", "reason": "env"}
-    # bytes → 임시 mp4 → 프레임 카운트만
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
-        tmp.write(file_bytes)
-        path = tmp.name
-    try:
-        cap = cv2.VideoCapture(path)
-        count = 0
-        while True:
-            ok, _ = cap.read()
-            if not ok:
-                break
-            count += 1
-        cap.release()
-        return {
-            "status": "ok",
-            "frames": int(count),
-            "calibration": {
-                "has_data": bool(calib_data),
-                "points": len((calib_data or {}).get("calibration_points", [])) if calib_data else 0,
-                "vectors": len((calib_data or {}).get("calibration_vectors", [])) if calib_data else 0,
-                "screen": (calib_data or {}).get("screen_settings"),
-            }
+    # bytes → 프레임 카운트만 (컨테이너 메타데이터 우선, 디코드는 최후 수단)
+    count, source = count_video_frames(file_bytes)
+    return {
+        "status": "ok",
+        "frames": int(count),
+        "frames_source": source,
+        "calibration": {
+            "has_data": bool(calib_data),
+            "points": len((calib_data or {}).get("calibration_points", [])) if calib_data else 0,
+            "vectors": len((calib_data or {}).get("calibration_vectors", [])) if calib_data else 0,
+            "screen": (calib_data or {}).get("screen_settings"),
         }
-    finally:
-        try:
-            os.remove(path)
-        except Exception:
-            pass
+    }
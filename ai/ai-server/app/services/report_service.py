@@ -4,7 +4,7 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy import and_
 from sqlalchemy.orm import Session, joinedload
 
-from app.models import EvaluationSession, QuestionAnswerPair
+from app.models import EVAL_CLAIMED, EvaluationSession, QuestionAnswerPair
 from app.utils.uuid_tools import to_uuid_bytes, to_uuid_str
 import json
 
@@ -149,7 +149,7 @@ def get_result_detail_by_id(db: Session, result_id: str) -> Optional[Dict[str, A
             "context_matched": r.context_matched,
             "reason_context": r.reason_context,
             "gpt_comment": r.gpt_comment,
-            "end_type": r.end_type,
+            "end_type": "" if r.end_type == EVAL_CLAIMED else r.end_type,
             "speech_label": r.speech_label,
             "syll_art": float(r.syll_art) if r.syll_art not in (None, "") else None,
         },
@@ -191,7 +191,7 @@ def get_result_detail_secure(db: Session, report_id: str, result_id: str, user_i
             "context_matched": r.context_matched,
             "reason_context": r.reason_context,
             "gpt_comment": r.gpt_comment,
-            "end_type": r.end_type,
+            "end_type": "" if r.end_type == EVAL_CLAIMED else r.end_type,
             "speech_label": r.speech_label,
             "syll_art": float(r.syll_art) if getattr(r, "syll_art", None) not in (None, "") else None,
         },
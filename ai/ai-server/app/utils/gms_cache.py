@@ -0,0 +1,348 @@
+# app/utils/gms_cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from decouple import config
+
+# 결정적 GMS 호출(temperature 0 chat, STT) 응답 캐시: 메모리 LRU + (선택) 디스크
+GMS_CACHE_ENABLED = config('GMS_CACHE_ENABLED', default=True, cast=bool)
+GMS_CACHE_MAX_ENTRIES = config('GMS_CACHE_MAX_ENTRIES', default=512, cast=int)
+GMS_CACHE_MAX_BYTES = config('GMS_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+GMS_CACHE_MAX_ITEM_BYTES = config('GMS_CACHE_MAX_ITEM_BYTES', default=1024 * 1024, cast=int)  # 이보다 큰 응답은 저장 안 함
+GMS_CACHE_CHAT_TTL_S = config('GMS_CACHE_CHAT_TTL_S', default=24 * 3600, cast=int)
+GMS_CACHE_STT_TTL_S = config('GMS_CACHE_STT_TTL_S', default=6 * 3600, cast=int)
+# 디스크 저장소 (빈 값이면 끔) — 재시작/워커 간 공유용
+GMS_CACHE_DIR = config('GMS_CACHE_DIR', default='')
+GMS_CACHE_DISK_MAX_BYTES = config('GMS_CACHE_DISK_MAX_BYTES', default=256 * 1024 * 1024, cast=int)
+
+STT_PATH = "audio/transcriptions"
+
+metrics = {
+    "hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypass": 0,
+    "coalesced": 0, "evictions": 0, "expired": 0, "invalidated": 0, "disk_errors": 0,
+}
+
+
+class CachedResponse:
+    __slots__ = ("body", "content_type", "expires_at", "size")
+
+    def __init__(self, body: bytes, content_type: str, expires_at: float):
+        self.body = body
+        self.content_type = content_type
+        self.expires_at = expires_at  # time.time() 기준 (디스크와 공유)
+        self.size = len(body)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+# ---------- 캐시 대상 판정 / 키 ----------
+def kind_of(path: str) -> str:
+    return "stt" if path.rstrip("/").endswith(STT_PATH) else "chat"
+
+
+def is_cacheable(path: str, request_kwargs: dict) -> bool:
+    """temperature 0 인 chat 호출과 STT(temperature 0 또는 미지정) 호출만 캐시"""
+    if not GMS_CACHE_ENABLED:
+        return False
+    if kind_of(path) == "stt":
+        temperature = (request_kwargs.get("files") or {}).get("temperature")
+        return temperature is None or str(temperature[1]).strip() in ("0", "0.0")
+    body = request_kwargs.get("json")
+    if not isinstance(body, dict) or body.get("stream") or body.get("n", 1) != 1:
+        return False
+    try:
+        return float(body.get("temperature", 1)) == 0.0  # OpenAI 기본 temperature 는 1
+    except (TypeError, ValueError):
+        return False
+
+
+def cache_key(path: str, request_kwargs: dict) -> str:
+    """(경로, 모델, 프롬프트/오디오 bytes, 파라미터) sha256. 업로드 파일명/Content-Type 은 키에서 제외"""
+    h = hashlib.sha256()
+    h.update(path.strip("/").encode())
+    body = request_kwargs.get("json")
+    if body is not None:
+        h.update(b"\0json\0")
+        h.update(json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode())
+    for name, value in sorted((request_kwargs.get("files") or {}).items()):
+        h.update(b"\0field\0" + name.encode() + b"\0")
+        content = value[1] if isinstance(value, tuple) else value
+        if isinstance(content, str):
+            content = content.encode()
+        h.update(content if isinstance(content, (bytes, bytearray, memoryview)) else repr(content).encode())
+    return h.hexdigest()
+
+
+def ttl_for(path: str) -> int:
+    return GMS_CACHE_STT_TTL_S if kind_of(path) == "stt" else GMS_CACHE_CHAT_TTL_S
+
+
+# ---------- 메모리 LRU ----------
+class _MemoryLRU:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item.expired:
+                self._drop(key)
+                metrics["expired"] += 1
+                return None
+            self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: CachedResponse):
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = item
+            self._bytes += item.size
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._items)))
+                metrics["evictions"] += 1
+
+    def _drop(self, key: str):
+        self._bytes -= self._items.pop(key).size
+
+    def pop(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._items:
+                return False
+            self._drop(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._items), "bytes": self._bytes}
+
+
+# ---------- 디스크 ----------
+class _DiskStore:
+    """
+    key 당 파일 1개: 첫 줄 메타(JSON) + 응답 본문. 용량 초과 시 오래 안 쓴 파일부터 삭제.
+    용량은 프로세스 안의 색인(경로 → 크기, 접근 순)과 누적 바이트로 추적하고,
+    디렉터리 전체를 훑는 것은 시작 시와 누적 바이트가 max_bytes 를 넘었을 때뿐
+    (다른 워커가 쓴 파일은 그때 다시 훑으면서 반영됨)
+    """
+
+    # 정리할 때 max_bytes 의 이 비율까지 줄여 둠 → 한도 근처에서 put 마다 다시 훑지 않도록
+    PRUNE_TARGET = 0.9
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # path → 파일 크기, 오래 안 쓴 순
+        self._bytes = 0
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._rescan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _track(self, path: str, size: int):
+        with self._lock:
+            self._bytes += size - self._index.pop(path, 0)
+            self._index[path] = size
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+                size = f.tell()
+        except FileNotFoundError:
+            return None
+        item = CachedResponse(body, meta["content_type"], meta["expires_at"])
+        if item.expired:
+            metrics["expired"] += 1
+            self._remove(path)
+            return None
+        os.utime(path)  # 접근 시각 갱신 → 다시 훑을 때도 LRU 순서 유지
+        self._track(path, size)
+        return item
+
+    def put(self, key: str, item: CachedResponse):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps({"content_type": item.content_type, "expires_at": item.expires_at}).encode() + b"\n")
+            f.write(item.body)
+            size = f.tell()
+        os.replace(tmp, path)  # 다른 워커 프로세스가 반쯤 쓴 파일을 읽지 않도록
+        self._track(path, size)
+        if self._bytes > self.max_bytes:
+            self._prune()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._bytes -= self._index.pop(path, 0)
+
+    def _entries(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _rescan(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        with self._lock:
+            self._index = OrderedDict((path, size) for path, size, _ in entries)
+            self._bytes = sum(self._index.values())
+
+    def _prune(self):
+        with self._lock:
+            self._rescan()
+            target = self.max_bytes * self.PRUNE_TARGET
+            while self._index and self._bytes > target:
+                self._remove(next(iter(self._index)))
+                metrics["evictions"] += 1
+
+    def pop(self, key: str):
+        self._remove(self._path(key))
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                self._remove(path)
+            self._index.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        # 이 프로세스의 색인 기준 (다른 워커가 쓴 파일은 다음에 다시 훑을 때 반영)
+        return {"dir": self.directory, "entries": len(self._index), "bytes": self._bytes}
+
+
+_memory = _MemoryLRU(GMS_CACHE_MAX_ENTRIES, GMS_CACHE_MAX_BYTES)
+_disk: Optional[_DiskStore] = _DiskStore(GMS_CACHE_DIR, GMS_CACHE_DISK_MAX_BYTES) if GMS_CACHE_DIR else None
+
+# 같은 키 동시 요청은 한 번만 GMS 로 (재업로드가 겹치는 경우)
+_inflight: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+async def get(key: str) -> Optional[CachedResponse]:
+    item = _memory.get(key)
+    if item is not None:
+        metrics["hits"] += 1
+        return item
+    if _disk is not None:
+        try:
+            item = await asyncio.to_thread(_disk.get, key)
+        except Exception as e:
+            metrics["disk_errors"] += 1
+            print(f"[gms-cache] 디스크 읽기 실패: {e}")
+            item = None
+        if item is not None:
+            metrics["disk_hits"] += 1
+            _memory.put(key, item)
+            return item
+    metrics["misses"] += 1
+    return None
+
+
+async def put(key: str, path: str, body: bytes, content_type: str):
+    if len(body) > GMS_CACHE_MAX_ITEM_BYTES:
+        return
+    item = CachedResponse(body, content_type, time.time() + ttl_for(path))
+    _memory.put(key, item)
+    metrics["stores"] += 1
+    if _disk is not None:
+        try:
+            await asyncio.to_thread(_disk.put, key, item)
+        except Exception as e:
+            metrics["disk_errors"] += 1
+            print(f"[gms-cache] 디스크 쓰기 실패: {e}")
+
+
+class single_flight:
+    """async with single_flight(key): 같은 키의 미스는 하나만 GMS 호출, 나머지는 끝난 뒤 캐시에서 읽음"""
+
+    def __init__(self, key: str):
+        self.key = key
+
+    async def __aenter__(self):
+        lock, waiters = _inflight.get(self.key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        elif lock.locked():
+            metrics["coalesced"] += 1
+        _inflight[self.key] = (lock, waiters + 1)
+        await lock.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        lock, waiters = _inflight[self.key]
+        lock.release()
+        if waiters <= 1:
+            del _inflight[self.key]
+        else:
+            _inflight[self.key] = (lock, waiters - 1)
+        return False
+
+
+async def invalidate(path: str, request_kwargs: dict):
+    """저장된 응답이 호출하는 쪽 검증(스키마 등)을 통과하지 못했을 때 같은 요청의 캐시 항목 제거"""
+    if not is_cacheable(path, request_kwargs):
+        return
+    key = cache_key(path, request_kwargs)
+    _memory.pop(key)
+    metrics["invalidated"] += 1
+    if _disk is not None:
+        try:
+            await asyncio.to_thread(_disk.pop, key)
+        except Exception as e:
+            metrics["disk_errors"] += 1
+            print(f"[gms-cache] 디스크 삭제 실패: {e}")
+
+
+def clear():
+    _memory.clear()
+    if _disk is not None:
+        _disk.clear()
+
+
+def gms_cache_metrics() -> dict:
+    lookups = metrics["hits"] + metrics["disk_hits"] + metrics["misses"]
+    return {
+        "enabled": GMS_CACHE_ENABLED,
+        "ttl_s": {"chat": GMS_CACHE_CHAT_TTL_S, "stt": GMS_CACHE_STT_TTL_S},
+        "max_entries": GMS_CACHE_MAX_ENTRIES,
+        "max_bytes": GMS_CACHE_MAX_BYTES,
+        "memory": _memory.stats(),
+        "disk": _disk.stats() if _disk is not None else None,
+        **metrics,
+        "hit_ratio": round((metrics["hits"] + metrics["disk_hits"]) / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,300 @@
+# app/utils/gms_governor.py
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+from decouple import config
+
+# 엔드포인트별 동시 호출 상한 (초과분은 대기열에서 기다림)
+MAX_INFLIGHT = {
+    "stt": config('GMS_MAX_INFLIGHT_STT', default=8, cast=int),
+    "chat": config('GMS_MAX_INFLIGHT_CHAT', default=16, cast=int),
+}
+# 같은 upstream 을 쓰는 엔드포인트는 슬롯/브레이커 공유
+_POOL = {"stt_verbose": "stt"}
+DEFAULT_MAX_INFLIGHT = config('GMS_MAX_INFLIGHT_DEFAULT', default=8, cast=int)
+QUEUE_TIMEOUT_S = config('GMS_QUEUE_TIMEOUT_S', default=30.0, cast=float)   # 대기열에서 이보다 오래 기다리면 포기
+
+# 재시도: 지수 백오프 (1s, 2s, 4s) 에서 최대 JITTER 비율만큼 앞당김.
+# full jitter 는 첫 재시도가 0 에 가깝게 몰려 1~2초 장애 중에 헛시도가 늘고 재시도 3회가 장애보다 먼저 끝남
+# → 기존 고정 1초 루프보다 upstream 요청은 많고 성공은 적었음. 재시도 간격 합(≥ 2.8s)이 짧은 장애를 덮도록 유지
+MAX_RETRIES = config('GMS_MAX_RETRIES', default=3, cast=int)
+BACKOFF_BASE_S = config('GMS_BACKOFF_BASE_S', default=1.0, cast=float)
+BACKOFF_MAX_S = config('GMS_BACKOFF_MAX_S', default=8.0, cast=float)
+BACKOFF_JITTER = config('GMS_BACKOFF_JITTER', default=0.2, cast=float)
+# 전역 재시도 예산: 요청 1건마다 RATIO 만큼 + 초당 MIN_PER_S 만큼 적립 (최대 MAX, 시작 시 가득),
+# 재시도 1회에 1 소모. MAX 는 짧은 장애(100 rps 기준 2~3초)의 재시도를 전부 흡수하는 크기,
+# 장애가 그보다 길어지면 예산이 바닥나 재시도 부하가 RATIO + MIN_PER_S 수준으로 제한됨
+RETRY_BUDGET_RATIO = config('GMS_RETRY_BUDGET_RATIO', default=0.2, cast=float)
+RETRY_BUDGET_MIN_PER_S = config('GMS_RETRY_BUDGET_MIN_PER_S', default=10.0, cast=float)
+RETRY_BUDGET_MAX = config('GMS_RETRY_BUDGET_MAX', default=500.0, cast=float)
+
+# 서킷 브레이커 (엔드포인트별): 재시도까지 끝난 논리 호출 단위로 결과를 기록,
+# 최근 WINDOW_S 동안 MIN_CALLS 건 이상 중 실패율이 FAILURE_RATE 이상이면 OPEN_S 동안 즉시 실패
+# → 이후 시험 호출 1건이 성공하면 복구.
+# 실패율 기준은 보수적으로 높게: 짧은 장애 직후 일부 호출만 실패한 상태에서는 열리지 않고
+# 재시도로도 못 버티는 지속 장애(거의 전부 실패)에서만 열림
+BREAKER_WINDOW_S = config('GMS_BREAKER_WINDOW_S', default=10.0, cast=float)
+BREAKER_MIN_CALLS = config('GMS_BREAKER_MIN_CALLS', default=20, cast=int)
+BREAKER_FAILURE_RATE = config('GMS_BREAKER_FAILURE_RATE', default=0.8, cast=float)
+BREAKER_OPEN_S = config('GMS_BREAKER_OPEN_S', default=5.0, cast=float)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class GMSUnavailable(Exception):
+    """서킷 브레이커가 열려 있거나 대기열 시간 초과 → GMS 호출 없이 즉시 실패"""
+
+
+class _CircuitBreaker:
+    def __init__(self, window_s: float, min_calls: int, failure_rate: float, open_s: float):
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_s = open_s
+        self.state = "closed"
+        self.outcomes: deque = deque()  # (시각, 실패 여부) — 논리 호출 단위
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """논리 호출 시작 시 1회 확인 (같은 호출의 재시도는 다시 묻지 않음)"""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.open_s:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def _trim(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > self.window_s:
+            self.failures -= self.outcomes.popleft()[1]
+
+    def current_failure_rate(self) -> float:
+        self._trim(time.monotonic())
+        return self.failures / len(self.outcomes) if self.outcomes else 0.0
+
+    def record(self, failed: bool, probe: bool = False):
+        now = time.monotonic()
+        if probe:
+            self.probe_in_flight = False
+            if failed:
+                self._open(now, "probe failed")
+            else:
+                # 복구 확인 → 장애 구간 기록은 버리고 새로 시작
+                self.state = "closed"
+                self.outcomes.clear()
+                self.failures = 0
+            return
+        self.outcomes.append((now, failed))
+        self.failures += failed
+        self._trim(now)
+        if (self.state == "closed" and len(self.outcomes) >= self.min_calls
+                and self.failures / len(self.outcomes) >= self.failure_rate):
+            self._open(now, f"{self.failures}/{len(self.outcomes)} failed in {self.window_s:.0f}s")
+
+    def _open(self, now: float, reason: str):
+        if self.state != "open":
+            self.times_opened += 1
+            print(f"[gms-governor] circuit open ({reason})")
+        self.state = "open"
+        self.opened_at = now
+
+
+class _RetryBudget:
+    def __init__(self, ratio: float, min_per_s: float, maximum: float):
+        self.ratio = ratio
+        self.min_per_s = min_per_s
+        self.maximum = maximum
+        self.tokens = maximum
+        self.updated_at = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated_at) * self.min_per_s, self.maximum)
+        self.updated_at = now
+
+    def deposit(self):
+        self._refill()
+        self.tokens = min(self.tokens + self.ratio, self.maximum)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+
+class _EndpointState:
+    def __init__(self, name: str):
+        self.limit = MAX_INFLIGHT.get(name, DEFAULT_MAX_INFLIGHT)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        self.breaker = _CircuitBreaker(BREAKER_WINDOW_S, BREAKER_MIN_CALLS, BREAKER_FAILURE_RATE, BREAKER_OPEN_S)
+        self.inflight = 0
+        self.waiting = 0
+        self.stats = {
+            "calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+            "rejected_open": 0, "rejected_queue": 0,
+            "queue_ms_total": 0.0, "queue_ms_max": 0.0,
+        }
+
+
+_endpoints: Dict[str, _EndpointState] = {}
+_budget = _RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_PER_S, RETRY_BUDGET_MAX)
+
+
+def _state(endpoint: str) -> _EndpointState:
+    endpoint = _POOL.get(endpoint, endpoint)
+    state = _endpoints.get(endpoint)
+    if state is None:
+        state = _endpoints[endpoint] = _EndpointState(endpoint)
+    return state
+
+
+def _is_retryable(result) -> bool:
+    if isinstance(result, httpx.Response):
+        return result.status_code in RETRYABLE_STATUS
+    return isinstance(result, (httpx.TransportError, httpx.TimeoutException))
+
+
+def _backoff_s(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    delay = min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** attempt)) * (1 - random.uniform(0, BACKOFF_JITTER))
+    if response is not None:
+        # 429/503 의 Retry-After(초) 는 존중하되 상한 적용
+        try:
+            delay = max(delay, min(float(response.headers.get("retry-after", 0)), BACKOFF_MAX_S))
+        except ValueError:
+            pass
+    return delay
+
+
+async def _acquire(state: _EndpointState, timeout: float) -> float:
+    """슬롯 획득까지 대기한 시간(ms). timeout 초과 시 GMSUnavailable"""
+    started = time.perf_counter()
+    state.waiting += 1
+    try:
+        await asyncio.wait_for(state.semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        state.stats["rejected_queue"] += 1
+        raise GMSUnavailable(f"GMS 호출 대기열 시간 초과 ({timeout:.0f}s)")
+    finally:
+        state.waiting -= 1
+    queue_ms = (time.perf_counter() - started) * 1000
+    state.stats["queue_ms_total"] += queue_ms
+    state.stats["queue_ms_max"] = max(state.stats["queue_ms_max"], queue_ms)
+    return queue_ms
+
+
+async def call(
+    endpoint: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    *,
+    max_retries: int = MAX_RETRIES,
+    queue_timeout: float = QUEUE_TIMEOUT_S,
+) -> httpx.Response:
+    """
+    GMS 호출 1건을 governor 정책으로 실행.
+    - 엔드포인트별 세마포어로 동시 호출 제한 (재시도도 슬롯을 다시 잡음, 백오프 중에는 반납)
+    - 연결 오류/타임아웃/429/5xx 만 재시도 (전역 재시도 예산 안에서)
+    - 브레이커는 호출 시작 시 1회 확인, 결과는 재시도까지 끝난 뒤 1회 기록 (OPEN 이면 GMSUnavailable)
+    - 마지막 시도의 응답은 상태와 관계없이 반환 (raise_for_status 는 호출하는 쪽에서)
+    """
+    state = _state(endpoint)
+    breaker = state.breaker
+    if not breaker.allow():
+        state.stats["rejected_open"] += 1
+        raise GMSUnavailable(f"GMS '{endpoint}' circuit open")
+    probe = breaker.state == "half_open"
+    state.stats["calls"] += 1
+    _budget.deposit()
+
+    try:
+        result = await _call_with_retries(endpoint, state, send, max_retries, queue_timeout)
+    except asyncio.CancelledError:
+        # 호출한 쪽이 취소 → 결과를 모르므로 성공/실패 어느 쪽으로도 기록하지 않음
+        if probe:
+            breaker.probe_in_flight = False
+        raise
+    except BaseException as e:
+        # upstream 결과(연결 오류/타임아웃)만 기록. 대기열 포기(GMSUnavailable)·send 쪽 버그는
+        # upstream 상태와 무관하므로 기록하지 않고 시험 호출 자리만 돌려줌
+        if _is_retryable(e):
+            breaker.record(True, probe)
+        elif probe:
+            breaker.probe_in_flight = False
+        raise
+    breaker.record(_is_retryable(result), probe)
+    return result
+
+
+async def _call_with_retries(
+    endpoint: str,
+    state: _EndpointState,
+    send: Callable[[], Awaitable[httpx.Response]],
+    max_retries: int,
+    queue_timeout: float,
+) -> httpx.Response:
+    attempt = 0
+    while True:
+        await _acquire(state, queue_timeout)
+        state.inflight += 1
+        state.stats["attempts"] += 1
+        try:
+            result = await send()
+        except Exception as e:
+            result = e
+        finally:
+            state.inflight -= 1
+            state.semaphore.release()
+
+        if not _is_retryable(result):
+            # 4xx 등은 요청 문제이므로 upstream 장애로 세지 않음
+            if isinstance(result, BaseException):
+                state.stats["failures"] += 1
+                raise result
+            return result
+
+        if attempt >= max_retries or not _budget.withdraw():
+            state.stats["failures"] += 1
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        delay = _backoff_s(attempt, result if isinstance(result, httpx.Response) else None)
+        attempt += 1
+        state.stats["retries"] += 1
+        reason = result.status_code if isinstance(result, httpx.Response) else type(result).__name__
+        print(f"[gms-governor] {endpoint} 재시도 {attempt}/{max_retries} ({reason}, {delay:.2f}s 후)")
+        await asyncio.sleep(delay)
+
+
+def governor_metrics() -> dict:
+    return {
+        "retry_budget": {"tokens": round(_budget.tokens, 2), "exhausted": _budget.exhausted},
+        "endpoints": {
+            name: {
+                "limit": s.limit,
+                "inflight": s.inflight,
+                "waiting": s.waiting,
+                "circuit": s.breaker.state,
+                "circuit_opened": s.breaker.times_opened,
+                "failure_rate": round(s.breaker.current_failure_rate(), 3),
+                **{k: v for k, v in s.stats.items() if not k.startswith("queue_ms")},
+                "queue_ms_avg": round(s.stats["queue_ms_total"] / s.stats["attempts"], 1) if s.stats["attempts"] else 0.0,
+                "queue_ms_max": round(s.stats["queue_ms_max"], 1),
+            }
+            for name, s in _endpoints.items()
+        },
+    }
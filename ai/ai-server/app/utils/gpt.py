@@ -1,14 +1,64 @@
 # utils/gpt.py
+import asyncio
 import httpx
 import re
 import json
+from typing import Optional, get_args
+
 from decouple import config
+from pydantic import ValidationError
+
+from app.schemas import AnswerEvaluationList, EvaluationLevel
+from app.utils import gms_cache
+from app.utils.http_client import CHAT_TIMEOUT, QUESTION_TIMEOUT, gms_post
+
+# 답변 평가 모드: json(압축 프롬프트 + JSON 스키마 출력, pydantic 검증) / text(기존 자유 서술 + 정규식 파싱)
+GPT_EVAL_MODE = config('GPT_EVAL_MODE', default='json')
+EVAL_MODEL = config('GPT_EVAL_MODEL', default='gpt-4o')
+# 한국어 근거/코멘트 3문장 + JSON 키 → 쌍당 여유 있게 (잘리면 JSON 이 깨짐)
+EVAL_MAX_TOKENS_PER_ANSWER = config('GPT_EVAL_MAX_TOKENS_PER_ANSWER', default=400, cast=int)
+# 세션 종료 시 일괄 평가: 한 요청에 넣을 최대 쌍 수 / 입력 토큰 추정 상한
+EVAL_BATCH_MAX_PAIRS = config('GPT_EVAL_BATCH_MAX_PAIRS', default=9, cast=int)
+EVAL_BATCH_MAX_PROMPT_TOKENS = config('GPT_EVAL_BATCH_MAX_PROMPT_TOKENS', default=6000, cast=int)
+
+# 호출 목적별 토큰 사용량
+_USAGE_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens")
+usage_metrics: dict = {}
+
 
-GMS_API_KEY = config('GMS_API_KEY')
-GMS_API_URL = config('GMS_BASE_URL')
+def _usage_stats(purpose: str) -> dict:
+    return usage_metrics.setdefault(
+        purpose, {"calls": 0, "cached": 0, "invalid": 0, "truncated": 0, **{k: 0 for k in _USAGE_KEYS}}
+    )
+
+
+def _record_usage(purpose: str, response: httpx.Response) -> dict:
+    """응답의 usage 를 목적별로 누적 (캐시 적중은 토큰을 쓰지 않으므로 따로 셈)"""
+    stats = _usage_stats(purpose)
+    if response.headers.get("x-gms-cache") == "hit":
+        stats["cached"] += 1
+        return {}
+    usage = response.json().get("usage") or {}
+    stats["calls"] += 1
+    for k in _USAGE_KEYS:
+        stats[k] += int(usage.get(k) or 0)
+    return usage
+
+
+def gpt_usage_metrics() -> dict:
+    return {
+        "eval_mode": GPT_EVAL_MODE,
+        "purposes": {
+            purpose: {
+                **stats,
+                **{f"avg_{k}": round(stats[k] / stats["calls"], 1) if stats["calls"] else 0.0 for k in _USAGE_KEYS},
+            }
+            for purpose, stats in usage_metrics.items()
+        },
+    }
 
 
-async def ask_gpt_if_ends_async(question_list: list[str], answer_list: list[str]) -> str:
+async def ask_gpt_if_ends_async(question_list: list[str], answer_list: list[str], client: Optional[httpx.AsyncClient] = None) -> str:
     """
     GPT API 호출 (비동기 httpx 사용) - 답변 평가
     경량 모델을 사용해 응답 지연을 낮춤.
@@ -37,21 +87,20 @@ async def ask_gpt_if_ends_async(question_list: list[str], answer_list: list[str]
         GPT 코멘트:
     """
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.post(
-            f"{GMS_API_URL}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GMS_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-4o",  # 경량 모델 사용으로 지연 절감
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0
-            }
-        )
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
+    response = await gms_post(
+        "chat/completions",
+        endpoint="chat",
+        timeout=CHAT_TIMEOUT,
+        client=client,
+        json={
+            "model": "gpt-4o",  # 경량 모델 사용으로 지연 절감
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0
+        }
+    )
+    response.raise_for_status()
+    _record_usage("eval_text", response)
+    return response.json()["choices"][0]["message"]["content"]
 
 
 def parse_gpt_result(gpt_text: str):
@@ -70,7 +119,149 @@ def parse_gpt_result(gpt_text: str):
     return parsed
 
 
-async def generate_initial_question(text: str) -> list[str]:
+EVAL_JSON_PROMPT = """면접 답변 평가. 각 질문-답변 쌍마다 JSON 으로만 답할 것.
+is_ended: '-습니다'체 등 면접 격식을 갖춰 말을 끝맺었으면 true, 반말/말끝 흐림이면 false
+context_matched: 답변이 질문 의도와 의미상 일치하면 true
+reason_end, reason_context: 판단 근거 한 문장 / gpt_comment: 개선 조언 한 문장
+end_level: OUTSTANDING(격식 있고 깔끔·명확하게 완결) / NORMAL(끝맺었으나 다소 모호·장황) / INADEQUATE(is_ended=false)
+filler_level: 추임새(음, 어, 그, 약간 등) 빈도 OUTSTANDING(거의 없음) / NORMAL(약간~중간) / INADEQUATE(많음)
+"""
+
+EVAL_LEVELS = get_args(EvaluationLevel)
+
+EVAL_JSON_SCHEMA = {
+    "name": "answer_evaluations",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["evaluations"],
+        "properties": {
+            "evaluations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["order", "is_ended", "reason_end", "context_matched", "reason_context", "gpt_comment",
+                                 "end_level", "filler_level"],
+                    "properties": {
+                        "order": {"type": "integer"},
+                        "is_ended": {"type": "boolean"},
+                        "reason_end": {"type": "string"},
+                        "context_matched": {"type": "boolean"},
+                        "reason_context": {"type": "string"},
+                        "gpt_comment": {"type": "string"},
+                        "end_level": {"type": "string", "enum": list(EVAL_LEVELS)},
+                        "filler_level": {"type": "string", "enum": list(EVAL_LEVELS)},
+                    },
+                },
+            }
+        },
+    },
+}
+
+
+async def ask_gpt_eval_json_async(question_list: list[str], answer_list: list[str], client: Optional[httpx.AsyncClient] = None) -> list[dict]:
+    """
+    답변 평가 (structured JSON 모드) - parse_gpt_result 와 같은 형태의 list[dict] 반환
+    스키마 검증 실패 시 빈 리스트 (호출하는 쪽에서 기본값 처리)
+    """
+    pairs = "\n".join(
+        f"[{i}] Q: {q}\nA: {a}" for i, (q, a) in enumerate(zip(question_list, answer_list), 1)
+    )
+    body = {
+        "model": EVAL_MODEL,
+        "messages": [
+            {"role": "system", "content": EVAL_JSON_PROMPT},
+            {"role": "user", "content": pairs},
+        ],
+        "temperature": 0,
+        "max_tokens": EVAL_MAX_TOKENS_PER_ANSWER * len(question_list),
+        "response_format": {"type": "json_schema", "json_schema": EVAL_JSON_SCHEMA},
+    }
+    response = await gms_post(
+        "chat/completions",
+        endpoint="chat",
+        timeout=CHAT_TIMEOUT,
+        client=client,
+        json=body,
+    )
+    response.raise_for_status()
+    _record_usage("eval_json", response)
+    choice = response.json()["choices"][0]
+    content = choice["message"]["content"] or ""
+    stats = _usage_stats("eval_json")
+
+    if choice.get("finish_reason") == "length":
+        # max_tokens 에서 잘림 → JSON 이 깨졌을 가능성이 높고, 같은 요청은 다시 잘림
+        stats["truncated"] += 1
+        print(f"[GPT] 평가 응답이 max_tokens({body['max_tokens']})에서 잘림: {len(question_list)}쌍, 응답 끝={content[-80:]!r}")
+        await gms_cache.invalidate("chat/completions", {"json": body})
+        return []
+
+    try:
+        result = AnswerEvaluationList.model_validate_json(content)
+    except ValidationError as e:
+        stats["invalid"] += 1
+        print(f"[GPT] 평가 JSON 검증 실패: {e.error_count()}건, 응답={content[:200]!r}")
+        # 캐시에 남기면 같은 Q/A 재제출 시 깨진 평가가 TTL 동안 재생됨
+        await gms_cache.invalidate("chat/completions", {"json": body})
+        return []
+    return [item.model_dump() for item in result.evaluations]
+
+
+async def evaluate_answers_async(question_list: list[str], answer_list: list[str], client: Optional[httpx.AsyncClient] = None) -> list[dict]:
+    """GPT_EVAL_MODE 에 따라 답변 평가 → [{"order", "is_ended", "reason_end", "context_matched", "reason_context", "gpt_comment"}]
+
+    json 모드는 end_level / filler_level 등급도 포함 (routes.map_end_type / map_stop_words 가 우선 사용)
+    """
+    if GPT_EVAL_MODE == "json":
+        return await ask_gpt_eval_json_async(question_list, answer_list, client=client)
+    return parse_gpt_result(await ask_gpt_if_ends_async(question_list, answer_list, client=client))
+
+
+def _estimate_tokens(text: str) -> int:
+    # 한국어는 대략 글자당 1토큰 이하 → 글자 수로 보수적으로 추정 (tokenizer 의존성 없이)
+    return len(text)
+
+
+def chunk_eval_pairs(question_list: list[str], answer_list: list[str]) -> list[list[int]]:
+    """일괄 평가용 인덱스 묶음 (쌍 수 / 추정 입력 토큰 상한 이내, 순서 유지)"""
+    chunks, current, tokens = [], [], _estimate_tokens(EVAL_JSON_PROMPT)
+    for i, (q, a) in enumerate(zip(question_list, answer_list)):
+        cost = _estimate_tokens(q) + _estimate_tokens(a) + 16
+        if current and (len(current) >= EVAL_BATCH_MAX_PAIRS or tokens + cost > EVAL_BATCH_MAX_PROMPT_TOKENS):
+            chunks.append(current)
+            current, tokens = [], _estimate_tokens(EVAL_JSON_PROMPT)
+        current.append(i)
+        tokens += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def evaluate_answers_batched_async(question_list: list[str], answer_list: list[str], client: Optional[httpx.AsyncClient] = None) -> list[Optional[dict]]:
+    """
+    여러 쌍을 묶음 단위로 평가 (묶음끼리는 동시 호출) → 입력 순서대로 결과, 실패/누락된 쌍은 None
+    """
+    chunks = chunk_eval_pairs(question_list, answer_list)
+    results = await asyncio.gather(
+        *(evaluate_answers_async([question_list[i] for i in idx], [answer_list[i] for i in idx], client=client)
+          for idx in chunks),
+        return_exceptions=True,
+    )
+    out: list[Optional[dict]] = [None] * len(question_list)
+    for idx, result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            print(f"[GPT] 일괄 평가 실패 ({len(idx)}쌍): {result}")
+            continue
+        by_order = {item["order"]: item for item in result}
+        for n, i in enumerate(idx, 1):
+            out[i] = by_order.get(n)
+    return out
+
+
+async def generate_initial_question(text: str, client: Optional[httpx.AsyncClient] = None) -> list[str]:
     """
     자기소개서/포트폴리오 텍스트를 받아 실제 면접용 대질문 3개를 list[str] 형태로 반환
     """
@@ -92,36 +283,35 @@ async def generate_initial_question(text: str) -> list[str]:
         ]
     """
 
-    async with httpx.AsyncClient(timeout=90) as client:
-        response = await client.post(
-            f"{GMS_API_URL}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GMS_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-4o-mini",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0
-            }
-        )
-        response.raise_for_status()
+    response = await gms_post(
+        "chat/completions",
+        endpoint="chat",
+        timeout=QUESTION_TIMEOUT,
+        client=client,
+        json={
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0
+        }
+    )
+    response.raise_for_status()
+    _record_usage("initial_question", response)
 
-        raw_output = response.json()["choices"][0]["message"]["content"].strip()
+    raw_output = response.json()["choices"][0]["message"]["content"].strip()
 
-        # ```json ... ``` 마크다운 제거
-        cleaned_output = re.sub(r"^```json\s*|\s*```$", "", raw_output.strip(), flags=re.MULTILINE)
+    # ```json ... ``` 마크다운 제거
+    cleaned_output = re.sub(r"^```json\s*|\s*```$", "", raw_output.strip(), flags=re.MULTILINE)
 
-        try:
-            question_list = json.loads(cleaned_output)
-            if not isinstance(question_list, list):
-                raise ValueError("응답이 리스트 형식이 아님")
-            return [str(q).strip() for q in question_list][:3]
-        except json.JSONDecodeError as e:
-            raise ValueError(f"GPT 응답이 올바른 JSON 형식이 아닙니다: {raw_output}") from e
+    try:
+        question_list = json.loads(cleaned_output)
+        if not isinstance(question_list, list):
+            raise ValueError("응답이 리스트 형식이 아님")
+        return [str(q).strip() for q in question_list][:3]
+    except json.JSONDecodeError as e:
+        raise ValueError(f"GPT 응답이 올바른 JSON 형식이 아닙니다: {raw_output}") from e
 
 
-async def generate_followup_question(base_question: str, answer: str) -> str:
+async def generate_followup_question(base_question: str, answer: str, client: Optional[httpx.AsyncClient] = None) -> str:
     """
     사용자의 답변(STT 결과)을 바탕으로 꼬리질문 1개 생성
     """
@@ -140,25 +330,24 @@ async def generate_followup_question(base_question: str, answer: str) -> str:
         꼬리질문:
     """
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.post(
-            f"{GMS_API_URL}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GMS_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-4o",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.5
-            }
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"].strip()
-        return content.replace("꼬리질문:", "").strip()
+    response = await gms_post(
+        "chat/completions",
+        endpoint="chat",
+        timeout=CHAT_TIMEOUT,
+        client=client,
+        json={
+            "model": "gpt-4o",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.5
+        }
+    )
+    response.raise_for_status()
+    _record_usage("followup_question", response)
+    content = response.json()["choices"][0]["message"]["content"].strip()
+    return content.replace("꼬리질문:", "").strip()
 
 
-async def generate_second_followup_question(base_question: str, answer1: str, followup1: str, answer2: str) -> str:
+async def generate_second_followup_question(base_question: str, answer1: str, followup1: str, answer2: str, client: Optional[httpx.AsyncClient] = None) -> str:
     """
     첫 질문과 첫 꼬리질문에 대한 두 개의 답변을 바탕으로 두 번째 꼬리질문 생성
     """
@@ -180,19 +369,18 @@ async def generate_second_followup_question(base_question: str, answer1: str, fo
         꼬리질문:
     """
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.post(
-            f"{GMS_API_URL}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GMS_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-4o",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.5
-            }
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"].strip()
-        return content.replace("꼬리질문:", "").strip()
\ No newline at end of file
+    response = await gms_post(
+        "chat/completions",
+        endpoint="chat",
+        timeout=CHAT_TIMEOUT,
+        client=client,
+        json={
+            "model": "gpt-4o",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.5
+        }
+    )
+    response.raise_for_status()
+    _record_usage("followup_question", response)
+    content = response.json()["choices"][0]["message"]["content"].strip()
+    return content.replace("꼬리질문:", "").strip()
\ No newline at end of file
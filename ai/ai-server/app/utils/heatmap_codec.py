@@ -0,0 +1,129 @@
+# app/utils/heatmap_codec.py
+# 히트맵 응답 인코딩 (협상형)
+# - dense  : 기존 포맷. 행 단위 한 줄 문자열 "[\n[0,0,...],\n...\n]" (기본값)
+# - coo    : 0 이 아닌 셀만 {"indices": row-major 평탄 인덱스, "values": 값}
+# - rle    : row-major 평탄 배열의 run-length {"values": 값, "lengths": 길이}
+# - b64u16 : little-endian uint16 배열의 base64 (음수 0, 65535 초과는 65535 로 제한, 실수는 반올림)
+# 선택: ?heatmap_format=coo 쿼리 > Accept: application/json; heatmap=coo 헤더 > dense
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Optional
+
+import numpy as np
+
+HEATMAP_FORMATS = ("dense", "coo", "rle", "b64u16")
+DEFAULT_HEATMAP_FORMAT = "dense"
+HEATMAP_KEY = "heatmap_data"
+
+
+def negotiate_heatmap_format(query_value: Optional[str] = None, accept: Optional[str] = None) -> str:
+    """쿼리 파라미터 > Accept 헤더 파라미터(heatmap=...) > dense
+
+    쿼리로 지원하지 않는 포맷을 명시하면 ValueError, Accept 헤더의 모르는 값은 무시
+    """
+    if query_value:
+        fmt = query_value.strip().lower()
+        if fmt not in HEATMAP_FORMATS:
+            raise ValueError(f"unsupported heatmap format: {query_value} (choose from {', '.join(HEATMAP_FORMATS)})")
+        return fmt
+
+    for media_range in (accept or "").split(","):
+        for param in media_range.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "heatmap":
+                fmt = value.strip().strip('"').lower()
+                if fmt in HEATMAP_FORMATS:
+                    return fmt
+    return DEFAULT_HEATMAP_FORMAT
+
+
+def _as_grid(heatmap: Any) -> Optional[np.ndarray]:
+    """ndarray / 2차원 리스트 / 기존 dense 문자열 → 2차원 배열 (히트맵이 아니면 None)"""
+    if isinstance(heatmap, str):
+        try:
+            heatmap = json.loads(heatmap)
+        except ValueError:
+            return None
+    if isinstance(heatmap, np.ndarray):
+        grid = heatmap
+    elif isinstance(heatmap, list) and heatmap and isinstance(heatmap[0], list):
+        grid = np.asarray(heatmap)
+    else:
+        return None
+    return grid if grid.ndim == 2 else None
+
+
+def format_dense(grid: np.ndarray) -> str:
+    """기존 dense 포맷 문자열 (행마다 한 줄)"""
+    rows = ["[" + ",".join(map(str, row)) + "]" for row in grid.tolist()]
+    return "[\n" + ",\n".join(rows) + "\n]"
+
+
+def encode_heatmap(heatmap: Any, fmt: str = DEFAULT_HEATMAP_FORMAT) -> Any:
+    """히트맵 하나를 지정 포맷으로 인코딩 (히트맵 형태가 아니면 그대로 반환)"""
+    grid = _as_grid(heatmap)
+    if grid is None:
+        return heatmap
+    if fmt == "dense":
+        return format_dense(grid)
+
+    shape = list(grid.shape)
+    flat = grid.ravel()
+
+    if fmt == "coo":
+        indices = np.flatnonzero(flat)
+        return {"encoding": "coo", "shape": shape, "indices": indices.tolist(), "values": flat[indices].tolist()}
+
+    if fmt == "rle":
+        if flat.size == 0:
+            return {"encoding": "rle", "shape": shape, "values": [], "lengths": []}
+        starts = np.flatnonzero(np.concatenate(([True], flat[1:] != flat[:-1])))
+        lengths = np.diff(np.append(starts, flat.size))
+        return {"encoding": "rle", "shape": shape, "values": flat[starts].tolist(), "lengths": lengths.tolist()}
+
+    if fmt == "b64u16":
+        packed = np.clip(np.rint(flat), 0, np.iinfo(np.uint16).max).astype("<u2")
+        return {
+            "encoding": "b64u16",
+            "shape": shape,
+            "dtype": "<u2",
+            "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+        }
+
+    raise ValueError(f"unsupported heatmap format: {fmt}")
+
+
+def decode_heatmap(payload: Any) -> np.ndarray:
+    """encode_heatmap 결과 → 2차원 배열 (클라이언트/검증용)"""
+    if not isinstance(payload, dict):
+        grid = _as_grid(payload)
+        if grid is None:
+            raise ValueError("not a heatmap payload")
+        return grid
+
+    shape = tuple(payload["shape"])
+    encoding = payload.get("encoding")
+    if encoding == "coo":
+        values = np.asarray(payload["values"])
+        flat = np.zeros(int(np.prod(shape)), dtype=values.dtype if values.size else np.int64)
+        flat[np.asarray(payload["indices"], dtype=np.int64)] = values
+        return flat.reshape(shape)
+    if encoding == "rle":
+        return np.repeat(np.asarray(payload["values"]), np.asarray(payload["lengths"], dtype=np.int64)).reshape(shape)
+    if encoding == "b64u16":
+        return np.frombuffer(base64.b64decode(payload["data"]), dtype=payload.get("dtype", "<u2")).reshape(shape)
+    raise ValueError(f"unsupported heatmap encoding: {encoding}")
+
+
+def encode_heatmaps_in(obj: Any, fmt: str = DEFAULT_HEATMAP_FORMAT) -> Any:
+    """응답 객체 안의 모든 heatmap_data 값을 인코딩 (dict/list 재귀, 원본은 변경하지 않음)"""
+    if isinstance(obj, dict):
+        return {
+            k: (encode_heatmap(v, fmt) if k == HEATMAP_KEY and v is not None else encode_heatmaps_in(v, fmt))
+            for k, v in obj.items()
+        }
+    if isinstance(obj, list):
+        return [encode_heatmaps_in(item, fmt) for item in obj]
+    return obj
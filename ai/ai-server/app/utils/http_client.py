@@ -0,0 +1,209 @@
+# app/utils/http_client.py
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Optional
+
+import httpx
+from decouple import config
+
+from app.utils import gms_cache, gms_governor
+
+GMS_API_KEY = config('GMS_API_KEY')
+GMS_API_URL = config('GMS_BASE_URL')
+
+# 커넥션 풀 (앱 전체 공유)
+MAX_CONNECTIONS = config('GMS_MAX_CONNECTIONS', default=20, cast=int)
+MAX_KEEPALIVE = config('GMS_MAX_KEEPALIVE', default=10, cast=int)
+KEEPALIVE_EXPIRY = config('GMS_KEEPALIVE_EXPIRY', default=60.0, cast=float)
+HTTP2 = config('GMS_HTTP2', default=True, cast=bool)
+
+# 엔드포인트별 타임아웃 (연결은 짧게, 응답 대기는 엔드포인트 성격에 맞게)
+CONNECT_TIMEOUT = config('GMS_CONNECT_TIMEOUT', default=10.0, cast=float)
+STT_TIMEOUT = httpx.Timeout(config('GMS_STT_TIMEOUT', default=60.0, cast=float), connect=CONNECT_TIMEOUT)
+STT_VERBOSE_TIMEOUT = httpx.Timeout(config('GMS_STT_VERBOSE_TIMEOUT', default=120.0, cast=float), connect=CONNECT_TIMEOUT)
+CHAT_TIMEOUT = httpx.Timeout(config('GMS_CHAT_TIMEOUT', default=60.0, cast=float), connect=CONNECT_TIMEOUT)
+QUESTION_TIMEOUT = httpx.Timeout(config('GMS_QUESTION_TIMEOUT', default=90.0, cast=float), connect=CONNECT_TIMEOUT)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class _ClientMetrics:
+    """요청 수 대비 새로 연 커넥션 수 (재사용률) + 엔드포인트별 요청/오류/지연"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.http_versions = Counter()
+        self.endpoints = {}
+
+    def endpoint(self, name: str) -> dict:
+        return self.endpoints.setdefault(name, {"requests": 0, "errors": 0, "total_ms": 0.0})
+
+    async def trace(self, event_name: str, info: dict):
+        # httpcore trace: 풀에 재사용 가능한 커넥션이 없을 때만 connect_tcp 가 발생
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def snapshot(self) -> dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "http2_enabled": bool(_client is not None and _http2_enabled()),
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_requests": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "http_versions": dict(self.http_versions),
+            "endpoints": {
+                name: {
+                    "requests": e["requests"],
+                    "errors": e["errors"],
+                    "avg_ms": round(e["total_ms"] / e["requests"], 1) if e["requests"] else 0.0,
+                }
+                for name, e in self.endpoints.items()
+            },
+        }
+
+
+metrics = _ClientMetrics()
+
+
+def _http2_enabled() -> bool:
+    if not HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx[http2] 가 없으면 HTTP/1.1 keep-alive 로 동작)
+        return True
+    except ImportError:
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    http2 = _http2_enabled()
+    print(f"[http] GMS client: http2={http2} max_connections={MAX_CONNECTIONS} keepalive={MAX_KEEPALIVE}")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=CHAT_TIMEOUT,
+        headers={"Authorization": f"Bearer {GMS_API_KEY}"},
+    )
+
+
+async def startup_http_client() -> httpx.AsyncClient:
+    """앱 시작 시 공유 클라이언트 생성"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def shutdown_http_client():
+    """앱 종료 시 커넥션 풀 정리"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        print(f"[http] GMS client closed: {metrics.snapshot()}")
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 클라이언트 (startup 훅 없이 import 해서 쓰는 경우 지연 생성)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+def gms_url(path: str) -> str:
+    return f"{GMS_API_URL.rstrip('/')}/{path.lstrip('/')}"
+
+
+async def gms_post(
+    path: str,
+    *,
+    endpoint: str,
+    timeout: httpx.Timeout,
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    GMS API POST (공유 커넥션 풀 사용).
+    - client 를 주입하지 않으면 앱 공유 클라이언트 사용
+    - 결정적 호출(temperature 0 chat, STT)은 gms_cache 에서 먼저 찾고, 200 응답만 저장
+    - 실제 호출은 gms_governor 경유 (동시 호출 제한, 백오프 재시도, 서킷 브레이커)
+    - 응답 상태 검사는 호출하는 쪽에서 (raise_for_status)
+    """
+    if not gms_cache.is_cacheable(path, kwargs):
+        if gms_cache.GMS_CACHE_ENABLED:
+            gms_cache.metrics["bypass"] += 1
+        return await _governed_post(path, endpoint=endpoint, timeout=timeout, client=client, **kwargs)
+
+    key = gms_cache.cache_key(path, kwargs)
+    async with gms_cache.single_flight(key):
+        cached = await gms_cache.get(key)
+        if cached is not None:
+            return httpx.Response(
+                200,
+                headers={"content-type": cached.content_type, "x-gms-cache": "hit"},
+                content=cached.body,
+                request=httpx.Request("POST", gms_url(path)),
+            )
+        response = await _governed_post(path, endpoint=endpoint, timeout=timeout, client=client, **kwargs)
+        if response.status_code == 200:
+            await gms_cache.put(key, path, response.content, response.headers.get("content-type", "application/json"))
+        return response
+
+
+async def _governed_post(path: str, *, endpoint: str, **kwargs) -> httpx.Response:
+    return await gms_governor.call(endpoint, lambda: _post(path, endpoint=endpoint, **kwargs))
+
+
+async def _post(
+    path: str,
+    *,
+    endpoint: str,
+    timeout: httpx.Timeout,
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs,
+) -> httpx.Response:
+    client = client or get_http_client()
+    stats = metrics.endpoint(endpoint)
+    metrics.requests += 1
+    stats["requests"] += 1
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            gms_url(path),
+            timeout=timeout,
+            extensions={"trace": metrics.trace},
+            **kwargs,
+        )
+    except Exception:
+        metrics.errors += 1
+        stats["errors"] += 1
+        raise
+    finally:
+        stats["total_ms"] += (time.perf_counter() - started) * 1000
+    metrics.http_versions[response.http_version] += 1
+    if response.is_error:
+        metrics.errors += 1
+        stats["errors"] += 1
+    return response
+
+
+def http_client_metrics() -> dict:
+    return metrics.snapshot()
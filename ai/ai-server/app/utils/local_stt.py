@@ -0,0 +1,208 @@
+# utils/local_stt.py
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import gcd
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+from decouple import config
+
+# 로컬 Whisper 설정 (배포별 .env 로 조정)
+LOCAL_STT_MODEL = config('LOCAL_STT_MODEL', default='small')        # tiny/base/small/medium/large-v3/turbo
+LOCAL_STT_DEVICE = config('LOCAL_STT_DEVICE', default='cpu')        # cpu/cuda
+LOCAL_STT_COMPUTE = config('LOCAL_STT_COMPUTE', default='int8')     # CPU: int8(동적 양자화)/fp32, CUDA: fp16
+LOCAL_STT_LANGUAGE = config('LOCAL_STT_LANGUAGE', default='ko')
+LOCAL_STT_WORKERS = config('LOCAL_STT_WORKERS', default=1, cast=int)
+LOCAL_STT_THREADS = config('LOCAL_STT_THREADS', default=0, cast=int)  # 0 이면 torch 기본값
+# 대기+처리 중인 요청이 이 값 이상이면 로컬이 밀린 것으로 보고 원격으로 넘김
+LOCAL_STT_MAX_QUEUE = config('LOCAL_STT_MAX_QUEUE', default=LOCAL_STT_WORKERS * 2, cast=int)
+
+WHISPER_SAMPLE_RATE = 16000
+
+# whisper 디코딩은 모델 모듈에 kv-cache hook 을 붙였다 떼므로 스레드 간 모델 공유 불가 → 워커 스레드마다 1개
+_local = threading.local()
+_load_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=LOCAL_STT_WORKERS, thread_name_prefix="local-stt")
+_pending = 0
+_pending_lock = threading.Lock()
+
+metrics = {"requests": 0, "errors": 0, "rejected": 0, "models_loaded": 0, "total_ms": 0.0, "audio_s": 0.0}
+
+
+def is_available() -> bool:
+    """openai-whisper/torch 가 설치되어 있는지"""
+    try:
+        import whisper  # noqa: F401
+        import torch  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _load_model():
+    import torch
+    import whisper
+
+    t0 = time.perf_counter()
+    # 모델 파일 다운로드/로딩은 한 번에 하나씩
+    with _load_lock:
+        if LOCAL_STT_THREADS > 0:
+            torch.set_num_threads(LOCAL_STT_THREADS)
+        model = whisper.load_model(LOCAL_STT_MODEL, device=LOCAL_STT_DEVICE)
+        model.eval()
+        if LOCAL_STT_DEVICE == "cpu" and LOCAL_STT_COMPUTE == "int8":
+            # Linear 가중치 int8 동적 양자화
+            # whisper 의 Linear 는 입력 dtype 으로 캐스팅만 하는 nn.Linear 하위 클래스 → fp32 CPU 에서는 nn.Linear 와 동일
+            from whisper.model import Linear as WhisperLinear
+            for module in model.modules():
+                if type(module) is WhisperLinear:
+                    module.__class__ = torch.nn.Linear
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        metrics["models_loaded"] += 1
+    print(f"[local-stt] whisper '{LOCAL_STT_MODEL}' loaded on {LOCAL_STT_DEVICE}/{LOCAL_STT_COMPUTE} "
+          f"({time.perf_counter() - t0:.1f}s, thread={threading.current_thread().name})")
+    return model
+
+
+def _get_model():
+    model = getattr(_local, "model", None)
+    if model is None:
+        model = _local.model = _load_model()
+    return model
+
+
+def _resample(audio: np.ndarray, sr: int) -> np.ndarray:
+    if sr == WHISPER_SAMPLE_RATE:
+        return audio
+    from scipy.signal import resample_poly
+    g = gcd(sr, WHISPER_SAMPLE_RATE)
+    return resample_poly(audio, WHISPER_SAMPLE_RATE // g, sr // g).astype(np.float32)
+
+
+def _decode_audio(contents: bytes, filename: str) -> np.ndarray:
+    """오디오 bytes → 16kHz mono float32 (wav/flac/ogg 는 메모리에서, 그 외(webm/mp4 등)는 ffmpeg)"""
+    try:
+        audio, sr = sf.read(io.BytesIO(contents), dtype="float32", always_2d=True)
+        return _resample(audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0], sr)
+    except Exception:
+        import whisper
+        suffix = os.path.splitext(filename)[1] or ".wav"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            tmp.write(contents)
+            path = tmp.name
+        try:
+            return whisper.load_audio(path, sr=WHISPER_SAMPLE_RATE)
+        finally:
+            os.remove(path)
+
+
+def transcribe_verbose_sync(contents: bytes, filename: str = "audio.wav") -> dict:
+    """
+    로컬 Whisper 추론 → GMS verbose_json 과 같은 형태
+    {"task", "language", "duration", "text", "segments": [{"id", "start", "end", "text", ...}]}
+    """
+    model = _get_model()
+    audio = _decode_audio(contents, filename)
+    duration = len(audio) / WHISPER_SAMPLE_RATE
+
+    t0 = time.perf_counter()
+    result = model.transcribe(
+        audio,
+        language=LOCAL_STT_LANGUAGE or None,
+        temperature=0.0,
+        fp16=(LOCAL_STT_DEVICE != "cpu" and LOCAL_STT_COMPUTE != "fp32"),
+        verbose=None,
+    )
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    metrics["total_ms"] += elapsed_ms
+    metrics["audio_s"] += duration
+
+    segments = [
+        {
+            "id": seg["id"],
+            "seek": seg["seek"],
+            "start": round(float(seg["start"]), 2),
+            "end": round(float(seg["end"]), 2),
+            "text": seg["text"],
+            "temperature": seg.get("temperature", 0.0),
+            "avg_logprob": seg.get("avg_logprob"),
+            "compression_ratio": seg.get("compression_ratio"),
+            "no_speech_prob": seg.get("no_speech_prob"),
+        }
+        for seg in result.get("segments", [])
+    ]
+    return {
+        "task": "transcribe",
+        "language": result.get("language", LOCAL_STT_LANGUAGE),
+        "duration": round(duration, 2),
+        "text": result.get("text", "").strip(),
+        "segments": segments,
+    }
+
+
+def queue_depth() -> int:
+    """로컬 워커에 제출되어 대기/처리 중인 요청 수"""
+    return _pending
+
+
+def is_saturated() -> bool:
+    return _pending >= LOCAL_STT_MAX_QUEUE
+
+
+def is_loaded() -> bool:
+    return metrics["models_loaded"] > 0
+
+
+async def transcribe_verbose(contents: bytes, filename: str = "audio.wav") -> dict:
+    """워커 풀(LOCAL_STT_WORKERS)에서 로컬 추론"""
+    global _pending
+    with _pending_lock:
+        _pending += 1
+    metrics["requests"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, transcribe_verbose_sync, contents, filename)
+    except Exception:
+        metrics["errors"] += 1
+        raise
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+async def warmup():
+    """모든 워커 스레드에 모델을 미리 로딩 (첫 요청 지연 제거)"""
+    loop = asyncio.get_running_loop()
+    barrier = threading.Barrier(LOCAL_STT_WORKERS)
+
+    def _load_on_worker():
+        _get_model()
+        barrier.wait(timeout=600)  # 한 스레드가 두 번 받지 않도록 모든 워커가 하나씩 잡을 때까지 대기
+
+    await asyncio.gather(*(loop.run_in_executor(_executor, _load_on_worker) for _ in range(LOCAL_STT_WORKERS)))
+
+
+def local_stt_metrics() -> dict:
+    processed = metrics["requests"] - metrics["errors"]
+    return {
+        "model": LOCAL_STT_MODEL,
+        "device": LOCAL_STT_DEVICE,
+        "compute": LOCAL_STT_COMPUTE,
+        "workers": LOCAL_STT_WORKERS,
+        "max_queue": LOCAL_STT_MAX_QUEUE,
+        "queue_depth": _pending,
+        "requests": metrics["requests"],
+        "errors": metrics["errors"],
+        "rejected": metrics["rejected"],
+        "models_loaded": metrics["models_loaded"],
+        "avg_ms": round(metrics["total_ms"] / processed, 1) if processed else 0.0,
+        "realtime_factor": round(metrics["total_ms"] / 1000 / metrics["audio_s"], 3) if metrics["audio_s"] else None,
+    }
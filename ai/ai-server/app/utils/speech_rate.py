@@ -0,0 +1,215 @@
+# utils/speech_rate.py
+from __future__ import annotations
+
+import asyncio
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+import webrtcvad
+from decouple import config
+
+# VAD 기본 설정
+FRAME_MS = 30      # 10/20/30ms
+VAD_AGGR = 2       # 0(느슨)~3(공격적)
+
+# 에너지 사전 게이트: 프레임 RMS 가 이 값(dBFS) 미만이면 webrtcvad 호출 없이 무음 처리 (빈 값이면 끔, 예: -60)
+_gate = config('VAD_ENERGY_GATE_DBFS', default='')
+VAD_ENERGY_GATE_DBFS: Optional[float] = float(_gate) if _gate else None
+
+# 발화 분석 전용 스레드 풀 (이벤트 루프 블로킹 방지)
+SPEECH_ANALYSIS_WORKERS = config('SPEECH_ANALYSIS_WORKERS', default=2, cast=int)
+_executor = ThreadPoolExecutor(max_workers=SPEECH_ANALYSIS_WORKERS, thread_name_prefix="speech-rate")
+
+_EMPTY = np.empty((0, 2), dtype=np.float64)
+
+
+def _frame_energy_dbfs(frames: np.ndarray) -> np.ndarray:
+    """(n_frames, samples) int16 → 프레임별 RMS (dBFS)"""
+    x = frames.astype(np.float32)
+    mean_sq = np.einsum("ij,ij->i", x, x) / frames.shape[1]
+    return 10.0 * np.log10(mean_sq / (32768.0 ** 2) + 1e-12)
+
+
+def _vad_flags(pcm: np.ndarray, sample_rate: int, frame_ms: int, aggressiveness: int,
+               energy_gate_dbfs: Optional[float] = None) -> np.ndarray:
+    """
+    프레임별 음성 여부 (bool 배열).
+    - 프레임은 하나의 int16 버퍼에 대한 memoryview 슬라이스 (복사 없음)
+    - energy_gate_dbfs 를 주면 명백한 무음 프레임은 webrtcvad 호출 생략
+      (직전 프레임이 음성이면 webrtcvad 의 hangover 가 끝날 때까지는 그대로 호출)
+    """
+    pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+    samples_per_frame = int(sample_rate * frame_ms / 1000)
+    n_frames = len(pcm) // samples_per_frame if samples_per_frame else 0
+    voiced = np.zeros(n_frames, dtype=bool)
+    if n_frames == 0:
+        return voiced
+
+    vad = webrtcvad.Vad(aggressiveness)
+    buf = memoryview(pcm).cast("B")
+    bytes_per_frame = samples_per_frame * 2  # 16-bit mono
+    is_speech = vad.is_speech
+
+    if energy_gate_dbfs is None:
+        for i in range(n_frames):
+            offset = i * bytes_per_frame
+            voiced[i] = is_speech(buf[offset:offset + bytes_per_frame], sample_rate)
+        return voiced
+
+    frames = pcm[:n_frames * samples_per_frame].reshape(n_frames, samples_per_frame)
+    loud = (_frame_energy_dbfs(frames) >= energy_gate_dbfs).tolist()
+    last = False
+    for i in range(n_frames):
+        if not loud[i] and not last:
+            continue
+        offset = i * bytes_per_frame
+        last = voiced[i] = is_speech(buf[offset:offset + bytes_per_frame], sample_rate)
+    return voiced
+
+
+def _collect_vad_segments(pcm: np.ndarray, sample_rate: int, frame_ms: int, aggressiveness: int,
+                          energy_gate_dbfs: Optional[float] = None) -> np.ndarray:
+    """연속된 음성 프레임 구간 → (N,2) [start, end] 초"""
+    return voiced_segments(_vad_flags(pcm, sample_rate, frame_ms, aggressiveness, energy_gate_dbfs), frame_ms)
+
+
+def voiced_segments(voiced: np.ndarray, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """프레임별 음성 여부 → 연속 음성 구간 (N,2) [start, end] 초"""
+    voiced = np.asarray(voiced, dtype=bool)
+    if not voiced.any():
+        return _EMPTY
+    edges = np.diff(np.concatenate(([0], voiced.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    dur = frame_ms / 1000.0
+    return np.column_stack((starts * dur, ends * dur))
+
+
+def _merge_intervals(intervals, eps=1e-6) -> np.ndarray:
+    """겹치거나 eps 이내로 붙은 구간 병합 → (N,2) 정렬된 배열"""
+    arr = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+    if len(arr) == 0:
+        return _EMPTY
+    arr = arr[np.argsort(arr[:, 0], kind="stable")]
+    running_end = np.maximum.accumulate(arr[:, 1])
+    new_group = np.empty(len(arr), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = arr[1:, 0] > running_end[:-1] + eps
+    heads = np.flatnonzero(new_group)
+    return np.column_stack((arr[heads, 0], np.maximum.reduceat(arr[:, 1], heads)))
+
+
+def _intersect_intervals(a_list, b_list) -> np.ndarray:
+    """두 구간 집합의 교집합 (양쪽이 모두 덮는 구간)"""
+    a = _merge_intervals(a_list)
+    b = _merge_intervals(b_list)
+    if len(a) == 0 or len(b) == 0:
+        return _EMPTY
+
+    # 시작 +1 / 끝 -1 이벤트를 시간순으로 누적 → 커버 수가 2인 구간이 교집합
+    times = np.concatenate((a[:, 0], b[:, 0], a[:, 1], b[:, 1]))
+    delta = np.concatenate((np.ones(len(a) + len(b), np.int8), -np.ones(len(a) + len(b), np.int8)))
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    coverage = np.cumsum(delta[order])
+    last_at_time = np.append(times[1:] != times[:-1], True)
+    times, coverage = times[last_at_time], coverage[last_at_time]
+    both = coverage[:-1] == 2
+    return np.column_stack((times[:-1][both], times[1:][both]))
+
+
+def _classify_speed(syll_art, speaking_ratio, avg_pause):
+    # 판정 기준(필요시 조정)
+      # 판정 이유 넣어줄 리스트
+    reason_parts = []
+    # 기본 등급(0~4)
+    if syll_art < 3.6:
+        level = 0
+    elif syll_art < 4.0:
+        level = 1
+    elif syll_art < 4.6:
+        level = 2
+    elif syll_art < 5.2:
+        level = 3
+    else:
+        level = 4
+
+    reason_parts.append(f"{syll_art:.2f}")
+
+    labels_ko = ["SLOW", "SLIGHTLY SLOW", "NORMAL", "SLIGHTLY FAST", "FAST"]
+    return labels_ko[level], "/".join(reason_parts)
+
+
+def _decode_pcm16(contents: bytes):
+    """오디오 bytes → (int16 mono PCM, sample_rate, total_time). 임시 파일 없이 메모리에서 디코딩"""
+    audio_f32, sr = sf.read(io.BytesIO(contents), dtype="float32", always_2d=True)
+    if audio_f32.shape[1] > 1:
+        audio_f32 = audio_f32.mean(axis=1)  # 스테레오 → 모노
+    else:
+        audio_f32 = audio_f32[:, 0]
+    total_time = len(audio_f32) / sr if sr > 0 else 0.0
+    pcm = np.clip(audio_f32 * 32767.0, -32768, 32767).astype(np.int16)
+    return pcm, sr, total_time
+
+
+def _whisper_segments(whisper_data: dict) -> np.ndarray:
+    w_segments = []
+    for seg in whisper_data.get("segments", []) or []:
+        try:
+            s = float(seg.get("start", 0))
+            e = float(seg.get("end", 0))
+            if e > s:
+                w_segments.append((s, e))
+        except (TypeError, ValueError):
+            continue
+    return np.asarray(w_segments, dtype=np.float64).reshape(-1, 2)
+
+
+def analyze_speech_rate(contents: bytes, whisper_data: dict,
+                        energy_gate_dbfs: Optional[float] = VAD_ENERGY_GATE_DBFS) -> dict:
+    """
+    이미 받은 Whisper verbose_json 결과(text/segments)와 원본 오디오로
+    webrtcvad 교집합을 계산하여 발화 속도 지표를 반환 (API 재호출 없음, CPU 작업).
+    """
+    pcm, sr, total_time = _decode_pcm16(contents)
+    v_segments = _collect_vad_segments(pcm, sr, FRAME_MS, VAD_AGGR, energy_gate_dbfs)
+    return speech_rate_from_segments(whisper_data, v_segments, total_time)
+
+
+def speech_rate_from_segments(whisper_data: dict, v_segments: np.ndarray, total_time: float) -> dict:
+    """Whisper 결과(text/segments) + VAD 구간 → 발화 속도 지표 (스트리밍 STT 는 누적된 VAD 구간으로 호출)"""
+    text = (whisper_data.get("text") or "").strip()
+
+    # Whisper × VAD 교집합
+    iv_segments = _merge_intervals(_intersect_intervals(_whisper_segments(whisper_data), v_segments))
+
+    speech_time_iv = float((iv_segments[:, 1] - iv_segments[:, 0]).sum())
+
+    # pause 통계
+    gaps = iv_segments[1:, 0] - iv_segments[:-1, 1]
+    pauses = gaps[gaps > 0]
+    avg_pause = float(pauses.mean()) if len(pauses) else 0.0
+
+    # 텍스트 기반 카운트
+    syllable_count = len(re.findall(r"[가-힣]", text))
+
+    # 속도
+    syll_art = (syllable_count / speech_time_iv) if speech_time_iv > 0 else 0.0
+    speaking_ratio = (speech_time_iv / total_time) if total_time > 0 else 0.0
+
+    label_ko, reason = _classify_speed(syll_art, speaking_ratio, avg_pause)
+
+    return {
+        "label": label_ko,
+        "reason": reason
+    }
+
+
+async def analyze_speech_rate_async(contents: bytes, whisper_data: dict) -> dict:
+    """analyze_speech_rate 를 전용 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, analyze_speech_rate, contents, whisper_data)
@@ -0,0 +1,276 @@
+# utils/stt_stream.py
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+import soundfile as sf
+import webrtcvad
+from decouple import config
+
+from app.utils.speech_rate import (
+    FRAME_MS,
+    VAD_AGGR,
+    VAD_ENERGY_GATE_DBFS,
+    _frame_energy_dbfs,
+    speech_rate_from_segments,
+    voiced_segments,
+)
+
+# 답변 녹음 중 들어오는 PCM 을 VAD 무음 구간에서 잘라 닫힌 구간부터 미리 STT
+STREAM_CUT_SILENCE_MS = config('STREAM_CUT_SILENCE_MS', default=600, cast=int)   # 이만큼 무음이면 자름
+STREAM_MIN_CHUNK_MS = config('STREAM_MIN_CHUNK_MS', default=3000, cast=int)      # 너무 짧은 구간은 다음과 합침
+STREAM_MAX_CHUNK_MS = config('STREAM_MAX_CHUNK_MS', default=20000, cast=int)     # 무음이 없어도 이 길이면 자름
+STREAM_STT_CONCURRENCY = config('STREAM_STT_CONCURRENCY', default=2, cast=int)   # 스트림당 동시 STT
+STREAM_TTL_S = config('STREAM_TTL_S', default=600, cast=int)                     # 끝나지 않은 스트림 정리
+
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+
+
+class StreamClosedError(RuntimeError):
+    """finish()/cancel() 이후 들어온 feed (라우트에서 409 로 변환)"""
+
+
+class _Chunk:
+    def __init__(self, index: int, start_s: float, end_s: float):
+        self.index = index
+        self.start_s = start_s
+        self.end_s = end_s
+        self.task: Optional[asyncio.Task] = None
+        self.result: Optional[dict] = None
+
+
+class StreamingTranscriber:
+    """
+    PCM16 mono 청크 수신 → 30ms 프레임 단위 VAD (세션 전체에 webrtcvad 인스턴스 하나, 순서대로)
+    → 무음에서 구간을 닫고 백그라운드 STT → finish() 에서 마지막 구간만 STT 후 이어 붙임.
+    발화 속도는 누적된 VAD 플래그 + 이어 붙인 segments 로 계산 (오디오 재디코딩/재업로드 없음)
+    """
+
+    def __init__(self, sample_rate: int = 16000, client: Optional[httpx.AsyncClient] = None,
+                 energy_gate_dbfs: Optional[float] = VAD_ENERGY_GATE_DBFS):
+        if sample_rate not in VAD_SAMPLE_RATES:
+            raise ValueError(f"sample_rate 는 {VAD_SAMPLE_RATES} 중 하나여야 합니다.")
+        self.sample_rate = sample_rate
+        self.client = client
+        self.energy_gate_dbfs = energy_gate_dbfs  # 업로드 경로(_vad_flags)와 같은 프레임 에너지 사전 게이트
+        self.created_at = time.monotonic()
+        self.updated_at = self.created_at
+
+        self._pcm = bytearray()
+        self._vad = webrtcvad.Vad(VAD_AGGR)
+        self._frame_bytes = int(sample_rate * FRAME_MS / 1000) * 2
+        self._voiced: List[bool] = []
+        self._chunk_start = 0        # 현재 열린 구간의 시작 프레임
+        self._silence_run = 0        # 연속 무음 프레임 수
+        self._speech_in_chunk = 0    # 열린 구간의 음성 프레임 수
+        self._chunks: List[_Chunk] = []
+        self._sem = asyncio.Semaphore(STREAM_STT_CONCURRENCY)
+        self._lock = asyncio.Lock()
+        self.finished = False
+
+    # ---------- 수신 ----------
+    @property
+    def received_s(self) -> float:
+        return len(self._pcm) / 2 / self.sample_rate
+
+    def _frame_s(self, frame: int) -> float:
+        return frame * FRAME_MS / 1000.0
+
+    async def feed(self, data: bytes) -> dict:
+        """PCM16 LE mono 바이트 추가 (프레임 경계와 맞지 않아도 됨)"""
+        if self.finished:
+            raise StreamClosedError("이미 종료된 스트림입니다.")
+        async with self._lock:
+            # 락을 기다리는 동안 finish() 가 먼저 끝났을 수 있음
+            if self.finished:
+                raise StreamClosedError("이미 종료된 스트림입니다.")
+            self.updated_at = time.monotonic()
+            self._pcm.extend(data)
+            first, n_frames = len(self._voiced), len(self._pcm) // self._frame_bytes
+            if n_frames <= first:
+                return self.status()
+            buf = memoryview(self._pcm)
+            try:
+                loud = self._loud_frames(buf, first, n_frames)
+                for i in range(first, n_frames):
+                    # 에너지 게이트: 명백한 무음이고 직전 프레임도 무음이면 webrtcvad 호출 생략 (hangover 유지)
+                    if loud is not None and not loud[i - first] and not (self._voiced and self._voiced[-1]):
+                        self._on_frame(i, False)
+                        continue
+                    offset = i * self._frame_bytes
+                    self._on_frame(i, self._vad.is_speech(buf[offset:offset + self._frame_bytes], self.sample_rate))
+            finally:
+                buf.release()  # bytearray 가 다음 feed 에서 늘어날 수 있도록 export 해제
+        return self.status()
+
+    def _loud_frames(self, buf: memoryview, first: int, n_frames: int) -> Optional[list]:
+        """새 프레임들의 에너지 게이트 통과 여부 (게이트를 끈 경우 None)"""
+        if self.energy_gate_dbfs is None:
+            return None
+        samples = self._frame_bytes // 2
+        frames = np.frombuffer(buf[first * self._frame_bytes:n_frames * self._frame_bytes], dtype="<i2")
+        return (_frame_energy_dbfs(frames.reshape(n_frames - first, samples)) >= self.energy_gate_dbfs).tolist()
+
+    def _on_frame(self, i: int, voiced: bool):
+        self._voiced.append(voiced)
+        if voiced:
+            self._silence_run = 0
+            self._speech_in_chunk += 1
+        else:
+            self._silence_run += 1
+
+        length_ms = (i + 1 - self._chunk_start) * FRAME_MS
+        if (self._speech_in_chunk
+                and self._silence_run * FRAME_MS >= STREAM_CUT_SILENCE_MS
+                and length_ms >= STREAM_MIN_CHUNK_MS):
+            # 무음 구간 가운데에서 자름
+            self._close_chunk(i + 1 - self._silence_run // 2)
+        elif length_ms >= STREAM_MAX_CHUNK_MS:
+            self._close_chunk(i + 1)
+
+    def _close_chunk(self, end_frame: int, end_byte: Optional[int] = None):
+        start_byte = self._chunk_start * self._frame_bytes
+        end_byte = end_frame * self._frame_bytes if end_byte is None else end_byte
+        chunk = _Chunk(len(self._chunks), self._frame_s(self._chunk_start), end_byte / 2 / self.sample_rate)
+        has_speech = any(self._voiced[self._chunk_start:end_frame])
+        if has_speech and end_byte > start_byte:
+            wav = self._encode_wav(bytes(self._pcm[start_byte:end_byte]))
+            chunk.task = asyncio.create_task(self._transcribe(chunk, wav))
+        self._chunks.append(chunk)
+
+        # 자른 지점 이후의 무음 프레임은 다음 구간으로 넘어감
+        self._chunk_start = end_frame
+        self._silence_run = len(self._voiced) - end_frame
+        self._speech_in_chunk = sum(self._voiced[end_frame:])
+
+    def wav_bytes(self) -> bytes:
+        """지금까지 받은 전체 오디오 (구간 STT 가 모두 실패했을 때 한 번에 다시 STT)"""
+        return self._encode_wav(bytes(self._pcm[:len(self._pcm) - len(self._pcm) % 2]))
+
+    def _encode_wav(self, pcm: bytes) -> bytes:
+        buf = io.BytesIO()
+        sf.write(buf, np.frombuffer(pcm, dtype="<i2"), self.sample_rate, format="WAV", subtype="PCM_16")
+        return buf.getvalue()
+
+    async def _transcribe(self, chunk: _Chunk, wav: bytes):
+        # 순환 import 방지 (stt → local_stt / http_client)
+        from app.utils.stt import transcribe_audio_verbose
+        async with self._sem:
+            chunk.result = await transcribe_audio_verbose(
+                wav, f"chunk_{chunk.index}.wav", "audio/wav", client=self.client
+            )
+
+    def status(self) -> dict:
+        done = [c for c in self._chunks if c.task is not None and c.task.done()]
+        return {
+            "received_s": round(self.received_s, 2),
+            "closed_chunks": len(self._chunks),
+            "transcribed_chunks": len(done),
+            "partial_text": self._stitch(self._chunks, only_done=True)["text"],
+        }
+
+    # ---------- 종료 ----------
+    def _stitch(self, chunks: List[_Chunk], only_done: bool = False) -> dict:
+        texts, segments = [], []
+        for chunk in chunks:
+            if chunk.task is None or (only_done and not chunk.task.done()) or chunk.result is None:
+                continue
+            text = (chunk.result.get("text") or "").strip()
+            if text:
+                texts.append(text)
+            for seg in chunk.result.get("segments") or []:
+                try:
+                    segments.append({
+                        "id": len(segments),
+                        "start": round(chunk.start_s + float(seg.get("start", 0)), 2),
+                        "end": round(chunk.start_s + float(seg.get("end", 0)), 2),
+                        "text": seg.get("text", ""),
+                    })
+                except (TypeError, ValueError):
+                    continue
+        return {"text": " ".join(texts), "segments": segments}
+
+    async def finish(self) -> dict:
+        """
+        남은 구간(마지막 발화)만 STT 하고 모든 구간을 이어 붙임.
+        반환: {"transcription": verbose_json 형태 또는 None(전부 실패), "analysis": 발화 속도, "chunks": n}
+        """
+        async with self._lock:
+            if not self.finished:
+                self.finished = True
+                n_frames = len(self._voiced)
+                if len(self._pcm) > self._chunk_start * self._frame_bytes:
+                    # 프레임에 못 미치는 꼬리 샘플까지 마지막 구간에 포함
+                    self._close_chunk(n_frames, end_byte=len(self._pcm) - len(self._pcm) % 2)
+
+        tasks = [c.task for c in self._chunks if c.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        stitched = self._stitch(self._chunks)
+        failed = sum(1 for c in self._chunks if c.task is not None and c.result is None)
+        total_time = self.received_s
+        transcription = None
+        if not tasks or failed < len(tasks):
+            transcription = {
+                "task": "transcribe",
+                "duration": round(total_time, 2),
+                "text": stitched["text"],
+                "segments": stitched["segments"],
+                "chunks": len(self._chunks),
+                "failed_chunks": failed,
+            }
+
+        analysis = None
+        if transcription is not None:
+            v_segments = voiced_segments(np.asarray(self._voiced, dtype=bool), FRAME_MS)
+            analysis = speech_rate_from_segments(transcription, v_segments, total_time)
+        return {"transcription": transcription, "analysis": analysis, "chunks": len(self._chunks)}
+
+    async def cancel(self):
+        self.finished = True
+        for chunk in self._chunks:
+            if chunk.task is not None and not chunk.task.done():
+                chunk.task.cancel()
+
+
+# ---------- 스트림 레지스트리 (프로세스 로컬) ----------
+_streams: Dict[str, StreamingTranscriber] = {}
+_streams_lock = threading.Lock()
+
+
+def _expire_streams():
+    now = time.monotonic()
+    with _streams_lock:
+        expired = [sid for sid, s in _streams.items() if now - s.updated_at > STREAM_TTL_S]
+        for sid in expired:
+            stream = _streams.pop(sid)
+            asyncio.ensure_future(stream.cancel())
+    if expired:
+        print(f"[STT-stream] 만료된 스트림 {len(expired)}개 정리")
+
+
+def open_stream(sample_rate: int = 16000, client: Optional[httpx.AsyncClient] = None) -> str:
+    _expire_streams()
+    stream = StreamingTranscriber(sample_rate, client=client)
+    stream_id = uuid.uuid4().hex
+    with _streams_lock:
+        _streams[stream_id] = stream
+    return stream_id
+
+
+def get_stream(stream_id: str) -> Optional[StreamingTranscriber]:
+    with _streams_lock:
+        return _streams.get(stream_id)
+
+
+def pop_stream(stream_id: str) -> Optional[StreamingTranscriber]:
+    with _streams_lock:
+        return _streams.pop(stream_id, None)
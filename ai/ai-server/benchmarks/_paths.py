@@ -0,0 +1,13 @@
+# benchmarks/_paths.py
+# 벤치마크 스크립트를 ai-server 어디서 실행해도 app / Gaze_TR_pro 모듈을 import 할 수 있도록 경로 설정
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Gaze_TR_pro")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# 로컬 벤치마크는 실제 GMS 를 호출하지 않으므로 설정이 없어도 import 되도록 기본값만 채움
+os.environ.setdefault("GMS_API_KEY", "bench")
+os.environ.setdefault("GMS_BASE_URL", "http://127.0.0.1")
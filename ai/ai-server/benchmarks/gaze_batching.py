@@ -0,0 +1,128 @@
+# benchmarks/gaze_batching.py
+"""
+동영상 프레임으로 GazeTracker 의 배치 추론과 NATIVE_FRAME_PATH 를 측정 (ptgaze/mediapipe 필요)
+
+    python benchmarks/gaze_batching.py <video> [batch|native] [device]
+"""
+import _paths  # noqa: F401
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from gaze_camera import gaze_angle_difference_deg
+from gaze_tracking import GazeTracker
+
+
+def benchmark_gaze_batching(video_path, batch_sizes=(1, 8, 16), max_frames=300, device="cpu"):
+    """동일한 프레임에 대해 프레임 단위 경로(batch_size=1)와 배치 경로의 처리 시간 비교"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] Cannot open video file: {video_path}")
+        return None
+
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+
+    if not frames:
+        print("[ERROR] No frames decoded for benchmark")
+        return None
+
+    tracker = GazeTracker(device=device)
+    results = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        out = tracker.process_frames(frames, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+
+        results[batch_size] = {
+            "seconds": round(elapsed, 3),
+            "fps": round(len(frames) / elapsed, 1) if elapsed > 0 else 0.0,
+            "tracked_frames": out.get("tracked_frames", 0)
+        }
+        print(f"[BENCH] device={device} batch_size={batch_size}: {elapsed:.3f}s "
+              f"({results[batch_size]['fps']} fps, tracked {results[batch_size]['tracked_frames']}/{len(frames)})")
+
+    return results
+
+
+def benchmark_native_frame_path(video_path, max_frames=100, tolerance_deg=2.0, device="cpu"):
+    """resize/flip 경로와 NATIVE_FRAME_PATH 경로의 시선 벡터 차이(도)와 처리 시간 비교
+
+    같은 프레임마다 두 경로로 각각 추정하여 평균 각도 차이가 tolerance_deg 이하이면 equivalent
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] Cannot open video file: {video_path}")
+        return None
+
+    tracker = GazeTracker(device=device)
+    with tracker.models.landmark_session() as landmark_estimator:
+        tracker.landmark_estimator = landmark_estimator
+        legacy_vectors, native_vectors = [], []
+        elapsed = {"resize_flip": 0.0, "native": 0.0}
+        try:
+            while len(legacy_vectors) < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                vectors = {}
+                for mode, native in (("resize_flip", False), ("native", True)):
+                    tracker.NATIVE_FRAME_PATH = native
+                    start = time.perf_counter()
+                    model_frame, geometry = tracker._prepare_frame(frame)
+                    faces = landmark_estimator.detect_faces(model_frame)
+                    if faces:
+                        tracker._estimate_face_gaze(model_frame, faces[0], geometry)
+                        vectors[mode] = faces[0].gaze_vector
+                    elapsed[mode] += time.perf_counter() - start
+
+                if vectors.get("resize_flip") is not None and vectors.get("native") is not None:
+                    legacy_vectors.append(vectors["resize_flip"])
+                    native_vectors.append(vectors["native"])
+        finally:
+            cap.release()
+            tracker.landmark_estimator = None
+
+    if not legacy_vectors:
+        print("[ERROR] No frames tracked by both paths")
+        return None
+
+    diff = gaze_angle_difference_deg(legacy_vectors, native_vectors)
+    raw_legacy = tracker.gaze_to_screen_coords_batch(np.asarray(legacy_vectors))
+    raw_native = tracker.gaze_to_screen_coords_batch(np.asarray(native_vectors))
+    px = np.hypot(*(np.asarray(raw_legacy, dtype=np.float64) - raw_native).T)
+    result = {
+        "frames": len(legacy_vectors),
+        "mean_deg": round(float(diff.mean()), 3),
+        "max_deg": round(float(diff.max()), 3),
+        "mean_px": round(float(px.mean()), 1),
+        "max_px": round(float(px.max()), 1),
+        "seconds": {mode: round(t, 3) for mode, t in elapsed.items()},
+        "equivalent": bool(diff.mean() <= tolerance_deg)
+    }
+    print(f"[BENCH] native frame path: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python benchmarks/gaze_batching.py <video> [batch|native] [device]")
+        sys.exit(1)
+    video_file = sys.argv[1]
+    mode = sys.argv[2] if len(sys.argv) > 2 else "batch"
+    device = sys.argv[3] if len(sys.argv) > 3 else "cpu"
+    if mode == "native":
+        benchmark_native_frame_path(video_file, device=device)
+    else:
+        benchmark_gaze_batching(video_file, device=device)
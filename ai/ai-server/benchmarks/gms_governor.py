@@ -0,0 +1,127 @@
+# benchmarks/gms_governor.py
+"""
+stub upstream 이 outage_s 동안 503 을 내다 복구되는 상황에서 기존 재시도 방식과 governor 비교
+
+    python benchmarks/gms_governor.py [outage_s]
+"""
+import _paths  # noqa: F401
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import numpy as np
+
+from app.utils import gms_governor as gov
+
+
+def start_stub_upstream(latency_s: float = 0.05, error_rate: float = 0.0, port: int = 0):
+    """
+    지연/오류를 주입하는 로컬 GMS 대용 서버 (스레드).
+    반환된 server.control 을 바꾸면 실행 중에도 반영: {"latency_s", "error_rate", "down"}
+    """
+    control = {"latency_s": latency_s, "error_rate": error_rate, "down": False, "requests": 0}
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            control["requests"] += 1
+            time.sleep(control["latency_s"])
+            failed = control["down"] or random.random() < control["error_rate"]
+            body = b'{"error": "unavailable"}' if failed else json.dumps(
+                {"choices": [{"message": {"content": "ok"}}], "text": "ok"}
+            ).encode()
+            self.send_response(503 if failed else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.control = control
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _naive_call(client: httpx.AsyncClient, url: str) -> httpx.Response:
+    # 비교용: 기존 방식 (동시 호출 제한 없이 고정 1초 간격 3회 시도)
+    for attempt in range(3):
+        try:
+            response = await client.post(url, json={})
+            if response.status_code < 500 or attempt == 2:
+                return response
+        except httpx.TransportError:
+            if attempt == 2:
+                raise
+        await asyncio.sleep(1)
+
+
+async def _run_load(governed: bool, server, requests: int, concurrency_limit: int, outage_s: float) -> dict:
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    server.control.update(requests=0, down=True)
+    latencies, ok, failed = [], 0, 0
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=200), timeout=30) as client:
+        async def one(i: int):
+            nonlocal ok, failed
+            await asyncio.sleep(i * 0.01)  # 도착 간격 10ms
+            started = time.perf_counter()
+            try:
+                if governed:
+                    response = await gov.call("bench", lambda: client.post(url, json={}))
+                else:
+                    response = await _naive_call(client, url)
+                ok += response.status_code == 200
+                failed += response.status_code != 200
+            except Exception:
+                failed += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        async def recover():
+            await asyncio.sleep(outage_s)
+            server.control["down"] = False
+
+        gov.MAX_INFLIGHT["bench"] = concurrency_limit
+        gov._endpoints.pop("bench", None)
+        gov._budget.__init__(gov.RETRY_BUDGET_RATIO, gov.RETRY_BUDGET_MIN_PER_S, gov.RETRY_BUDGET_MAX)
+        await asyncio.gather(recover(), *(one(i) for i in range(requests)))
+
+    ms = np.asarray(latencies)
+    return {
+        "upstream_requests": server.control["requests"],
+        "ok": ok,
+        "failed": failed,
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+    }
+
+
+def benchmark_governor(requests: int = 300, concurrency_limit: int = 16, outage_s: float = 1.0) -> dict:
+    """브레이커/재시도 예산은 운영 설정 그대로 사용"""
+    server = start_stub_upstream(latency_s=0.05)
+    try:
+        results = {
+            "naive": asyncio.run(_run_load(False, server, requests, concurrency_limit, outage_s)),
+            "governor": asyncio.run(_run_load(True, server, requests, concurrency_limit, outage_s)),
+        }
+        results["governor"]["metrics"] = gov.governor_metrics()["endpoints"]["bench"]
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    outage = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    for name, r in benchmark_governor(outage_s=outage).items():
+        print(f"[BENCH] {name:>8}: {r}")
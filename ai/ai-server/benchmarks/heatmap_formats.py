@@ -0,0 +1,40 @@
+# benchmarks/heatmap_formats.py
+"""
+히트맵 전송 포맷별 JSON 페이로드 크기와 인코딩 시간 비교
+
+    python benchmarks/heatmap_formats.py
+"""
+import _paths  # noqa: F401
+
+import json
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from app.utils.heatmap_codec import HEATMAP_FORMATS, HEATMAP_KEY, encode_heatmap
+
+
+def benchmark_heatmap_formats(heatmap: Any, repeat: int = 20) -> Dict[str, Dict[str, float]]:
+    """포맷별 JSON 페이로드 크기(byte)와 인코딩 시간(ms, 평균)"""
+    results: Dict[str, Dict[str, float]] = {}
+    for fmt in HEATMAP_FORMATS:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            encoded = encode_heatmap(heatmap, fmt)
+        elapsed = (time.perf_counter() - t0) / repeat
+        body = json.dumps({HEATMAP_KEY: encoded}, separators=(",", ":"), ensure_ascii=False)
+        results[fmt] = {"bytes": len(body.encode("utf-8")), "encode_ms": round(elapsed * 1000, 3)}
+    return results
+
+
+if __name__ == "__main__":
+    # 160x90, 인터뷰 영상 한 개 분량의 희소한 응시 분포
+    rng = np.random.default_rng(0)
+    grid = np.zeros((90, 160), dtype=np.int32)
+    ys = np.clip(rng.normal(45, 8, 3000).astype(int), 0, 89)
+    xs = np.clip(rng.normal(80, 15, 3000).astype(int), 0, 159)
+    np.add.at(grid, (ys, xs), 1)
+    print(f"[BENCH] nonzero cells: {np.count_nonzero(grid)}/{grid.size}")
+    for fmt, r in benchmark_heatmap_formats(grid).items():
+        print(f"[BENCH] {fmt:>7}: {r['bytes']:>7} bytes, {r['encode_ms']:.3f} ms")
@@ -0,0 +1,14 @@
+# tests/conftest.py
+import os
+import sys
+from pathlib import Path
+
+# app 패키지와 Gaze_TR_pro 모듈(평면 import)을 서버 실행 시와 같은 경로로 import
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "Gaze_TR_pro"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# import 시점에 필수인 설정 (실제 GMS 호출은 하지 않음)
+os.environ.setdefault("GMS_API_KEY", "test")
+os.environ.setdefault("GMS_BASE_URL", "http://gms.invalid/v1")
@@ -0,0 +1,91 @@
+# tests/test_gaze_camera.py
+# NATIVE_FRAME_PATH 기하 동등성: resize+flip 파이프라인과 원본 프레임 + 변환 카메라가 같은 광선/자세를 주는지
+import cv2
+import numpy as np
+import pytest
+
+from gaze_camera import (
+    gaze_angle_difference_deg,
+    mirror_gaze_vectors,
+    native_camera_matrix,
+    native_dist_coefficients,
+)
+
+PIPELINE = (1344, 756)   # GazeTracker.WINDOW_WIDTH/HEIGHT
+NATIVE = (960, 540)      # 분석 파이프라인 입력 프레임
+K = np.array([[1200.0, 0.0, 672.0], [0.0, 1200.0, 378.0], [0.0, 0.0, 1.0]])
+DIST = np.array([0.08, -0.12, 0.002, 0.004, 0.01])
+MIRROR = np.diag([-1.0, 1.0, 1.0])
+
+
+def _project(points, K, dist, rvec=np.zeros(3), tvec=np.zeros(3)):
+    return cv2.projectPoints(points.reshape(-1, 1, 3), rvec, tvec, K, dist)[0].reshape(-1, 2)
+
+
+def _pipeline_to_native(pixels, flip=True):
+    """resize(+flip) 된 파이프라인 픽셀 → 원본 프레임 픽셀 (cv2.resize 픽셀 중심 규약)"""
+    x, y = pixels[:, 0].copy(), pixels[:, 1]
+    if flip:
+        x = PIPELINE[0] - 1 - x
+    sx, sy = NATIVE[0] / PIPELINE[0], NATIVE[1] / PIPELINE[1]
+    return np.c_[(x + 0.5) * sx - 0.5, (y + 0.5) * sy - 0.5]
+
+
+def _synthetic_landmarks(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.c_[rng.uniform(-0.15, 0.15, n), rng.uniform(-0.1, 0.1, n), rng.uniform(0.45, 0.8, n)]
+
+
+@pytest.mark.parametrize("flip", [True, False])
+def test_native_camera_ray_round_trip(flip):
+    points = _synthetic_landmarks()
+    native_pixels = _pipeline_to_native(_project(points, K, DIST), flip=flip)
+
+    K_native = native_camera_matrix(K, PIPELINE, NATIVE, mirror=flip)
+    dist_native = native_dist_coefficients(DIST, mirror=flip)
+    # flip 이면 원본 픽셀은 파이프라인 광선의 X 반전 광선으로 역투영됨
+    expected = points @ MIRROR if flip else points
+    np.testing.assert_allclose(_project(expected, K_native, dist_native), native_pixels, atol=1e-6)
+
+
+def test_native_camera_head_pose_matches_mirrored_pipeline_pose():
+    # 좌우 대칭 얼굴 모델: 원본(비반전) 프레임에서는 랜드마크 i 위치에 거울 짝 perm[i] 가 검출됨
+    half = np.array([[0.03, 0.03, 0.02], [0.045, -0.01, 0.03], [0.025, -0.05, 0.015], [0.06, 0.04, 0.06]])
+    middle = np.array([[0.0, 0.0, 0.0], [0.0, -0.035, -0.01], [0.0, 0.05, 0.01], [0.0, -0.07, 0.02]])
+    model = np.vstack([half, half @ MIRROR, middle])
+    perm = np.r_[np.arange(4, 8), np.arange(0, 4), np.arange(8, 12)]
+    np.testing.assert_allclose(model[perm], model @ MIRROR)
+
+    rvec = np.array([0.12, -0.35, 0.05])
+    tvec = np.array([0.04, -0.02, 0.6])
+    pipeline_pixels = _project(model, K, DIST, rvec, tvec)
+    native_pixels = np.empty_like(pipeline_pixels)
+    native_pixels[perm] = _pipeline_to_native(pipeline_pixels)
+
+    ok, rvec_p, tvec_p = cv2.solvePnP(model, pipeline_pixels, K, DIST, rvec.copy(), tvec.copy(), True)
+    assert ok
+    K_native = native_camera_matrix(K, PIPELINE, NATIVE, mirror=True)
+    dist_native = native_dist_coefficients(DIST, mirror=True)
+    ok, rvec_n, tvec_n = cv2.solvePnP(model, native_pixels, K_native, dist_native,
+                                      (MIRROR @ rvec) * -1, MIRROR @ tvec, True)
+    assert ok
+
+    R_p, R_n = cv2.Rodrigues(rvec_p)[0], cv2.Rodrigues(rvec_n)[0]
+    np.testing.assert_allclose(R_n, MIRROR @ R_p @ MIRROR, atol=1e-6)
+    np.testing.assert_allclose(tvec_n.ravel(), MIRROR @ tvec_p.ravel(), atol=1e-6)
+    # 얼굴 정면 방향도 X 반전 → 시선 벡터 x 반전(mirror_gaze_vectors)과 같은 관계
+    forward_p, forward_n = R_p[:, 2], R_n[:, 2]
+    assert gaze_angle_difference_deg(mirror_gaze_vectors(forward_n), forward_p)[0] < 1e-4
+
+
+def test_native_camera_without_resize_or_flip_is_identity():
+    np.testing.assert_allclose(native_camera_matrix(K, PIPELINE, PIPELINE, mirror=False), K)
+    np.testing.assert_allclose(native_dist_coefficients(DIST, mirror=False), DIST)
+
+
+def test_mirror_gaze_vectors_round_trip():
+    vectors = np.array([[0.1, -0.2, -0.97], [-0.3, 0.05, -0.95]])
+    mirrored = mirror_gaze_vectors(vectors)
+    np.testing.assert_allclose(mirrored[:, 0], -vectors[:, 0])
+    np.testing.assert_allclose(mirror_gaze_vectors(mirrored), vectors)
+    np.testing.assert_allclose(gaze_angle_difference_deg(vectors, vectors), 0.0, atol=1e-6)
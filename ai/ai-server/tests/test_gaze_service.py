@@ -0,0 +1,30 @@
+# tests/test_gaze_service.py
+from app.services import gaze_service
+
+
+class _NativeStub:
+    def __init__(self):
+        self.calls = []
+
+    def process_frames(self, frames, calib_data=None, batch_size=None, timeline=None, expected_frames=None, fps=30.0):
+        self.calls.append(fps)
+        return {"status": "ok", "frames": sum(1 for _ in frames)}
+
+
+def test_infer_gaze_frames_calls_native_tracker_once(monkeypatch):
+    tracker = _NativeStub()
+    monkeypatch.setattr(gaze_service, "get_tracker", lambda: tracker)
+    frames = (i for i in range(6))  # 한 번만 순회 가능
+
+    result = gaze_service.infer_gaze_frames(frames, calib_data={}, fps=15.0)
+
+    assert tracker.calls == [15.0]
+    assert result["frames"] == 6
+
+
+def test_infer_gaze_frames_lite_counts_generator(monkeypatch):
+    monkeypatch.setattr(gaze_service, "get_tracker", lambda: gaze_service.LiteTracker())
+
+    result = gaze_service.infer_gaze_frames((i for i in range(4)), fps=30.0)
+
+    assert result["frames"] == 4
@@ -0,0 +1,103 @@
+# tests/test_gaze_transform.py
+# CompiledTransform.predict 가 sklearn / scipy / cv2 로 학습한 원본 모델과 같은 좌표를 내는지
+import cv2
+import numpy as np
+import pytest
+from scipy.interpolate import Rbf
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from gaze_transform import (
+    CompiledTransform,
+    angles_to_screen_coords,
+    apply_compiled_transform,
+    calibration_key,
+    gaze_vectors_to_angles,
+)
+
+W, H = 1344, 756
+
+
+def _calibration_points():
+    # 9점 캘리브레이션 + 약간의 비선형/노이즈
+    rng = np.random.default_rng(0)
+    yaw, pitch = np.meshgrid(np.linspace(-0.35, 0.35, 3), np.linspace(-0.2, 0.2, 3))
+    A = np.column_stack((yaw.ravel(), pitch.ravel())) + rng.normal(0, 0.01, (9, 2))
+    B = np.column_stack((W / 2 + 1800 * A[:, 0] + 300 * A[:, 0] * A[:, 1],
+                         H / 2 + 1700 * A[:, 1] + 200 * A[:, 0] ** 2))
+    return A, B + rng.normal(0, 3, B.shape)
+
+
+def _queries():
+    rng = np.random.default_rng(1)
+    return np.column_stack((rng.uniform(-0.4, 0.4, 500), rng.uniform(-0.25, 0.25, 500)))
+
+
+def _round_trip(compiled):
+    return CompiledTransform.from_dict(compiled.to_dict())
+
+
+@pytest.mark.parametrize("degree", [2, 3])
+def test_polynomial_matches_sklearn(degree):
+    A, B = _calibration_points()
+    models = []
+    for column in range(2):
+        model = Pipeline([("poly", PolynomialFeatures(degree=degree)), ("linear", LinearRegression())])
+        models.append(model.fit(A, B[:, column]))
+    Q = _queries()
+    expected = np.column_stack([m.predict(Q) for m in models])
+
+    compiled = CompiledTransform.from_polynomial(*models)
+    np.testing.assert_allclose(compiled.predict(Q), expected, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(_round_trip(compiled).predict(Q), expected, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("function", ["multiquadric", "thin_plate", "gaussian", "linear", "cubic"])
+def test_rbf_matches_scipy(function):
+    A, B = _calibration_points()
+    rbf_x = Rbf(A[:, 0], A[:, 1], B[:, 0], function=function, smooth=0.1)
+    rbf_y = Rbf(A[:, 0], A[:, 1], B[:, 1], function=function, smooth=0.1)
+    Q = _queries()
+    expected = np.column_stack((rbf_x(Q[:, 0], Q[:, 1]), rbf_y(Q[:, 0], Q[:, 1])))
+
+    compiled = CompiledTransform.from_rbf(rbf_x, rbf_y)
+    np.testing.assert_allclose(compiled.predict(Q), expected, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(_round_trip(compiled).predict(Q), expected, rtol=1e-9, atol=1e-6)
+
+
+def test_geometric_matches_cv2():
+    A, B = _calibration_points()
+    Q = _queries()
+    homography = cv2.findHomography(A, B, 0)[0]
+    expected = cv2.perspectiveTransform(Q.reshape(-1, 1, 2), homography).reshape(-1, 2)
+    np.testing.assert_allclose(CompiledTransform.from_matrix(homography).predict(Q), expected, rtol=1e-9, atol=1e-6)
+
+    affine = cv2.estimateAffine2D(A, B)[0]
+    expected = cv2.transform(Q.reshape(-1, 1, 2), affine).reshape(-1, 2)
+    np.testing.assert_allclose(_round_trip(CompiledTransform.from_matrix(affine)).predict(Q), expected,
+                               rtol=1e-9, atol=1e-6)
+
+
+def test_apply_compiled_transform_clips_and_falls_back():
+    vectors = np.array([[0.1, -0.05, -1.0], [-0.3, 0.1, -1.0], [0.0, 0.0, -1.0]])
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    angles = gaze_vectors_to_angles(vectors)
+    raw = angles_to_screen_coords(angles, W, H)
+    # 세 번째 행은 w=0 이 되는 homography → 원시 좌표로 대체
+    matrix = np.array([[5000.0, 0.0, 0.0], [0.0, 5000.0, 0.0], [0.0, 0.0, 0.0]])
+    matrix[2, :2] = [1.0, 1.0]
+
+    out = apply_compiled_transform(CompiledTransform.from_matrix(matrix), angles, raw, W, H)
+
+    assert np.all(out[:2] >= 0) and np.all(out[:2, 0] <= W - 1) and np.all(out[:2, 1] <= H - 1)
+    np.testing.assert_array_equal(out[2], raw[2])
+    np.testing.assert_array_equal(apply_compiled_transform(None, angles, raw, W, H), raw)
+
+
+def test_calibration_key_ignores_metadata():
+    A, B = _calibration_points()
+    data = {"calibration_vectors": A.tolist(), "calibration_points": B.tolist(), "transform_method": "rbf"}
+    key = calibration_key(data)
+    assert calibration_key({**data, "timestamp": "2026-01-01"}) == key
+    assert calibration_key({**data, "transform_method": "polynomial"}) != key
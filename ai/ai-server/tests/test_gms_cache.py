@@ -0,0 +1,43 @@
+# tests/test_gms_cache.py
+import os
+import time
+
+from app.utils import gms_cache
+
+
+def _item(size: int) -> gms_cache.CachedResponse:
+    return gms_cache.CachedResponse(b"x" * size, "application/json", time.time() + 60)
+
+
+def _disk_bytes(directory) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def test_disk_store_tracks_bytes_without_walking_on_every_put(tmp_path, monkeypatch):
+    store = gms_cache._DiskStore(str(tmp_path), 100_000)
+    walks = []
+    entries = store._entries
+    monkeypatch.setattr(store, "_entries", lambda: walks.append(1) or entries())
+
+    for i in range(20):
+        store.put(f"{i:064x}", _item(1000))
+    assert not walks  # 한도 안에서는 디렉터리를 훑지 않음
+    assert store.stats()["bytes"] == _disk_bytes(tmp_path)
+    assert store.stats()["entries"] == 20
+
+
+def test_disk_store_prunes_least_recently_used(tmp_path):
+    store = gms_cache._DiskStore(str(tmp_path), 10_000)
+    keys = [f"{i:064x}" for i in range(9)]
+    for key in keys:
+        store.put(key, _item(1000))
+        time.sleep(0.01)
+    assert store.get(keys[0]) is not None  # 가장 오래된 항목을 다시 사용
+    store.put("f" * 64, _item(1000))
+
+    assert _disk_bytes(tmp_path) == store.stats()["bytes"] <= 10_000
+    assert store.get(keys[0]) is not None
+    assert store.get(keys[1]) is None
+
+    restarted = gms_cache._DiskStore(str(tmp_path), 10_000)
+    assert restarted.stats() == store.stats()
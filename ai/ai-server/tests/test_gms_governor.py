@@ -0,0 +1,108 @@
+# tests/test_gms_governor.py
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils import gms_governor as gov
+
+
+def _breaker(**kw):
+    params = dict(window_s=10.0, min_calls=4, failure_rate=0.5, open_s=5.0)
+    params.update(kw)
+    return gov._CircuitBreaker(**params)
+
+
+def _response(status: int) -> httpx.Response:
+    return httpx.Response(status, request=httpx.Request("POST", "http://gms.invalid/v1"))
+
+
+def test_breaker_opens_on_failure_rate_after_min_calls():
+    breaker = _breaker()
+    for failed in (True, True, True):
+        breaker.record(failed)
+    assert breaker.state == "closed"  # min_calls 미만
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_stays_closed_below_failure_rate():
+    breaker = _breaker()
+    for failed in (True, False, False, False, True, False):
+        breaker.record(failed)
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_probe_transitions(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(gov.time, "monotonic", lambda: now[0])
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(True)
+    assert breaker.state == "open"
+
+    now[0] += 5.0
+    assert breaker.allow()  # 시험 호출 1건만 통과
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record(True, probe=True)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 5.0
+    assert breaker.allow()
+    breaker.record(False, probe=True)
+    assert breaker.state == "closed"
+    assert breaker.current_failure_rate() == 0.0
+
+
+def _open_endpoint(name: str, monkeypatch) -> gov._EndpointState:
+    state = gov._state(name)
+    state.breaker = _breaker(open_s=0.0)
+    state.breaker._open(0.0, "test")
+    monkeypatch.setattr(gov, "_budget", gov._RetryBudget(0.2, 10.0, 100.0))
+    return state
+
+
+def test_cancelled_probe_is_released_without_recording(monkeypatch):
+    state = _open_endpoint("test-cancel", monkeypatch)
+
+    async def send():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(gov.call("test-cancel", send, max_retries=0))
+    assert state.breaker.state == "half_open"
+    assert not state.breaker.probe_in_flight
+    assert not state.breaker.outcomes
+
+
+def test_probe_bug_is_not_recorded_as_success(monkeypatch):
+    state = _open_endpoint("test-bug", monkeypatch)
+
+    async def send():
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        asyncio.run(gov.call("test-bug", send, max_retries=0))
+    assert state.breaker.state == "half_open"
+    assert not state.breaker.probe_in_flight
+
+
+def test_probe_upstream_outcomes_are_recorded(monkeypatch):
+    state = _open_endpoint("test-probe", monkeypatch)
+
+    async def down():
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(gov.call("test-probe", down, max_retries=0))
+    assert state.breaker.state == "open"
+
+    async def up():
+        return _response(200)
+
+    assert asyncio.run(gov.call("test-probe", up, max_retries=0)).status_code == 200
+    assert state.breaker.state == "closed"
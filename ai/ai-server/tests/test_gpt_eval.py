@@ -0,0 +1,69 @@
+# tests/test_gpt_eval.py
+import asyncio
+from typing import get_args
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import AnswerEvaluation, AnswerEvaluationList, EvaluationLevel
+from app.utils import gpt
+from app.utils.gpt import EVAL_JSON_SCHEMA, chunk_eval_pairs
+
+
+def _item_schema():
+    return EVAL_JSON_SCHEMA["schema"]["properties"]["evaluations"]["items"]
+
+
+def test_json_schema_requires_levels_with_model_enum():
+    item = _item_schema()
+    for field in ("end_level", "filler_level"):
+        assert field in item["required"]
+        assert item["properties"][field]["enum"] == list(get_args(EvaluationLevel))
+    # strict 모드: 모든 속성이 required 여야 함
+    assert set(item["required"]) == set(item["properties"])
+
+
+def test_answer_evaluation_levels():
+    content = ('{"evaluations": [{"order": 1, "is_ended": true, "reason_end": "", "context_matched": true, '
+               '"reason_context": "", "gpt_comment": "", "end_level": "OUTSTANDING", "filler_level": "NORMAL"}]}')
+    item = AnswerEvaluationList.model_validate_json(content).evaluations[0]
+    assert (item.end_level, item.filler_level) == ("OUTSTANDING", "NORMAL")
+
+    # 텍스트 모드 결과처럼 등급이 없어도 유효
+    assert AnswerEvaluation(order=1, is_ended=False, context_matched=True).filler_level is None
+    with pytest.raises(ValidationError):
+        AnswerEvaluation(order=1, is_ended=True, context_matched=True, filler_level="GOOD")
+
+
+def test_chunk_eval_pairs_keeps_order_within_pair_limit(monkeypatch):
+    monkeypatch.setattr(gpt, "EVAL_BATCH_MAX_PAIRS", 3)
+    questions = [f"질문{i}" for i in range(8)]
+    chunks = chunk_eval_pairs(questions, ["답변"] * 8)
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+
+def test_chunk_eval_pairs_splits_on_token_limit(monkeypatch):
+    base = gpt._estimate_tokens(gpt.EVAL_JSON_PROMPT)
+    monkeypatch.setattr(gpt, "EVAL_BATCH_MAX_PROMPT_TOKENS", base + 250)
+    answers = ["가" * 100, "가" * 100, "가" * 1000, "가" * 10]
+    chunks = chunk_eval_pairs(["q"] * 4, answers)
+    # 상한을 넘는 쌍도 혼자 한 묶음으로 평가, 순서는 그대로
+    assert chunks == [[0, 1], [2], [3]]
+    assert [i for chunk in chunks for i in chunk] == list(range(4))
+
+
+def test_batched_evaluation_maps_results_back_by_order(monkeypatch):
+    monkeypatch.setattr(gpt, "EVAL_BATCH_MAX_PAIRS", 2)
+
+    async def fake_evaluate(questions, answers, client=None):
+        if "q2" in questions:
+            raise RuntimeError("upstream down")
+        # 묶음 안에서 순서를 뒤섞어 반환하고 일부 누락
+        items = [{"order": n, "question": q} for n, q in enumerate(questions, 1) if q != "q4"]
+        return list(reversed(items))
+
+    monkeypatch.setattr(gpt, "evaluate_answers_async", fake_evaluate)
+    questions = [f"q{i}" for i in range(5)]
+    out = asyncio.run(gpt.evaluate_answers_batched_async(questions, ["a"] * 5))
+
+    assert [item and item["question"] for item in out] == ["q0", "q1", None, None, None]
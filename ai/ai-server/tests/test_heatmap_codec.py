@@ -0,0 +1,68 @@
+# tests/test_heatmap_codec.py
+import json
+
+import numpy as np
+import pytest
+
+from app.utils.heatmap_codec import (
+    DEFAULT_HEATMAP_FORMAT,
+    HEATMAP_FORMATS,
+    HEATMAP_KEY,
+    decode_heatmap,
+    encode_heatmap,
+    encode_heatmaps_in,
+    format_dense,
+    negotiate_heatmap_format,
+)
+
+
+def _grid():
+    rng = np.random.default_rng(0)
+    grid = np.zeros((9, 16), dtype=np.int64)
+    np.add.at(grid, (rng.integers(0, 9, 60), rng.integers(0, 16, 60)), 1)
+    return grid
+
+
+def test_negotiate_query_over_accept_over_default():
+    accept = "text/html, application/json; q=0.9; heatmap=rle"
+    assert negotiate_heatmap_format("COO", accept) == "coo"
+    assert negotiate_heatmap_format(None, accept) == "rle"
+    assert negotiate_heatmap_format(None, 'application/json; heatmap="b64u16"') == "b64u16"
+    assert negotiate_heatmap_format(None, "application/json; heatmap=png") == DEFAULT_HEATMAP_FORMAT
+    assert negotiate_heatmap_format() == DEFAULT_HEATMAP_FORMAT
+    with pytest.raises(ValueError):
+        negotiate_heatmap_format("png")
+
+
+@pytest.mark.parametrize("fmt", HEATMAP_FORMATS)
+def test_encode_decode_round_trip(fmt):
+    grid = _grid()
+    # 응답으로 나가는 형태(JSON) 를 거쳐도 같은 배열로 복원
+    payload = json.loads(json.dumps(encode_heatmap(grid, fmt)))
+    np.testing.assert_array_equal(decode_heatmap(payload), grid)
+
+
+@pytest.mark.parametrize("fmt", HEATMAP_FORMATS)
+def test_round_trip_from_dense_string(fmt):
+    # 기존 dense 문자열로 저장된 히트맵도 다른 포맷으로 다시 인코딩 가능
+    grid = _grid()
+    np.testing.assert_array_equal(decode_heatmap(encode_heatmap(format_dense(grid), fmt)), grid)
+
+
+def test_b64u16_rounds_and_clips():
+    grid = np.array([[-3.0, 1.6], [70000.0, 2.4]])
+    np.testing.assert_array_equal(decode_heatmap(encode_heatmap(grid, "b64u16")), [[0, 2], [65535, 2]])
+
+
+def test_encode_heatmaps_in_is_recursive_and_non_mutating():
+    grid = _grid().tolist()
+    response = {"result": {"sessions": [{HEATMAP_KEY: grid, "frames": 3}, {HEATMAP_KEY: None}]}}
+    encoded = encode_heatmaps_in(response, "coo")
+
+    first = encoded["result"]["sessions"][0]
+    assert first["frames"] == 3 and first[HEATMAP_KEY]["encoding"] == "coo"
+    np.testing.assert_array_equal(decode_heatmap(first[HEATMAP_KEY]), grid)
+    assert encoded["result"]["sessions"][1][HEATMAP_KEY] is None
+    assert response["result"]["sessions"][0][HEATMAP_KEY] is grid
+    # 히트맵이 아닌 값은 그대로
+    assert encode_heatmap({"not": "a grid"}, "rle") == {"not": "a grid"}
@@ -0,0 +1,114 @@
+# tests/test_speech_rate.py
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+import webrtcvad
+
+from app.utils import speech_rate
+from app.utils.speech_rate import FRAME_MS, VAD_AGGR
+
+
+# ---------- 벡터화 이전 구현 (비교 기준) ----------
+def _old_collect_vad_segments(pcm: bytes, sample_rate: int, frame_ms: int, aggressiveness: int):
+    vad = webrtcvad.Vad(aggressiveness)
+    bytes_per_frame = int(sample_rate * frame_ms / 1000) * 2
+    dur = frame_ms / 1000.0
+    segments, cur_start, last_end, ts = [], None, None, 0.0
+    for offset in range(0, len(pcm) - bytes_per_frame + 1, bytes_per_frame):
+        if vad.is_speech(pcm[offset:offset + bytes_per_frame], sample_rate):
+            if cur_start is None:
+                cur_start = ts
+            last_end = ts + dur
+        elif cur_start is not None:
+            segments.append((cur_start, last_end))
+            cur_start, last_end = None, None
+        ts += dur
+    if cur_start is not None:
+        segments.append((cur_start, last_end))
+    return segments
+
+
+def _old_merge_intervals(intervals, eps=1e-6):
+    if not intervals:
+        return []
+    intervals = sorted(intervals)
+    merged = [intervals[0]]
+    for s, e in intervals[1:]:
+        ms, me = merged[-1]
+        if s <= me + eps:
+            merged[-1] = (ms, max(me, e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def _old_intersect_intervals(a_list, b_list):
+    a_list, b_list = _old_merge_intervals(a_list), _old_merge_intervals(b_list)
+    i = j = 0
+    out = []
+    while i < len(a_list) and j < len(b_list):
+        s, e = max(a_list[i][0], b_list[j][0]), min(a_list[i][1], b_list[j][1])
+        if e > s:
+            out.append((s, e))
+        if a_list[i][1] < b_list[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _random_intervals(rng, n, scale=30.0):
+    starts = rng.uniform(0, scale, n).round(2)
+    return [(float(s), float(s + d)) for s, d in zip(starts, rng.uniform(0.01, 3.0, n).round(2))]
+
+
+def _speech_like(seconds=12.0, sample_rate=16000):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * ((t % 2.0) < 1.4)
+    voice = np.convolve(rng.normal(0, 1, len(t)), np.hanning(9) / 4.5, mode="same")
+    audio = 0.15 * voice * syllables + rng.normal(0, 1e-4, len(t))
+    return np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+
+
+def test_interval_sweep_matches_old_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        a, b = _random_intervals(rng, rng.integers(0, 15)), _random_intervals(rng, rng.integers(0, 15))
+
+        expected = _old_merge_intervals(_old_intersect_intervals(a, b))
+        got = speech_rate._merge_intervals(speech_rate._intersect_intervals(a, b))
+
+        np.testing.assert_allclose(got, np.asarray(expected, dtype=np.float64).reshape(-1, 2))
+        np.testing.assert_allclose(speech_rate._merge_intervals(a), np.asarray(_old_merge_intervals(a)).reshape(-1, 2))
+
+
+def test_vad_segments_match_old_frame_loop():
+    pcm = _speech_like()
+    expected = _old_collect_vad_segments(pcm.tobytes(), 16000, FRAME_MS, VAD_AGGR)
+    got = speech_rate._collect_vad_segments(pcm, 16000, FRAME_MS, VAD_AGGR)
+
+    assert len(expected) > 1
+    np.testing.assert_allclose(got, np.asarray(expected))
+
+
+def test_energy_gate_keeps_speech_time():
+    pcm = _speech_like()
+    ungated = speech_rate._collect_vad_segments(pcm, 16000, FRAME_MS, VAD_AGGR)
+    gated = speech_rate._collect_vad_segments(pcm, 16000, FRAME_MS, VAD_AGGR, energy_gate_dbfs=-60.0)
+    # 발화 시작 직전의 조용한 프레임만 달라질 수 있음 → 음성 시간은 거의 같음
+    speech_s = lambda seg: float((seg[:, 1] - seg[:, 0]).sum())
+    assert speech_s(gated) == pytest.approx(speech_s(ungated), rel=0.05)
+
+
+def test_analyze_speech_rate_from_wav_bytes():
+    buf = io.BytesIO()
+    sf.write(buf, _speech_like(), 16000, format="WAV", subtype="PCM_16")
+    whisper = {"text": "가" * 40, "segments": [{"start": s, "end": s + 1.5} for s in range(0, 12, 2)]}
+
+    result = speech_rate.analyze_speech_rate(buf.getvalue(), whisper)
+
+    assert result["label"] in ("SLOW", "SLIGHTLY SLOW", "NORMAL", "SLIGHTLY FAST", "FAST")
+    assert float(result["reason"]) > 0
@@ -0,0 +1,103 @@
+# tests/test_stt_stream.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.utils import stt, stt_stream
+from app.utils.stt_stream import StreamClosedError, StreamingTranscriber
+
+SR = 16000
+
+
+class _EnergyVad:
+    """webrtcvad 대신 프레임 진폭으로 음성 판정 (합성 신호에서 결과가 결정적이도록)"""
+
+    def is_speech(self, frame, sample_rate):
+        return int(np.abs(np.frombuffer(frame, dtype="<i2")).max()) > 1000
+
+
+def _pcm(*parts):
+    # (seconds, voiced) 구간들을 이어 붙인 PCM16
+    rng = np.random.default_rng(0)
+    out = [
+        (rng.normal(0, 4000, int(s * SR)) if voiced else np.zeros(int(s * SR))).astype("<i2")
+        for s, voiced in parts
+    ]
+    return np.concatenate(out).tobytes()
+
+
+@pytest.fixture
+def stt_calls(monkeypatch):
+    calls = []
+
+    async def fake_transcribe(wav, filename, content_type, client=None):
+        calls.append(filename)
+        await asyncio.sleep(0)
+        index = filename.split("_")[1].split(".")[0]
+        return {"text": f"part{index}", "segments": [{"start": 0.5, "end": 1.0, "text": f"part{index}"}]}
+
+    monkeypatch.setattr(stt, "transcribe_audio_verbose", fake_transcribe)
+    return calls
+
+
+async def _feed(stream, pcm, piece=3333):
+    # 프레임 경계와 맞지 않는 크기로 나눠서 전송
+    for i in range(0, len(pcm), piece):
+        await stream.feed(pcm[i:i + piece])
+
+
+def test_closed_chunks_are_transcribed_while_recording(stt_calls):
+    async def run():
+        stream = StreamingTranscriber(SR, energy_gate_dbfs=None)
+        stream._vad = _EnergyVad()
+        await _feed(stream, _pcm((3.5, True), (1.0, False), (2.0, True)))
+        await asyncio.sleep(0)
+        assert stt_calls == ["chunk_0.wav"]  # 무음에서 닫힌 첫 구간은 녹음 중에 STT
+
+        result = await stream.finish()
+        with pytest.raises(StreamClosedError):
+            await stream.feed(b"\0\0")
+        return stream, result
+
+    stream, result = asyncio.run(run())
+    transcription = result["transcription"]
+    assert stt_calls == ["chunk_0.wav", "chunk_1.wav"]
+    assert transcription["text"] == "part0 part1"
+    assert transcription["failed_chunks"] == 0
+    # 두 번째 구간의 segment 는 구간 시작(무음 가운데) 기준으로 이동
+    second_start = stream._chunks[1].start_s
+    assert 3.5 < second_start < 4.5
+    assert [s["start"] for s in transcription["segments"]] == [0.5, round(second_start + 0.5, 2)]
+    assert result["analysis"]["label"]
+    assert len(stream.wav_bytes()) > 6.5 * SR * 2
+
+
+def test_all_chunks_failing_returns_no_transcription(stt_calls, monkeypatch):
+    async def failing(wav, filename, content_type, client=None):
+        stt_calls.append(filename)
+        return None
+
+    monkeypatch.setattr(stt, "transcribe_audio_verbose", failing)
+
+    async def run():
+        stream = StreamingTranscriber(SR, energy_gate_dbfs=None)
+        stream._vad = _EnergyVad()
+        await _feed(stream, _pcm((1.0, True)))
+        return await stream.finish()
+
+    result = asyncio.run(run())
+    assert stt_calls == ["chunk_0.wav"]
+    assert result["transcription"] is None and result["analysis"] is None
+
+
+def test_stream_registry_pop():
+    async def run():
+        stream_id = stt_stream.open_stream(SR)
+        stream = stt_stream.pop_stream(stream_id)
+        assert stream is not None and stt_stream.get_stream(stream_id) is None
+        await stream.cancel()
+        with pytest.raises(StreamClosedError):
+            await stream.feed(b"\0\0")
+
+    asyncio.run(run())